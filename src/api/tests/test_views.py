@@ -0,0 +1,36 @@
+import tempfile
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+
+class MetricsTestCase(TestCase):
+    def setUp(self) -> None:
+        metrics_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(metrics_dir.cleanup)
+        self.url = reverse("metrics")
+        self.settings_override = dict(METRICS_DIR=metrics_dir.name)
+
+    def get(self, token, **headers):
+        with override_settings(METRICS_TOKEN=token, **self.settings_override):
+            return self.client.get(self.url, **headers)
+
+    def test_not_served_without_token(self):
+        resp = self.get("")
+        self.assertEqual(resp.status_code, 404)
+
+        resp = self.get("", HTTP_AUTHORIZATION="Bearer ")
+        self.assertEqual(resp.status_code, 404)
+
+    def test_requires_token(self):
+        resp = self.get("secret")
+        self.assertEqual(resp.status_code, 401)
+
+        resp = self.get("secret", HTTP_AUTHORIZATION="Bearer other")
+        self.assertEqual(resp.status_code, 401)
+
+    def test_served_with_token(self):
+        resp = self.get("secret", HTTP_AUTHORIZATION="Bearer secret")
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn(b"chiliseed_executions_in_flight", resp.content)
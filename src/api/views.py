@@ -1,6 +1,14 @@
-from django.http import JsonResponse
+import hmac
+
+from django.conf import settings
+from django.db.models import Count
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.http import require_GET
 from django.views.defaults import page_not_found, server_error
 
+from aws_environments.models import ExecutionLog
+from common.metrics import CONTENT_TYPE, collect, gauge_family, render
+
 
 def custom_404_handler(request, *args, **kwargs):
     """
@@ -20,3 +28,28 @@ def custom_500_handler(request, *args, **kwargs):
     if request.path.startswith("/api"):
         return JsonResponse({"detail": "Server error"}, status=500)
     return server_error(request, *args, **kwargs)
+
+
+@require_GET
+def metrics(request):
+    """Metrics of the control center and celery workers for prometheus."""
+    if not settings.METRICS_TOKEN:
+        # not configured, metrics are never public
+        return HttpResponse(status=404)
+    expected = f"Bearer {settings.METRICS_TOKEN}"
+    provided = request.META.get("HTTP_AUTHORIZATION", "")
+    if not hmac.compare_digest(provided.encode(), expected.encode()):
+        return HttpResponse(status=401)
+
+    families = collect()
+    in_flight = (
+        ExecutionLog.objects.filter(ended_at__isnull=True)
+        .values("component")
+        .annotate(count=Count("id"))
+    )
+    families["chiliseed_executions_in_flight"] = gauge_family(
+        "Executions which didn't end yet.",
+        ["component"],
+        [([row["component"]], row["count"]) for row in in_flight],
+    )
+    return HttpResponse(render(families), content_type=CONTENT_TYPE)
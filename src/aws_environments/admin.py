@@ -1,9 +1,13 @@
 from django.contrib import admin
+from django.utils.html import format_html, format_html_join
 
 from aws_environments.models import (
     Environment,
     Project,
+    ExecutionApiCall,
     ExecutionLog,
+    ExecutionResourceEvent,
+    ExecutionSpan,
     Resource,
     Service,
     BuildWorker,
@@ -53,7 +57,25 @@ class ServiceAdmin(admin.ModelAdmin):
         return obj.last_status.status
 
 
+class ResourceEventInline(admin.TabularInline):
+    model = ExecutionResourceEvent
+    fields = (
+        "executor",
+        "address",
+        "action",
+        "started_at",
+        "finished_at",
+        "duration",
+        "is_complete",
+    )
+    readonly_fields = fields
+    ordering = ("-duration",)
+    extra = 0
+    can_delete = False
+
+
 class ExecLogAdmin(admin.ModelAdmin):
+    inlines = (ResourceEventInline,)
     list_display = (
         "id",
         "slug",
@@ -74,8 +96,63 @@ class ExecLogAdmin(admin.ModelAdmin):
     readonly_fields = (
         "slug",
         "id",
+        "timing",
+        "api_calls",
     )
 
+    def timing(self, obj):
+        """Time spent in each phase of the execution."""
+        rows = format_html_join(
+            "",
+            "<tr><td>{}</td><td>{}</td><td>{}</td><td>{:.1f}</td><td>{:.1f}</td>"
+            "<td>{:.1f}</td><td>{}</td></tr>",
+            (
+                (
+                    phase.component,
+                    phase.action,
+                    phase.count,
+                    phase.total,
+                    phase.average,
+                    phase.maximum,
+                    phase.failures,
+                )
+                for phase in obj.get_timing()
+            ),
+        )
+        return format_html(
+            "<table><tr><th>Component</th><th>Action</th><th>Count</th>"
+            "<th>Total, s</th><th>Average, s</th><th>Max, s</th><th>Failures</th>"
+            "</tr>{}</table>",
+            rows,
+        )
+
+    def api_calls(self, obj):
+        """Aws api calls of the execution per operation."""
+        rows = format_html_join(
+            "",
+            "<tr><td>{}</td><td>{}</td><td>{}</td><td>{}</td><td>{}</td><td>{}</td>"
+            "<td>{:.1f}</td><td>{:.1f}</td></tr>",
+            (
+                (
+                    call.service,
+                    call.operation,
+                    call.calls,
+                    call.retries,
+                    call.throttles,
+                    call.errors,
+                    call.total_duration,
+                    call.max_duration,
+                )
+                for call in obj.api_calls.order_by("-calls", "service", "operation")
+            ),
+        )
+        return format_html(
+            "<table><tr><th>Service</th><th>Operation</th><th>Calls</th>"
+            "<th>Retries</th><th>Throttles</th><th>Errors</th><th>Total, s</th>"
+            "<th>Max, s</th></tr>{}</table>",
+            rows,
+        )
+
     def env(self, obj):
         component = obj.get_component_obj()
         if not component:
@@ -92,6 +169,38 @@ class ExecLogAdmin(admin.ModelAdmin):
             return component.environment.name
 
 
+class ExecutionSpanAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "execution_log",
+        "component",
+        "action",
+        "started_at",
+        "duration",
+        "is_success",
+    )
+    list_filter = ("component", "action", "is_success")
+    search_fields = ("execution_log__id", "execution_log__slug")
+    raw_id_fields = ("execution_log",)
+
+
+class ExecutionApiCallAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "execution_log",
+        "service",
+        "operation",
+        "calls",
+        "retries",
+        "throttles",
+        "errors",
+        "total_duration",
+    )
+    list_filter = ("service", "operation")
+    search_fields = ("execution_log__id", "execution_log__slug")
+    raw_id_fields = ("execution_log",)
+
+
 class BuildWorkerAdmin(admin.ModelAdmin):
     list_display = (
         "id",
@@ -142,6 +251,8 @@ class ResourceAdmin(admin.ModelAdmin):
 admin.site.register(Environment, EnvironmentAdmin)
 admin.site.register(Project, ProjectAdmin)
 admin.site.register(ExecutionLog, ExecLogAdmin)
+admin.site.register(ExecutionSpan, ExecutionSpanAdmin)
+admin.site.register(ExecutionApiCall, ExecutionApiCallAdmin)
 admin.site.register(Service, ServiceAdmin)
 admin.site.register(BuildWorker, BuildWorkerAdmin)
 admin.site.register(Resource, ResourceAdmin)
@@ -0,0 +1,106 @@
+"""Cache of env vars of services, with values.
+
+Env vars only change through the env vars api and jobs of the hub, which
+invalidate the cache of the services they write to, so listing env vars and
+deploying services read them from parameter store once per `ENV_VARS_CACHE`
+timeout. Cached env vars hold decrypted secrets, so they are encrypted with
+the fernet keys of encrypted model fields before being cached.
+
+Every write changes the generation of env vars of the service. Readers take
+the generation before reading parameter store and env vars are served only
+while their generation is current, so values read before a write are never
+served after it, even if they are cached after its invalidation.
+
+The cache has to be shared by web and worker processes of all nodes, i.e. a
+`FileBasedCache` in a directory they all mount, see `ENV_VARS_CACHE_DIR`.
+"""
+import logging
+import pickle
+from functools import lru_cache
+
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
+from django.conf import settings
+from django.core.cache import caches
+from fernet_fields.hkdf import derive_fernet_key
+
+from common.crypto import get_uuid_hex
+
+logger = logging.getLogger(__name__)
+
+ENV_VARS_CACHE = "env_vars"
+
+
+@lru_cache(maxsize=None)
+def get_fernet():
+    """Fernet of the keys used by encrypted model fields."""
+    keys = getattr(settings, "FERNET_KEYS", None) or [settings.SECRET_KEY]
+    return MultiFernet([Fernet(derive_fernet_key(key)) for key in keys])
+
+
+def get_cache_key(service_id):
+    return f"service:{service_id}"
+
+
+def get_generation_key(service_id):
+    return f"service:{service_id}:generation"
+
+
+def get_generation(service_id):
+    """Return current generation of env vars of the service.
+
+    Must be taken before env vars are read, to be passed to `cache_env_vars`.
+    """
+    cache = caches[ENV_VARS_CACHE]
+    generation_key = get_generation_key(service_id)
+    # generations don't expire, an expired one could match a stale reader
+    cache.add(generation_key, get_uuid_hex(), timeout=None)
+    return cache.get(generation_key)
+
+
+def get_cached_env_vars(service_id):
+    """Return cached env vars of the service, None if they are not cached."""
+    cache_key = get_cache_key(service_id)
+    generation_key = get_generation_key(service_id)
+    cached = caches[ENV_VARS_CACHE].get_many([cache_key, generation_key])
+    if cache_key not in cached:
+        return None
+    generation, token = cached[cache_key]
+    if generation != cached.get(generation_key):
+        # read before the last write
+        return None
+    try:
+        return pickle.loads(get_fernet().decrypt(token))
+    except InvalidToken:
+        # cached with a key which has been rotated out since
+        logger.warning("Dropping undecryptable env vars of service_id=%s", service_id)
+        return None
+
+
+def cache_env_vars(service_id, env_vars, generation):
+    """Cache env vars of the service, as returned by `Service.get_env_vars`.
+
+    Parameters
+    ----------
+    service_id : int
+    env_vars : list of dict
+    generation : str
+        generation of env vars taken before they were read, see `get_generation`
+    """
+    cache = caches[ENV_VARS_CACHE]
+    if generation is None or cache.get(get_generation_key(service_id)) != generation:
+        logger.info("Env vars changed while reading them, service_id=%s", service_id)
+        return
+    cache.set(
+        get_cache_key(service_id),
+        (generation, get_fernet().encrypt(pickle.dumps(env_vars))),
+    )
+
+
+def invalidate_env_vars(service_ids):
+    """Drop cached env vars of services, after they were written to."""
+    cache = caches[ENV_VARS_CACHE]
+    cache.set_many(
+        {get_generation_key(service_id): get_uuid_hex() for service_id in service_ids},
+        timeout=None,
+    )
+    cache.delete_many([get_cache_key(service_id) for service_id in service_ids])
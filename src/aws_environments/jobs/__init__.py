@@ -3,6 +3,8 @@
 from .build_worker import launch_build_worker, remove_build_worker
 from .deployment import deploy_version_to_service
 from .environment import create_environment_infra
+from .env_vars import write_env_vars
+from .maintenance import apply_artifacts_retention
 from .project import create_project_infra
 from .resource import (
     create_statics_bucket,
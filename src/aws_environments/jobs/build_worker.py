@@ -3,6 +3,7 @@ from datetime import datetime, timedelta, timezone
 from celery import shared_task
 from celery.utils.log import get_task_logger
 
+from aws_environments.jobs.utils import timed_job
 from aws_environments.models import BuildWorker, ExecutionLog
 from infra_executors.build_worker import (
     BuildWorkerConfigs,
@@ -16,6 +17,7 @@ logger = get_task_logger(__name__)
 
 
 @shared_task
+@timed_job
 def launch_build_worker(build_worker_id, exec_log_id):
     logger.info(
         "Launching build worker for build_worker_id=%s exec_log_id=%s",
@@ -84,6 +86,7 @@ def launch_build_worker(build_worker_id, exec_log_id):
 
 
 @shared_task
+@timed_job
 def remove_build_worker(build_worker_id, exec_log_id):
     logger.info(
         "Remove build worker for build_worker_id=%s exec_log_id=%s",
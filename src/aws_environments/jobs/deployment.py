@@ -1,6 +1,7 @@
 from celery import shared_task
 from celery.utils.log import get_task_logger
 
+from aws_environments.jobs.utils import timed_job
 from aws_environments.models import ServiceDeployment, ExecutionLog
 from infra_executors.deploy_ecs_service import (
     SecretEnvVar,
@@ -16,7 +17,8 @@ def get_deployment_conf(deployment):
     service_conf = deployment.service.conf()
     project_conf = deployment.service.project.conf()
     env_vars = []
-    for env_var in deployment.service.get_env_vars():
+    # task definitions reference env vars by name, their values are not needed
+    for env_var in deployment.service.get_env_var_names():
         env_vars.append(
             SecretEnvVar(name=env_var["name"], value_from=env_var["value_from"])
         )
@@ -36,6 +38,7 @@ def get_deployment_conf(deployment):
 
 
 @shared_task
+@timed_job
 def deploy_version_to_service(deployment_id, exec_log_id):
     logger.info(
         "Deploying new version to service deployment_id=%s exec_log_id=%s",
@@ -0,0 +1,58 @@
+import os
+
+from celery import shared_task
+from celery.utils.log import get_task_logger
+
+from aws_environments.jobs.utils import timed_job
+from aws_environments.models import ExecutionLog, Project
+from infra_executors.constants import EXEC_LOGS_DIR
+from infra_executors.ssm import get_writes_limiter, put_parameters
+from infra_executors.utils import get_boto3_client
+
+logger = get_task_logger(__name__)
+
+
+def store_write_results(exec_log_id, results):
+    """Log result of every write, to be read with the logs of the execution."""
+    os.makedirs(EXEC_LOGS_DIR, exist_ok=True)
+    log_path = os.path.join(EXEC_LOGS_DIR, f"env_vars_update_{exec_log_id}.log")
+    with open(log_path, "w") as log_file:
+        for result in results:
+            outcome = "ok" if result.is_success else f"failed ({result.error})"
+            log_file.write(f"{result.name}: {outcome}\n")
+
+
+@shared_task
+@timed_job
+def write_env_vars(project_id, exec_log_id):
+    logger.info(
+        "Writing env var to services of project_id=%s exec_log_id=%s",
+        project_id,
+        exec_log_id,
+    )
+
+    project = Project.objects.select_related("environment").get(id=project_id)
+    exec_log = ExecutionLog.objects.get(id=exec_log_id)
+    params = exec_log.get_params()
+
+    writes = project.get_env_var_writes(
+        {params["key_name"]: params["key_value"]}, params["is_secure"]
+    )
+    creds = project.environment.get_creds()
+    results = put_parameters(
+        get_boto3_client("ssm", creds), writes, get_writes_limiter(creds)
+    )
+    project.invalidate_env_vars()
+    store_write_results(exec_log_id, results)
+
+    failed = [result.name for result in results if not result.is_success]
+    if failed:
+        logger.error(
+            "Failed to write env vars: %s project_id=%s exec_log_id=%s",
+            failed,
+            project_id,
+            exec_log_id,
+        )
+
+    exec_log.mark_result(not failed)
+    return not failed
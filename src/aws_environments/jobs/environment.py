@@ -2,6 +2,7 @@ from celery import shared_task
 from celery.utils.log import get_task_logger
 
 from aws_environments.constants import InfraStatus
+from aws_environments.jobs.utils import timed_job
 from aws_environments.models import Environment, ExecutionLog, EnvironmentConf
 from infra_executors.constants import AwsCredentials, GeneralConfiguration
 from infra_executors.ecs_environment import create_global_parts
@@ -12,6 +13,7 @@ logger = get_task_logger(__name__)
 
 
 @shared_task
+@timed_job
 def create_environment_infra(env_id, exec_log_id):
     logger.info("Creating environment_id=%d, exec_log_id=%d", env_id, exec_log_id)
 
@@ -0,0 +1,29 @@
+"""Maintenance of the nodes workers run on.
+
+Run artifacts are kept on the local disk of every node, so celery beat sends
+retention to the maintenance exchange, which every worker consumes, see
+`control_center.scheduler`. Workers of the same node skip the
+run while another one is applying retention.
+"""
+from celery import shared_task
+from celery.utils.log import get_task_logger
+
+from aws_environments.models import ExecutionLog
+from infra_executors.retention import apply_retention
+
+logger = get_task_logger(__name__)
+
+
+# every worker runs the task with the same id, results would overwrite each other
+@shared_task(ignore_result=True)
+def apply_artifacts_retention():
+    """Clean up plans, logs and workspaces of terraform runs on this node."""
+    running_run_ids = {
+        str(exec_log_id)
+        for exec_log_id in ExecutionLog.objects.filter(
+            ended_at__isnull=True
+        ).values_list("id", flat=True)
+    }
+    summary = apply_retention(running_run_ids)
+    logger.info("Applied artifacts retention %s", summary)
+    return summary
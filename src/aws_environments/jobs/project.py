@@ -2,6 +2,7 @@ from celery import shared_task
 from celery.utils.log import get_task_logger
 
 from aws_environments.constants import InfraStatus
+from aws_environments.jobs.utils import timed_job
 from aws_environments.models import Project, ExecutionLog, ProjectConf
 from infra_executors.ecs_environment import launch_project_infra
 
@@ -10,6 +11,7 @@ logger = get_task_logger(__name__)
 
 
 @shared_task
+@timed_job
 def create_project_infra(project_id, exec_log_id):
     logger.info(
         "Creating project environment for project_id=%s exec_log_id=%s",
@@ -23,9 +25,11 @@ def create_project_infra(project_id, exec_log_id):
     try:
 
         creds = project.environment.get_creds()
-        common = project.get_common_conf(exec_log.slug)
+        common = project.get_common_conf(exec_log.id)
 
-        alb, ecs_cluster = launch_project_infra(creds, common)
+        alb, ecs_cluster = launch_project_infra(
+            creds, common, exec_log.get_params().get("force", False)
+        )
 
         project.set_conf(
             ProjectConf(
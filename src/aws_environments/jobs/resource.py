@@ -2,6 +2,7 @@ from celery import shared_task
 from celery.utils.log import get_task_logger
 
 from aws_environments.constants import InfraStatus
+from aws_environments.jobs.utils import timed_job
 from aws_environments.models import Resource, ExecutionLog, ResourceConf
 from aws_environments.models.resource import BucketConf
 from infra_executors.cache import CacheConfigs, create_cache, destroy_cache
@@ -21,6 +22,7 @@ def get_servers_security_group(project, exec_log_id):
 
 
 @shared_task
+@timed_job
 def launch_database(resource_id, exec_log_id):
     logger.info(
         "Launching new database. resource_id=%s exec_log_id=%s",
@@ -80,6 +82,7 @@ def launch_database(resource_id, exec_log_id):
 
 
 @shared_task
+@timed_job
 def remove_database(resource_id, exec_log_id):
     logger.info(
         "Destroying database. resource_id=%s exec_log_id=%s", resource_id, exec_log_id
@@ -139,6 +142,7 @@ def is_instance_type_t1_t2(instance_type):
 
 
 @shared_task
+@timed_job
 def launch_cache(resource_id, exec_log_id):
     logger.info(
         "Launching cache. resource_id=%s exec_log_id=%s", resource_id, exec_log_id
@@ -203,6 +207,7 @@ def launch_cache(resource_id, exec_log_id):
 
 
 @shared_task
+@timed_job
 def remove_cache(resource_id, exec_log_id):
     logger.info("Remove cache. resource_id=%s exec_log_id=%s", resource_id, exec_log_id)
 
@@ -252,6 +257,7 @@ def remove_cache(resource_id, exec_log_id):
 
 
 @shared_task
+@timed_job
 def create_statics_bucket(resource_id, exec_log_id):
     """Create S3 statics buckets."""
     logger.info(
@@ -303,6 +309,7 @@ def create_statics_bucket(resource_id, exec_log_id):
 
 
 @shared_task
+@timed_job
 def remove_statics_bucket(resource_id, exec_log_id):
     """Removes service statics bucket."""
     logger.info(
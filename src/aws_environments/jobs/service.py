@@ -7,6 +7,7 @@ from aws_environments.jobs.deployment import (
     deploy_version_to_service,
 )
 from aws_environments.jobs.resource import remove_statics_bucket
+from aws_environments.jobs.utils import timed_job
 from aws_environments.models import (
     Resource,
     Service,
@@ -14,19 +15,23 @@ from aws_environments.models import (
     ServiceConf,
     ServiceDeployment,
 )
-from infra_executors.alb import HTTP
+from infra_executors.alb import HTTP, get_alb_details
 from infra_executors.deploy_ecs_service import remove_ecs_service
 from infra_executors.ecs_service import (
     create_acm_for_service,
     launch_infa_for_service,
     destroy_service_infra,
+    destroy_shared_service_infra,
 )
+from infra_executors.ssm import delete_parameters, get_writes_limiter
+from infra_executors.timing import span
 from infra_executors.utils import get_boto3_client
 
 logger = get_task_logger(__name__)
 
 
 @shared_task
+@timed_job
 def create_service_infra(service_id, exec_log_id):
     logger.info(
         "Creating service environment for service_id=%s exec_log_id=%s",
@@ -52,6 +57,8 @@ def create_service_infra(service_id, exec_log_id):
     creds = service.project.environment.get_creds()
     common_conf = service.project.get_common_conf(exec_log_id, service_id)
     r53_conf = service.project.get_r53_conf()
+    # apply even if the same inputs were applied already, i.e. to fix drift
+    force = exec_log.get_params().get("force", False)
 
     try:
         acm_arn = create_acm_for_service(
@@ -60,6 +67,7 @@ def create_service_infra(service_id, exec_log_id):
             r53_conf,
             service.subdomain,
             service.project.environment.conf().r53_zone_id,
+            force,
         )
 
         ecr_repo_name = f"{service.project.name}/{service.name}"
@@ -68,27 +76,25 @@ def create_service_infra(service_id, exec_log_id):
                 acm_arn=acm_arn,
                 health_check_protocol=HTTP,
                 ecr_repo_name=f"{service.project.name}/{service.name}",
+                own_states=True,
             )
         )
 
         service.project.refresh_from_db()
-        alb_conf = service.project.get_alb_conf()
-        ecr_conf = service.project.get_ecr_conf()
-
+        alb = get_alb_details(creds, common_conf, service.project.get_alb_conf())
         infra = launch_infa_for_service(
-            creds, common_conf, r53_conf, alb_conf, ecr_conf,
+            creds,
+            common_conf,
+            service.get_alb_listener_conf(
+                alb["alb_arn"]["value"], alb["alb_security_group_id"]["value"]
+            ),
+            service.get_cname_conf(),
+            service.get_ecr_conf(),
+            force,
         )
 
-        ecr_repo_url = [
-            url
-            for url in infra["ecr"]["repositories_urls"]["value"]
-            if ecr_repo_name in url
-        ][0]
-        target_group_arn = [
-            arn
-            for arn in infra["alb"]["target_groups_arn"]["value"]
-            if service.name in arn
-        ][0]
+        ecr_repo_url = infra["ecr"]["repositories_urls"]["value"][0]
+        target_group_arn = infra["alb_listener"]["target_group_arn"]["value"]
     except:
         logger.exception(
             "Failed to create project infra project_id=%s exec_log_id=%s",
@@ -107,6 +113,7 @@ def create_service_infra(service_id, exec_log_id):
             ecr_repo_name=ecr_repo_name,
             ecr_repo_url=ecr_repo_url,
             target_group_arn=target_group_arn,
+            own_states=True,
         )
     )
     service.set_status(InfraStatus.ready)
@@ -121,15 +128,25 @@ def create_service_infra(service_id, exec_log_id):
     return True
 
 
+@span("ssm", "remove_env_vars")
 def remove_env_vars(service):
-    client = get_boto3_client("ssm", service.project.environment.get_creds())
-    for env_vars in service.env_vars_generator(client, batch_size=10):
-        names = [env_var["Name"] for env_var in env_vars]
-        logger.info("Removing env vars: %s", names)
-        client.delete_parameters(Names=names)
+    creds = service.project.environment.get_creds()
+    client = get_boto3_client("ssm", creds)
+    names = [
+        env_var["Name"]
+        for env_vars in service.env_vars_generator(client, batch_size=10)
+        for env_var in env_vars
+    ]
+    logger.info("Removing env vars: %s", names)
+    results = delete_parameters(client, names, get_writes_limiter(creds))
+    service.invalidate_env_vars()
+    failed = [result.name for result in results if not result.is_success]
+    if failed:
+        logger.error("Failed to remove env vars: %s", failed)
 
 
 @shared_task
+@timed_job
 def remove_service_infra(service_id, exec_log_id):
     logger.info(
         "Removing service environment for service_id=%s exec_log_id=%s",
@@ -147,20 +164,29 @@ def remove_service_infra(service_id, exec_log_id):
 
     creds = service.project.environment.get_creds()
     common_conf = service.project.get_common_conf(exec_log_id, service_id)
-    r53_conf = service.project.get_r53_conf()
-    alb_conf = service.project.get_alb_conf()
-    ecr_conf = service.project.get_ecr_conf()
 
     try:
-        destroy_service_infra(
-            creds,
-            common_conf,
-            r53_conf,
-            alb_conf,
-            ecr_conf,
-            service.project.environment.conf().r53_zone_id,
-            service.subdomain,
-        )
+        if service.conf().own_states:
+            alb = get_alb_details(creds, common_conf, service.project.get_alb_conf())
+            destroy_service_infra(
+                creds,
+                common_conf,
+                service.get_alb_listener_conf(
+                    alb["alb_arn"]["value"], alb["alb_security_group_id"]["value"]
+                ),
+                service.get_cname_conf(),
+                service.get_ecr_conf(),
+            )
+        else:
+            destroy_shared_service_infra(
+                creds,
+                common_conf,
+                service.project.get_r53_conf(),
+                service.project.get_alb_conf(),
+                service.project.get_ecr_conf(),
+                service.project.environment.conf().r53_zone_id,
+                service.subdomain,
+            )
 
         remove_env_vars(service)
 
@@ -190,6 +216,7 @@ def remove_service_infra(service_id, exec_log_id):
 
 
 @shared_task
+@timed_job
 def update_service_infra(previous_service_id, new_service_id, exec_log_id):
     deployment = ServiceDeployment.objects.filter(
         service_id=previous_service_id
@@ -0,0 +1,53 @@
+import functools
+import inspect
+
+from celery.utils.log import get_task_logger
+
+from aws_environments.models import ExecutionLog
+from infra_executors.api_calls import (
+    describe_api_calls,
+    recording,
+    summarize_api_calls,
+)
+from infra_executors.timing import current_run_id, run_context
+
+logger = get_task_logger(__name__)
+
+
+def timed_job(job):
+    """Attribute spans and aws api calls of the job to its execution log.
+
+    Job must take `exec_log_id` argument. Jobs called by another job of the same
+    execution, i.e. by `update_service_infra`, are attributed to the calling job,
+    which stores api calls of all of them once it is done.
+    """
+    signature = inspect.signature(job)
+
+    @functools.wraps(job)
+    def run_job(*args, **kwargs):
+        exec_log_id = signature.bind(*args, **kwargs).arguments["exec_log_id"]
+        if current_run_id.get() == exec_log_id:
+            return job(*args, **kwargs)
+
+        with run_context(exec_log_id), recording() as api_calls:
+            try:
+                return job(*args, **kwargs)
+            finally:
+                store_api_calls(exec_log_id, summarize_api_calls(api_calls))
+
+    return run_job
+
+
+def store_api_calls(exec_log_id, summaries):
+    """Save api calls of the job, failing to do so doesn't fail the job."""
+    try:
+        ExecutionLog.objects.get(id=exec_log_id).store_api_calls(summaries)
+    except Exception:
+        logger.exception("Failed to store api calls. exec_log_id=%s", exec_log_id)
+    else:
+        logger.info(
+            "Job made %s aws api calls. exec_log_id=%s calls=%s",
+            sum(summary.calls for summary in summaries),
+            exec_log_id,
+            describe_api_calls(summaries),
+        )
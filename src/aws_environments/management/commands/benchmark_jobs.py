@@ -0,0 +1,71 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from benchmarks.scenarios import (
+    SCENARIOS,
+    benchmark_database,
+    run_scenario_in_process,
+)
+
+
+class Command(BaseCommand):
+    help = "Benchmark jobs against fake terraform and aws."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "scenario", type=str, choices=["all", *SCENARIOS], default="all", nargs="?"
+        )
+        parser.add_argument("--jobs", type=int, default=10)
+        parser.add_argument("--concurrency", type=int, default=4)
+        parser.add_argument(
+            "--latency-scale",
+            type=float,
+            default=0.05,
+            dest="latency_scale",
+            help="Multiplier of simulated terraform latency, 1 is close to aws.",
+        )
+        parser.add_argument(
+            "--aws-latency",
+            type=float,
+            default=0.05,
+            dest="aws_latency",
+            help="Seconds every aws api call takes.",
+        )
+        parser.add_argument(
+            "--json", type=str, dest="json_path", help="Write the report to the file."
+        )
+
+    def handle(self, *args, **options):
+        scenarios = (
+            list(SCENARIOS) if options["scenario"] == "all" else [options["scenario"]]
+        )
+        reports = []
+        with benchmark_database():
+            for scenario in scenarios:
+                report = run_scenario_in_process(
+                    scenario,
+                    jobs=options["jobs"],
+                    concurrency=options["concurrency"],
+                    latency_scale=options["latency_scale"],
+                    aws_latency=options["aws_latency"],
+                )
+                reports.append(report)
+                self.write_report(report)
+
+        if options["json_path"]:
+            with open(options["json_path"], "w") as json_file:
+                json.dump([report._asdict() for report in reports], json_file, indent=2)
+
+    def write_report(self, report):
+        self.stdout.write(
+            f"{report.scenario:<28} "
+            f"jobs={report.succeeded}/{report.jobs} "
+            f"concurrency={report.concurrency} "
+            f"wall_time={report.wall_time:.2f}s "
+            f"subprocesses={report.subprocesses} "
+            f"aws_calls={report.aws_calls} "
+            f"peak_rss={report.peak_rss_mb:.1f}MB "
+            f"rss_growth={report.rss_growth_mb:.1f}MB "
+            f"peak_child_rss={report.peak_child_rss_mb:.1f}MB"
+        )
@@ -0,0 +1,49 @@
+# Generated by Django 3.1.2 on 2020-10-25 10:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("aws_environments", "0033_auto_20201019_0853"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExecutionResourceEvent",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("is_deleted", models.BooleanField(blank=True, default=False)),
+                ("deleted_at", models.DateTimeField(blank=True, null=True)),
+                ("slug", models.SlugField(max_length=20, null=True, unique=True)),
+                ("executor", models.CharField(max_length=50)),
+                ("address", models.CharField(max_length=255)),
+                ("action", models.CharField(max_length=20)),
+                ("started_at", models.DateTimeField()),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+                ("duration", models.FloatField(blank=True, null=True)),
+                ("is_complete", models.BooleanField(default=False)),
+                (
+                    "execution_log",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="resource_events",
+                        to="aws_environments.ExecutionLog",
+                    ),
+                ),
+            ],
+            options={"abstract": False,},
+        ),
+    ]
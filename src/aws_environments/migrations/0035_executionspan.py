@@ -0,0 +1,41 @@
+# Generated by Django 3.1.2 on 2020-10-27 09:41
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("aws_environments", "0034_executionresourceevent"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExecutionSpan",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("component", models.CharField(max_length=100)),
+                ("action", models.CharField(max_length=100)),
+                ("started_at", models.DateTimeField()),
+                ("duration", models.FloatField()),
+                ("is_success", models.BooleanField(default=True)),
+                (
+                    "execution_log",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="spans",
+                        to="aws_environments.ExecutionLog",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 3.1.2 on 2020-10-29 11:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("aws_environments", "0035_executionspan"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExecutionApiCall",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("service", models.CharField(max_length=50)),
+                ("operation", models.CharField(max_length=100)),
+                ("calls", models.PositiveIntegerField()),
+                ("retries", models.PositiveIntegerField(default=0)),
+                ("throttles", models.PositiveIntegerField(default=0)),
+                ("errors", models.PositiveIntegerField(default=0)),
+                ("total_duration", models.FloatField()),
+                ("max_duration", models.FloatField()),
+                (
+                    "execution_log",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="api_calls",
+                        to="aws_environments.ExecutionLog",
+                    ),
+                ),
+            ],
+        ),
+    ]
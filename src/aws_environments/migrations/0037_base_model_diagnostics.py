@@ -0,0 +1,70 @@
+# Generated by Django 3.1.2 on 2026-10-18 05:31
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("aws_environments", "0036_executionapicall"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="executionapicall",
+            name="created_at",
+            field=models.DateTimeField(
+                auto_now_add=True, default=django.utils.timezone.now
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="executionapicall",
+            name="deleted_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="executionapicall",
+            name="is_deleted",
+            field=models.BooleanField(blank=True, default=False),
+        ),
+        migrations.AddField(
+            model_name="executionapicall",
+            name="slug",
+            field=models.SlugField(max_length=20, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name="executionapicall",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name="executionspan",
+            name="created_at",
+            field=models.DateTimeField(
+                auto_now_add=True, default=django.utils.timezone.now
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="executionspan",
+            name="deleted_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="executionspan",
+            name="is_deleted",
+            field=models.BooleanField(blank=True, default=False),
+        ),
+        migrations.AddField(
+            model_name="executionspan",
+            name="slug",
+            field=models.SlugField(max_length=20, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name="executionspan",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -1,7 +1,12 @@
 """Manages aws environment models."""
 
 from .environment import Environment, EnvStatus, EnvironmentConf
-from .execution_log import ExecutionLog
+from .execution_log import (
+    ExecutionApiCall,
+    ExecutionLog,
+    ExecutionResourceEvent,
+    ExecutionSpan,
+)
 from .project import Project, ProjectStatus, ProjectConf
 from .resource import Resource, ResourceStatus, ResourceConf
 from .service import Service, ServiceStatus, ServiceConf, BuildWorker, ServiceDeployment
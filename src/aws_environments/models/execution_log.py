@@ -1,4 +1,5 @@
 import json
+import logging
 from datetime import datetime
 
 import pytz
@@ -6,12 +7,17 @@ from django.db import models
 from fernet_fields import EncryptedTextField
 
 from common.models import BaseModel
+from infra_executors.api_calls import ApiCallsSummary
+from infra_executors.progress import ResourceEvent, read_resource_events
+from infra_executors.timing import Span, read_spans, summarize_spans
 
 from .environment import Environment
 from .project import Project
 from .service import BuildWorker, Service, ServiceDeployment
 from .resource import Resource
 
+logger = logging.getLogger(__name__)
+
 
 class ExecutionLog(BaseModel):
     """Manages infra executor logs for a specific change."""
@@ -93,3 +99,159 @@ class ExecutionLog(BaseModel):
         self.is_success = is_success
         self.ended_at = datetime.utcnow().replace(tzinfo=pytz.UTC)
         self.save(update_fields=["is_success", "ended_at"])
+        # diagnostics, failing to store them doesn't change the result
+        for store in (self.store_resource_events, self.store_spans):
+            try:
+                store()
+            except Exception:
+                logger.exception(
+                    "Failed to %s. exec_log_id=%s", store.__name__, self.id
+                )
+
+    def get_resource_events(self):
+        """Resource events of the execution, read live while it is running."""
+        if self.ended_at:
+            return list(self.resource_events.order_by("started_at"))
+        return sorted(
+            (
+                ExecutionResourceEvent.from_event(self, event)
+                for event in read_resource_events(self.id)
+            ),
+            key=lambda event: event.started_at,
+        )
+
+    def store_resource_events(self):
+        """Save resource events recorded by terraform runs of the execution."""
+        events = [
+            ExecutionResourceEvent.from_event(self, event)
+            for event in read_resource_events(self.id)
+        ]
+        self.resource_events.all().delete()
+        ExecutionResourceEvent.objects.bulk_create(events)
+
+    def get_timing(self):
+        """Time spent in each phase of the execution, live while it is running."""
+        if self.ended_at:
+            spans = [span.to_span() for span in self.spans.all()]
+        else:
+            spans = read_spans(self.id)
+        return summarize_spans(spans)
+
+    def store_spans(self):
+        """Save spans timed during the execution."""
+        spans = [ExecutionSpan.from_span(self, span) for span in read_spans(self.id)]
+        self.spans.all().delete()
+        ExecutionSpan.objects.bulk_create(spans)
+
+    def store_api_calls(self, summaries):
+        """Save aws api calls made during the execution, per operation."""
+        api_calls = [
+            ExecutionApiCall.from_summary(self, summary) for summary in summaries
+        ]
+        self.api_calls.all().delete()
+        ExecutionApiCall.objects.bulk_create(api_calls)
+
+
+def _from_timestamp(timestamp):
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp, tz=pytz.UTC)
+
+
+class ExecutionResourceEvent(BaseModel):
+    """Terraform operation on a single resource during an execution."""
+
+    execution_log = models.ForeignKey(
+        ExecutionLog, on_delete=models.CASCADE, related_name="resource_events"
+    )
+    # terraform configuration that changed the resource. i.e.: alb
+    executor = models.CharField(max_length=50)
+    address = models.CharField(max_length=255)
+    action = models.CharField(max_length=20)
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # seconds, as reported by terraform
+    duration = models.FloatField(null=True, blank=True)
+    is_complete = models.BooleanField(default=False)
+
+    @classmethod
+    def from_event(cls, execution_log: ExecutionLog, event: ResourceEvent):
+        return cls(
+            execution_log=execution_log,
+            executor=event.executor,
+            address=event.address,
+            action=event.action,
+            started_at=_from_timestamp(event.started_at),
+            finished_at=_from_timestamp(event.finished_at),
+            duration=event.duration,
+            is_complete=event.is_complete,
+        )
+
+
+class ExecutionSpan(BaseModel):
+    """Time spent in a single phase of an execution."""
+
+    execution_log = models.ForeignKey(
+        ExecutionLog, on_delete=models.CASCADE, related_name="spans"
+    )
+    # what was running. i.e.: terraform:alb, aws:ssm
+    component = models.CharField(max_length=100)
+    # phase of the component. i.e.: plan, GetParameter
+    action = models.CharField(max_length=100)
+    started_at = models.DateTimeField()
+    # seconds
+    duration = models.FloatField()
+    is_success = models.BooleanField(default=True)
+
+    @classmethod
+    def from_span(cls, execution_log: ExecutionLog, span: Span):
+        return cls(
+            execution_log=execution_log,
+            component=span.component,
+            action=span.action,
+            started_at=_from_timestamp(span.started_at),
+            duration=span.duration,
+            is_success=span.is_success,
+        )
+
+    def to_span(self) -> Span:
+        return Span(
+            component=self.component,
+            action=self.action,
+            started_at=self.started_at.timestamp(),
+            duration=self.duration,
+            is_success=self.is_success,
+        )
+
+
+class ExecutionApiCall(BaseModel):
+    """Aws api calls of a single operation made during an execution."""
+
+    execution_log = models.ForeignKey(
+        ExecutionLog, on_delete=models.CASCADE, related_name="api_calls"
+    )
+    # i.e.: ssm, ecs
+    service = models.CharField(max_length=50)
+    # i.e.: GetParameter
+    operation = models.CharField(max_length=100)
+    calls = models.PositiveIntegerField()
+    retries = models.PositiveIntegerField(default=0)
+    throttles = models.PositiveIntegerField(default=0)
+    errors = models.PositiveIntegerField(default=0)
+    # seconds, retries included
+    total_duration = models.FloatField()
+    max_duration = models.FloatField()
+
+    @classmethod
+    def from_summary(cls, execution_log: ExecutionLog, summary: ApiCallsSummary):
+        return cls(
+            execution_log=execution_log,
+            service=summary.service,
+            operation=summary.operation,
+            calls=summary.calls,
+            retries=summary.retries,
+            throttles=summary.throttles,
+            errors=summary.errors,
+            total_duration=summary.total,
+            max_duration=summary.maximum,
+        )
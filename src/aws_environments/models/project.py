@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+import itertools
 import json
 import os
 
@@ -7,14 +8,22 @@ from django.db import models
 from fernet_fields import EncryptedTextField
 
 from aws_environments.constants import InfraStatus
+from aws_environments.env_vars_cache import (
+    cache_env_vars,
+    get_cached_env_vars,
+    get_generation,
+    invalidate_env_vars,
+)
 from common.models import BaseModel
 from infra_executors.alb import ALBConfigs, OpenPort, HTTP
 from infra_executors.constants import GeneralConfiguration, KEYS_DIR
 from infra_executors.ecr import ECRConfigs
 from infra_executors.route53 import Route53Configuration, CnameSubDomain
+from infra_executors.ssm import iter_parameters_by_path
+from infra_executors.utils import get_boto3_client
 
 from .environment import Environment
-from .utils import BaseConf
+from .utils import BaseConf, get_parameter_prefix, to_env_var
 
 User = get_user_model()
 
@@ -121,6 +130,7 @@ class Project(BaseModel):
         )
 
     def get_r53_conf(self) -> Route53Configuration:
+        # services with own states manage their cname on their own
         cnames = [
             CnameSubDomain(
                 subdomain=service.subdomain,
@@ -129,6 +139,7 @@ class Project(BaseModel):
             for service in self.services.select_related("project").filter(
                 is_deleted=False
             )
+            if not service.conf().own_states
         ]
         return Route53Configuration(
             domain=self.environment.domain, cname_subdomains=cnames
@@ -137,6 +148,8 @@ class Project(BaseModel):
     def get_alb_conf(self) -> ALBConfigs:
         open_ports = []
         for service in self.services.filter(is_deleted=False):
+            if service.conf().own_states:
+                continue
             open_ports.append(
                 OpenPort(
                     name=service.name,
@@ -153,10 +166,113 @@ class Project(BaseModel):
     def get_ecr_conf(self) -> ECRConfigs:
         repos = []
         for service in self.services.filter(is_deleted=False):
+            if service.conf().own_states:
+                continue
             repos.append(service.conf().ecr_repo_name)
 
         return ECRConfigs(repositories=repos)
 
+    def get_ssm_prefix(self):
+        """Returns prefix for parameter store env vars of all project services."""
+        return f"/{self.environment.name}/{self.name}/"
+
+    def get_live_services(self):
+        return list(
+            self.services.select_related("project__environment").filter(
+                is_deleted=False
+            )
+        )
+
+    def iter_env_var_parameters(self, client, services=None):
+        """Yield pages of parameters of live services of the project, with values.
+
+        Parameters of all services are read with a single recursive query under
+        the project prefix and assigned to services by their prefix. Parameters
+        left behind by deleted services are skipped.
+        """
+        if services is None:
+            services = self.get_live_services()
+        service_prefixes = {service.get_ssm_prefix() for service in services}
+        for parameters in iter_parameters_by_path(client, self.get_ssm_prefix()):
+            yield [
+                param
+                for param in parameters
+                if get_parameter_prefix(param["Name"]) in service_prefixes
+            ]
+
+    def env_vars_pages(self):
+        """Paginate over env vars of all live services of the project.
+
+        Env vars are served from the cache when env vars of every service are
+        cached. Otherwise they are read from parameter store, and cached per
+        service once all pages were read.
+
+        Returns
+        -------
+        iterator of list of dict
+            env vars of the page, in the format of `Service.get_env_vars`
+        """
+        services = self.get_live_services()
+        cached = [get_cached_env_vars(service.id) for service in services]
+        if all(env_vars is not None for env_vars in cached):
+            return iter(
+                [
+                    sorted(
+                        itertools.chain.from_iterable(cached),
+                        key=lambda env_var: env_var["value_from"],
+                    )
+                ]
+            )
+
+        generations = {service.id: get_generation(service.id) for service in services}
+        client = get_boto3_client("ssm", self.environment.get_creds())
+        by_prefix = {service.get_ssm_prefix(): [] for service in services}
+
+        def pages():
+            for parameters in self.iter_env_var_parameters(client, services):
+                env_vars = [to_env_var(param, param) for param in parameters]
+                for env_var in env_vars:
+                    by_prefix[get_parameter_prefix(env_var["value_from"])].append(
+                        env_var
+                    )
+                yield env_vars
+
+            for service in services:
+                cache_env_vars(
+                    service.id,
+                    by_prefix[service.get_ssm_prefix()],
+                    generations[service.id],
+                )
+
+        return pages()
+
+    def get_env_var_parameters(self, client):
+        """Current env vars of all live services, with values, by parameter name."""
+        return {
+            param["Name"]: param
+            for parameters in self.iter_env_var_parameters(client)
+            for param in parameters
+        }
+
+    def get_env_var_writes(self, env_vars, is_secure=True):
+        """Writes of env vars, given by key name, to every live service."""
+        return [
+            write
+            for service in self.get_live_services()
+            for write in service.get_env_var_writes(env_vars, is_secure)
+        ]
+
+    def get_env_var_parameter_names(self, key_name):
+        """Parameter names of the env var in every live service."""
+        return [
+            f"{service.get_ssm_prefix()}{key_name}"
+            for service in self.get_live_services()
+        ]
+
+    def invalidate_env_vars(self):
+        """Drop cached env vars of all services of the project."""
+        invalidate_env_vars(self.services.values_list("id", flat=True))
+
     def get_ssh_key_name(self):
         return f"{self.name}_{self.environment.name}_{self.environment.slug}"
 
@@ -7,12 +7,23 @@ from django.db import models
 from fernet_fields import EncryptedTextField
 
 from aws_environments.constants import InfraStatus
+from aws_environments.env_vars_cache import (
+    cache_env_vars,
+    get_cached_env_vars,
+    get_generation,
+    invalidate_env_vars,
+)
 from common.models import BaseModel
+from infra_executors.alb import ALBListenerConfigs, HTTP
+from infra_executors.ecr import ECRConfigs
+from infra_executors.route53 import CnameRecordConfigs
+from infra_executors.ssm import ParameterWrite, fetch_parameter_values
+from infra_executors.timing import span
 from infra_executors.utils import get_boto3_client
 
 from .project import Project
 from .environment import Environment
-from .utils import BaseConf
+from .utils import BaseConf, to_env_var
 
 
 User = get_user_model()
@@ -25,6 +36,11 @@ class ServiceConf(BaseConf):
     ecr_repo_name: str = ""
     ecr_repo_url: str = ""
     target_group_arn: str = ""
+    # alb listener, cname and ecr repo are kept in terraform states of the
+    # service, otherwise they are part of project and environment states.
+    # Unset for services created before, which are not migrated, see
+    # infra_executors.ecs_service
+    own_states: bool = False
 
 
 class ServiceStatus(BaseModel):
@@ -116,6 +132,32 @@ class Service(BaseModel):
     def is_ready(self):
         return self.project.is_ready() and self.last_status.status == InfraStatus.ready
 
+    def get_alb_listener_conf(
+        self, alb_arn: str, alb_security_group_id: str
+    ) -> ALBListenerConfigs:
+        return ALBListenerConfigs(
+            alb_arn=alb_arn,
+            alb_security_group_id=alb_security_group_id,
+            name=self.name,
+            container_port=self.container_port,
+            alb_port_http=self.alb_port_http,
+            alb_port_https=self.alb_port_https,
+            health_check_endpoint=self.health_check_endpoint,
+            health_check_protocol=HTTP,
+            ssl_certificate_arn=self.conf().acm_arn,
+        )
+
+    def get_cname_conf(self) -> CnameRecordConfigs:
+        return CnameRecordConfigs(
+            zone_id=self.project.environment.conf().r53_zone_id,
+            domain=self.project.environment.domain,
+            subdomain=self.subdomain,
+            route_to=self.project.conf().alb_public_dns,
+        )
+
+    def get_ecr_conf(self) -> ECRConfigs:
+        return ECRConfigs(repositories=[self.conf().ecr_repo_name])
+
     def get_ssm_prefix(self):
         """Returns prefix for parameter store env vars."""
         return f"/{self.project.environment.name}/{self.project.name}/{self.name}/"
@@ -154,33 +196,79 @@ class Service(BaseModel):
             yield env_vars["Parameters"]
             get_more = next_token is not None
 
+    @span("ssm", "get_env_vars")
     def get_env_vars(self):
         """Get service env vars.
 
+        Values are fetched in batches, concurrently with listing of the next
+        page of env vars, and cached until env vars of the service are written
+        to, see `invalidate_env_vars`.
+
         Returns
         -------
         list of dict
         """
+        env_vars = get_cached_env_vars(self.id)
+        if env_vars is not None:
+            return env_vars
+
+        generation = get_generation(self.id)
         client = get_boto3_client("ssm", self.project.environment.get_creds())
         env_vars = []
-        for parameters in self.env_vars_generator(client):
-            for param in parameters:
-                param_details = client.get_parameter(
-                    Name=param["Name"], WithDecryption=True
-                )["Parameter"]
-                env_vars.append(
-                    dict(
-                        name=param["Name"].split("/")[-1],
-                        value_from=param["Name"],
-                        value=param_details["Value"],
-                        arn=param_details["ARN"],
-                        kind=param_details["Type"],
-                        last_modified=param["LastModifiedDate"],
-                    )
-                )
+        for param, param_details in fetch_parameter_values(
+            client, self.env_vars_generator(client)
+        ):
+            env_vars.append(to_env_var(param, param_details))
 
+        cache_env_vars(self.id, env_vars, generation)
         return env_vars
 
+    @span("ssm", "get_env_var_names")
+    def get_env_var_names(self):
+        """Get service env vars without their values.
+
+        Only parameter metadata is listed, values are never fetched or
+        decrypted, unless env vars are cached already.
+
+        Returns
+        -------
+        list of dict
+            name and value_from of every env var
+        """
+        env_vars = get_cached_env_vars(self.id)
+        if env_vars is None:
+            client = get_boto3_client("ssm", self.project.environment.get_creds())
+            env_vars = [
+                dict(name=param["Name"].split("/")[-1], value_from=param["Name"])
+                for params in self.env_vars_generator(client)
+                for param in params
+            ]
+
+        return [
+            dict(name=env_var["name"], value_from=env_var["value_from"])
+            for env_var in env_vars
+        ]
+
+    def invalidate_env_vars(self):
+        """Drop cached env vars, must be called after writing to them."""
+        invalidate_env_vars([self.id])
+
+    def get_env_var_parameters(self, client):
+        """Current env vars with values, by parameter name."""
+        return {
+            parameter["Name"]: parameter
+            for _, parameter in fetch_parameter_values(
+                client, self.env_vars_generator(client)
+            )
+        }
+
+    def get_env_var_writes(self, env_vars, is_secure=True):
+        """Writes of env vars, given by key name, to the service."""
+        return [
+            ParameterWrite(f"{self.get_ssm_prefix()}{key_name}", key_value, is_secure)
+            for key_name, key_value in env_vars.items()
+        ]
+
 
 class ServiceDeployment(BaseModel):
     """Manages service deployments."""
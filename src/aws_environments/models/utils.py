@@ -9,3 +9,28 @@ class BaseConf:
 
     def to_str(self):
         return json.dumps(asdict(self))
+
+
+def get_parameter_prefix(name):
+    """Prefix of the parameter, i.e. prefix of its service."""
+    return f"{name.rsplit('/', 1)[0]}/"
+
+
+def to_env_var(param, param_details):
+    """Env var as listed by the api.
+
+    Parameters
+    ----------
+    param : dict
+        parameter metadata, as listed by ssm
+    param_details : dict
+        parameter with its value
+    """
+    return dict(
+        name=param["Name"].split("/")[-1],
+        value_from=param["Name"],
+        value=param_details["Value"],
+        arn=param_details["ARN"],
+        kind=param_details["Type"],
+        last_modified=param["LastModifiedDate"],
+    )
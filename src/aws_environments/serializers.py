@@ -8,7 +8,9 @@ from aws_environments.models import (
     BuildWorker,
     Environment,
     EnvStatus,
+    ExecutionApiCall,
     ExecutionLog,
+    ExecutionResourceEvent,
     Project,
     ProjectStatus,
     Service,
@@ -82,6 +84,52 @@ class ExecutionLogSerializer(serializers.ModelSerializer):
         return obj.get_component_obj().slug
 
 
+class LogTailParamsSerializer(serializers.Serializer):
+    offset = serializers.IntegerField(min_value=0, default=0)
+    # seconds to wait for new output
+    wait = serializers.IntegerField(min_value=0, max_value=30, default=0)
+
+
+class ExecutionResourceEventSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ExecutionResourceEvent
+        fields = (
+            "executor",
+            "address",
+            "action",
+            "started_at",
+            "finished_at",
+            "duration",
+            "is_complete",
+        )
+
+
+class PhaseTimingSerializer(serializers.Serializer):
+    component = serializers.CharField()
+    action = serializers.CharField()
+    count = serializers.IntegerField()
+    # seconds
+    total = serializers.FloatField()
+    average = serializers.FloatField()
+    maximum = serializers.FloatField()
+    failures = serializers.IntegerField()
+
+
+class ExecutionApiCallSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ExecutionApiCall
+        fields = (
+            "service",
+            "operation",
+            "calls",
+            "retries",
+            "throttles",
+            "errors",
+            "total_duration",
+            "max_duration",
+        )
+
+
 class ProjectStatusSerializer(serializers.ModelSerializer):
     class Meta:
         model = ProjectStatus
@@ -91,6 +139,8 @@ class ProjectStatusSerializer(serializers.ModelSerializer):
 class ProjectSerializer(serializers.ModelSerializer):
     environment = EnvironmentSerializer(read_only=True)
     last_status = ProjectStatusSerializer(read_only=True)
+    # apply infra even if the same inputs were applied already
+    force = serializers.BooleanField(default=False, write_only=True)
 
     class Meta:
         model = Project
@@ -99,6 +149,7 @@ class ProjectSerializer(serializers.ModelSerializer):
             "name",
             "environment",
             "last_status",
+            "force",
         )
         read_only_fields = ("slug",)
 
@@ -109,6 +160,8 @@ class ServiceSerializer(serializers.ModelSerializer):
     alb_port_https = serializers.IntegerField(required=True)
     health_check_endpoint = serializers.CharField(max_length=100, required=True)
     ecr_repo_url = serializers.SerializerMethodField()
+    # apply infra even if the same inputs were applied already
+    force = serializers.BooleanField(default=False, write_only=True)
 
     class Meta:
         model = Service
@@ -124,6 +177,7 @@ class ServiceSerializer(serializers.ModelSerializer):
             "has_web_interface",
             "default_dockerfile_path",
             "default_dockerfile_target",
+            "force",
         )
         read_only_fields = ("slug",)
 
@@ -185,6 +239,19 @@ class EnvironmentVariableSerializer(serializers.Serializer):
     is_secret = serializers.BooleanField(default=True)
 
 
+class EnvironmentVariablesSyncSerializer(serializers.Serializer):
+    env_vars = serializers.DictField(child=serializers.CharField())
+    is_secret = serializers.BooleanField(default=True)
+    # delete env vars which are not listed
+    prune = serializers.BooleanField(default=False)
+
+    def validate_env_vars(self, value):
+        invalid = [key_name for key_name in value if not key_name or "/" in key_name]
+        if invalid:
+            raise serializers.ValidationError(f"Invalid key names: {invalid}")
+        return value
+
+
 class CreateDatabaseSerializer(serializers.ModelSerializer):
     username = serializers.CharField()
     engine = serializers.ChoiceField(choices=[Resource.EngineTypes.postgres])
@@ -0,0 +1,459 @@
+import json
+import tempfile
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from aws_environments.constants import InfraStatus
+from aws_environments.env_vars_cache import get_cached_env_vars
+from aws_environments.jobs import write_env_vars
+from aws_environments.jobs.service import remove_env_vars
+from aws_environments.models import ExecutionLog
+from aws_environments.models import service as service_model
+from aws_environments.models.environment import EnvironmentConf
+from aws_environments.tests.factories import (
+    EnvironmentFactory,
+    ProjectFactory,
+    ServiceFactory,
+)
+from benchmarks.fake_aws import FakeSsm, client_error
+from infra_executors.clients_cache import ClientsCache
+from users.tests.factories import UserFactory
+
+TEST_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "env_vars": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "env-vars-tests",
+    },
+}
+
+THROTTLED = client_error("PutParameter", "ThrottlingException", "Rate exceeded")
+
+
+@override_settings(CACHES=TEST_CACHES)
+class EnvVarsTestCase(APITestCase):
+    """Env vars of a project with 3 services, in an in memory parameter store."""
+
+    def setUp(self) -> None:
+        self.user = UserFactory()
+        self.client.login(username=self.user.email, password="Aa123ewq!")
+        self.environment = EnvironmentFactory(
+            organization=self.user.organization,
+            name="dev",
+            configuration=EnvironmentConf(
+                access_key_id="key", access_key_secret="secret"
+            ).to_str(),
+        )
+        self.project = ProjectFactory(
+            organization=self.user.organization,
+            environment=self.environment,
+            name="shop",
+        )
+        self.project.set_status(InfraStatus.ready)
+        self.services = [
+            ServiceFactory(
+                organization=self.user.organization,
+                environment=self.environment,
+                project=self.project,
+                name=name,
+                subdomain=name,
+            )
+            for name in ("api", "web", "worker")
+        ]
+
+        self.ssm = FakeSsm(self.environment.region)
+        logs_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(logs_dir.cleanup)
+        for patcher in (
+            mock.patch("aws_environments.jobs.env_vars.EXEC_LOGS_DIR", logs_dir.name),
+            mock.patch("infra_executors.timing.EXEC_LOGS_DIR", logs_dir.name),
+            mock.patch(
+                "infra_executors.utils._create_boto3_client", return_value=self.ssm
+            ),
+            mock.patch("infra_executors.utils.CLIENTS_CACHE", ClientsCache()),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        caches["env_vars"].clear()
+
+    def put(self, name, value, kind="SecureString"):
+        self.ssm.put_parameter(Name=name, Value=value, Type=kind)
+
+    def parameters(self):
+        return {
+            name: (parameter["Value"], parameter["Type"])
+            for name, parameter in self.ssm.parameters.items()
+        }
+
+    def service_url(self, service, name="service_env_vars"):
+        return reverse(f"api:aws_env:{name}", args=(service.slug,))
+
+    def project_url(self, name="project_env_vars"):
+        return reverse(f"api:aws_env:{name}", args=(self.project.slug,))
+
+
+class ProjectCreateEnvVarTestCase(EnvVarsTestCase):
+    payload = dict(key_name="DEBUG", key_value="false", is_secret=True)
+
+    def test_writes_to_every_service(self):
+        resp = self.client.post(self.project_url(), self.payload, format="json")
+
+        self.assertEqual(resp.status_code, 201)
+        names = [f"/dev/shop/{name}/DEBUG" for name in ("api", "web", "worker")]
+        self.assertEqual(sorted(resp.json()), names)
+        self.assertEqual(
+            self.parameters(), {name: ("false", "SecureString") for name in names}
+        )
+
+    def test_skips_deleted_services(self):
+        self.services[0].is_deleted = True
+        self.services[0].save()
+
+        resp = self.client.post(self.project_url(), self.payload, format="json")
+
+        self.assertEqual(resp.status_code, 201)
+        self.assertNotIn("/dev/shop/api/DEBUG", self.parameters())
+
+    def test_reports_failed_writes(self):
+        with mock.patch.object(FakeSsm, "put_parameter", side_effect=THROTTLED):
+            resp = self.client.post(self.project_url(), self.payload, format="json")
+
+        self.assertEqual(resp.status_code, 502)
+        self.assertEqual(
+            {result["error"] for result in resp.json()["results"]},
+            {"ThrottlingException"},
+        )
+
+    def test_async_writes_same_parameters(self):
+        resp = self.client.post(self.project_url(), self.payload, format="json")
+        self.assertEqual(resp.status_code, 201)
+        written_inline = self.parameters()
+        self.ssm.parameters.clear()
+
+        with mock.patch(
+            "aws_environments.views.env_vars.ASYNC_WRITES_THRESHOLD", 0
+        ), mock.patch.object(write_env_vars, "delay", side_effect=write_env_vars):
+            resp = self.client.post(
+                self.project_url(), dict(self.payload, unknown="x"), format="json"
+            )
+
+        self.assertEqual(resp.status_code, 202)
+        exec_log = ExecutionLog.objects.get(slug=resp.json()["log"])
+        self.assertTrue(exec_log.is_success)
+        self.assertEqual(
+            exec_log.get_params(),
+            dict(key_name="DEBUG", key_value="false", is_secure=True),
+        )
+        self.assertEqual(self.parameters(), written_inline)
+
+    def test_rejects_invalid_payload(self):
+        resp = self.client.post(
+            self.project_url(), dict(key_name="DEBUG"), format="json"
+        )
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(ExecutionLog.objects.count(), 0)
+        self.assertEqual(self.parameters(), {})
+
+
+class ProjectListEnvVarsTestCase(EnvVarsTestCase):
+    def test_lists_env_vars_of_live_services(self):
+        self.put("/dev/shop/api/DEBUG", "false")
+        self.put("/dev/shop/web/DEBUG", "true", "String")
+        # left behind by a deleted service and of another project
+        self.put("/dev/shop/old/DEBUG", "false")
+        self.put("/dev/other/api/DEBUG", "false")
+
+        resp = self.client.get(self.project_url())
+
+        self.assertEqual(resp.status_code, 200)
+        env_vars = json.loads(b"".join(resp.streaming_content))
+        self.assertEqual(
+            [
+                (env_var["name"], env_var["value_from"], env_var["value"])
+                for env_var in env_vars
+            ],
+            [
+                ("DEBUG", "/dev/shop/api/DEBUG", "false"),
+                ("DEBUG", "/dev/shop/web/DEBUG", "true"),
+            ],
+        )
+
+
+class ServiceSyncEnvVarsTestCase(EnvVarsTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.put("/dev/shop/api/SAME", "1")
+        self.put("/dev/shop/api/CHANGED", "1")
+        self.put("/dev/shop/api/EXTRA", "1")
+        self.put("/dev/shop/web/OTHER", "1")
+        self.payload = dict(env_vars=dict(SAME="1", CHANGED="2", NEW="3"))
+
+    def sync(self, payload):
+        return self.client.put(
+            self.service_url(self.services[0], "service_env_vars_sync"),
+            payload,
+            format="json",
+        )
+
+    def test_writes_only_differences(self):
+        resp = self.sync(self.payload)
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(
+            resp.json(),
+            dict(
+                added=["/dev/shop/api/NEW"],
+                changed=["/dev/shop/api/CHANGED"],
+                deleted=[],
+                unchanged=1,
+                failed=[],
+            ),
+        )
+        self.assertEqual(
+            self.parameters(),
+            {
+                "/dev/shop/api/SAME": ("1", "SecureString"),
+                "/dev/shop/api/CHANGED": ("2", "SecureString"),
+                "/dev/shop/api/NEW": ("3", "SecureString"),
+                "/dev/shop/api/EXTRA": ("1", "SecureString"),
+                "/dev/shop/web/OTHER": ("1", "SecureString"),
+            },
+        )
+
+    def test_unchanged_sync_writes_nothing(self):
+        self.sync(self.payload)
+
+        with mock.patch.object(FakeSsm, "put_parameter") as put_parameter:
+            resp = self.sync(self.payload)
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()["unchanged"], 3)
+        put_parameter.assert_not_called()
+
+    def test_prune(self):
+        resp = self.sync(dict(self.payload, prune=True))
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()["deleted"], ["/dev/shop/api/EXTRA"])
+        self.assertNotIn("/dev/shop/api/EXTRA", self.parameters())
+        self.assertIn("/dev/shop/web/OTHER", self.parameters())
+
+    def test_plain_strings(self):
+        self.sync(dict(env_vars=dict(NEW="3"), is_secret=False))
+
+        self.assertEqual(self.parameters()["/dev/shop/api/NEW"], ("3", "String"))
+
+    def test_reports_failed_writes(self):
+        with mock.patch.object(FakeSsm, "put_parameter", side_effect=THROTTLED):
+            resp = self.sync(self.payload)
+
+        self.assertEqual(resp.status_code, 502)
+        self.assertEqual(
+            sorted(result["name"] for result in resp.json()["failed"]),
+            ["/dev/shop/api/CHANGED", "/dev/shop/api/NEW"],
+        )
+
+    def test_rejects_invalid_key_names(self):
+        resp = self.sync(dict(env_vars={"A/B": "1", "": "2"}))
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(self.parameters()["/dev/shop/api/CHANGED"][0], "1")
+
+
+class ProjectSyncEnvVarsTestCase(EnvVarsTestCase):
+    def sync(self, payload):
+        return self.client.put(
+            self.project_url("project_env_vars_sync"), payload, format="json"
+        )
+
+    def test_syncs_every_service(self):
+        self.put("/dev/shop/api/DEBUG", "true")
+        self.put("/dev/shop/web/DEBUG", "false")
+        self.put("/dev/shop/worker/EXTRA", "1")
+
+        resp = self.sync(dict(env_vars=dict(DEBUG="false"), prune=True))
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(
+            resp.json(),
+            dict(
+                added=["/dev/shop/worker/DEBUG"],
+                changed=["/dev/shop/api/DEBUG"],
+                deleted=["/dev/shop/worker/EXTRA"],
+                unchanged=1,
+                failed=[],
+            ),
+        )
+        self.assertEqual(
+            self.parameters(),
+            {
+                f"/dev/shop/{name}/DEBUG": ("false", "SecureString")
+                for name in ("api", "web", "worker")
+            },
+        )
+
+    def test_unchanged_sync_writes_nothing(self):
+        payload = dict(env_vars=dict(DEBUG="false"))
+        self.sync(payload)
+
+        with mock.patch.object(FakeSsm, "put_parameter") as put_parameter:
+            resp = self.sync(payload)
+
+        self.assertEqual(resp.json()["unchanged"], 3)
+        put_parameter.assert_not_called()
+
+
+class EnvVarsCacheTestCase(EnvVarsTestCase):
+    """Every write to env vars drops cached env vars of the services written to."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        for service in self.services:
+            self.put(f"{service.get_ssm_prefix()}DEBUG", "false")
+        self.payload = dict(key_name="DEBUG", key_value="true", is_secret=True)
+
+    def cache_all(self):
+        for service in self.services:
+            service.get_env_vars()
+        self.assertEqual(self.cached_services(), ["api", "web", "worker"])
+
+    def cached_services(self):
+        return [
+            service.name
+            for service in self.services
+            if get_cached_env_vars(service.id) is not None
+        ]
+
+    def test_get_env_vars_is_cached(self):
+        env_vars = self.services[0].get_env_vars()
+
+        with mock.patch.object(FakeSsm, "describe_parameters") as describe:
+            self.assertEqual(self.services[0].get_env_vars(), env_vars)
+        describe.assert_not_called()
+
+    def test_project_list_is_cached(self):
+        resp = self.client.get(self.project_url())
+        listed = b"".join(resp.streaming_content)
+        self.assertEqual(self.cached_services(), ["api", "web", "worker"])
+
+        with mock.patch.object(FakeSsm, "get_parameters_by_path") as get_by_path:
+            resp = self.client.get(self.project_url())
+            self.assertEqual(b"".join(resp.streaming_content), listed)
+        get_by_path.assert_not_called()
+
+    def test_values_read_before_a_write_are_not_served(self):
+        service = self.services[0]
+        fetch_parameter_values = service_model.fetch_parameter_values
+
+        def fetch_then_write(client, pages):
+            values = list(fetch_parameter_values(client, pages))
+            # write lands after the reader fetched its values
+            self.client.post(self.service_url(service), self.payload, format="json")
+            return values
+
+        with mock.patch.object(
+            service_model, "fetch_parameter_values", side_effect=fetch_then_write
+        ):
+            (stale,) = service.get_env_vars()
+
+        self.assertEqual(stale["value"], "false")
+        self.assertEqual(self.cached_services(), [])
+        (env_var,) = service.get_env_vars()
+        self.assertEqual(env_var["value"], "true")
+
+    def test_service_create(self):
+        self.cache_all()
+
+        self.client.post(
+            self.service_url(self.services[0]), self.payload, format="json"
+        )
+
+        self.assertEqual(self.cached_services(), ["web", "worker"])
+
+    def test_service_destroy(self):
+        self.cache_all()
+
+        resp = self.client.delete(
+            self.service_url(self.services[0]), dict(key_name="DEBUG"), format="json"
+        )
+
+        self.assertEqual(resp.status_code, 204)
+        self.assertEqual(self.cached_services(), ["web", "worker"])
+
+    def test_service_sync(self):
+        self.cache_all()
+
+        self.client.put(
+            self.service_url(self.services[0], "service_env_vars_sync"),
+            dict(env_vars=dict(DEBUG="true")),
+            format="json",
+        )
+
+        self.assertEqual(self.cached_services(), ["web", "worker"])
+
+    def test_unchanged_sync_keeps_cache(self):
+        self.cache_all()
+
+        self.client.put(
+            self.service_url(self.services[0], "service_env_vars_sync"),
+            dict(env_vars=dict(DEBUG="false")),
+            format="json",
+        )
+
+        self.assertEqual(self.cached_services(), ["api", "web", "worker"])
+
+    def test_project_create(self):
+        self.cache_all()
+
+        self.client.post(self.project_url(), self.payload, format="json")
+
+        self.assertEqual(self.cached_services(), [])
+
+    def test_project_destroy(self):
+        self.cache_all()
+
+        resp = self.client.delete(
+            self.project_url(), dict(key_name="DEBUG"), format="json"
+        )
+
+        self.assertEqual(resp.status_code, 204)
+        self.assertEqual(self.parameters(), {})
+        self.assertEqual(self.cached_services(), [])
+
+    def test_project_sync(self):
+        self.cache_all()
+
+        self.client.put(
+            self.project_url("project_env_vars_sync"),
+            dict(env_vars=dict(DEBUG="true")),
+            format="json",
+        )
+
+        self.assertEqual(self.cached_services(), [])
+
+    def test_write_env_vars_job(self):
+        exec_log = ExecutionLog.register(
+            self.user.organization,
+            ExecutionLog.ActionTypes.update,
+            dict(key_name="DEBUG", key_value="true", is_secure=True),
+            ExecutionLog.Components.project,
+            self.project.id,
+        )
+        self.cache_all()
+
+        self.assertTrue(write_env_vars(self.project.id, exec_log.id))
+
+        self.assertEqual(self.cached_services(), [])
+
+    def test_remove_env_vars(self):
+        self.cache_all()
+
+        remove_env_vars(self.services[0])
+
+        self.assertNotIn("/dev/shop/api/DEBUG", self.parameters())
+        self.assertEqual(self.cached_services(), ["web", "worker"])
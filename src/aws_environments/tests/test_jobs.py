@@ -0,0 +1,178 @@
+from unittest import mock
+
+import boto3
+from botocore.stub import Stubber
+from django.test import SimpleTestCase, TestCase
+from kombu.common import Broadcast
+
+from aws_environments.constants import InfraStatus
+from aws_environments.jobs import create_project_infra, maintenance
+from aws_environments.jobs.utils import timed_job
+from aws_environments.models import ExecutionLog
+from aws_environments.models.environment import EnvironmentConf
+from aws_environments.tests.factories import EnvironmentFactory, ProjectFactory
+from control_center.scheduler import RETENTION_INTERVAL_SECONDS, app
+from infra_executors.api_calls import count_api_calls
+from organizations.tests.factories import OrganizationFactory
+
+
+class TimedJobTestCase(TestCase):
+    def setUp(self) -> None:
+        self.exec_log = ExecutionLog.register(
+            OrganizationFactory(),
+            ExecutionLog.ActionTypes.update,
+            {},
+            ExecutionLog.Components.service,
+            None,
+        )
+        self.ssm = boto3.client(
+            "ssm",
+            region_name="us-east-1",
+            aws_access_key_id="test",
+            aws_secret_access_key="test",
+        )
+        count_api_calls(self.ssm)
+        self.stubber = Stubber(self.ssm)
+        self.stubber.activate()
+        self.addCleanup(self.stubber.deactivate)
+
+    def stub_get_parameter(self):
+        self.stubber.add_response(
+            "get_parameter",
+            {"Parameter": {"Name": "/dev/api/web/KEY", "Value": "1", "Type": "String"}},
+        )
+
+    def stored_calls(self):
+        return {
+            (call.service, call.operation): call.calls
+            for call in self.exec_log.api_calls.all()
+        }
+
+    def test_stores_api_calls(self):
+        @timed_job
+        def job(exec_log_id):
+            self.ssm.get_parameter(Name="/dev/api/web/KEY")
+            return True
+
+        self.stub_get_parameter()
+        self.assertTrue(job(self.exec_log.id))
+        self.assertEqual(self.stored_calls(), {("ssm", "GetParameter"): 1})
+
+    def test_nested_jobs_of_same_execution(self):
+        @timed_job
+        def inner_job(exec_log_id):
+            self.ssm.get_parameter(Name="/dev/api/web/KEY")
+
+        @timed_job
+        def outer_job(exec_log_id):
+            self.ssm.describe_parameters()
+            inner_job(exec_log_id)
+            inner_job(exec_log_id)
+
+        self.stubber.add_response("describe_parameters", {"Parameters": []})
+        self.stub_get_parameter()
+        self.stub_get_parameter()
+        outer_job(self.exec_log.id)
+
+        self.assertEqual(
+            self.stored_calls(),
+            {("ssm", "DescribeParameters"): 1, ("ssm", "GetParameter"): 2},
+        )
+
+    def test_stores_api_calls_of_failed_job(self):
+        @timed_job
+        def job(exec_log_id):
+            self.ssm.get_parameter(Name="/dev/api/web/KEY")
+            raise RuntimeError("failed")
+
+        self.stub_get_parameter()
+        with self.assertRaises(RuntimeError):
+            job(self.exec_log.id)
+        self.assertEqual(self.stored_calls(), {("ssm", "GetParameter"): 1})
+
+
+class CreateProjectInfraTestCase(TestCase):
+    def setUp(self) -> None:
+        organization = OrganizationFactory()
+        self.project = ProjectFactory(
+            organization=organization,
+            environment=EnvironmentFactory(
+                organization=organization,
+                name="dev",
+                configuration=EnvironmentConf(
+                    access_key_id="key", access_key_secret="secret", vpc_id="vpc-1"
+                ).to_str(),
+            ),
+            name="shop",
+        )
+        alb = dict(
+            alb_name=dict(value="shop-dev"), public_dns=dict(value="shop.example.com")
+        )
+        ecs = dict(cluster=dict(value="shop"), ecs_executor_role_arn=dict(value="arn"))
+        patcher = mock.patch(
+            "aws_environments.jobs.project.launch_project_infra",
+            return_value=(alb, ecs),
+        )
+        self.launch_project_infra = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_job(self, params):
+        exec_log = ExecutionLog.register(
+            self.project.organization,
+            ExecutionLog.ActionTypes.create,
+            params,
+            ExecutionLog.Components.project,
+            self.project.id,
+        )
+        self.assertTrue(create_project_infra(self.project.id, exec_log.id))
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.last_status.status, InfraStatus.ready)
+        (_, _, force), _ = self.launch_project_infra.call_args
+        return force
+
+    def test_not_forced(self):
+        self.assertFalse(self.run_job(dict(name="shop")))
+
+    def test_forced(self):
+        self.assertTrue(self.run_job(dict(name="shop", force=True)))
+
+
+class ArtifactsRetentionTestCase(SimpleTestCase):
+    def test_scheduled_to_workers_of_every_node(self):
+        entry = app.conf.beat_schedule["apply-artifacts-retention"]
+        (queue,) = [
+            queue
+            for queue in app.conf.task_queues
+            if queue.exchange.name == entry["options"]["exchange"]
+        ]
+
+        self.assertEqual(
+            app.tasks[entry["task"]].name, maintenance.apply_artifacts_retention.name
+        )
+        self.assertIsInstance(queue, Broadcast)
+        self.assertEqual(entry["schedule"], RETENTION_INTERVAL_SECONDS)
+
+
+class ApplyArtifactsRetentionTestCase(TestCase):
+    @mock.patch.object(maintenance, "apply_retention", return_value={"logs": 1})
+    def test_logs_of_running_executions_are_not_compressed(self, apply_retention):
+        organization = OrganizationFactory()
+        running = ExecutionLog.register(
+            organization,
+            ExecutionLog.ActionTypes.create,
+            {},
+            ExecutionLog.Components.project,
+            1,
+        )
+        ended = ExecutionLog.register(
+            organization,
+            ExecutionLog.ActionTypes.create,
+            {},
+            ExecutionLog.Components.project,
+            1,
+        )
+        ended.mark_result(True)
+
+        self.assertEqual(maintenance.apply_artifacts_retention(), {"logs": 1})
+
+        apply_retention.assert_called_once_with({str(running.id)})
@@ -0,0 +1,40 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from aws_environments.models import ExecutionLog
+from aws_environments.models import execution_log
+from infra_executors.timing import Span
+from organizations.tests.factories import OrganizationFactory
+
+SPAN = Span("terraform:alb", "plan", 1000.0, 2.5, True)
+
+
+class MarkResultTestCase(TestCase):
+    def setUp(self) -> None:
+        self.exec_log = ExecutionLog.register(
+            OrganizationFactory(),
+            ExecutionLog.ActionTypes.update,
+            {},
+            ExecutionLog.Components.service,
+            None,
+        )
+
+    @mock.patch.object(execution_log, "read_spans", return_value=[SPAN])
+    def test_stores_spans(self, _):
+        self.exec_log.mark_result(True)
+
+        (span,) = self.exec_log.spans.all()
+        self.assertEqual(span.to_span(), SPAN)
+        self.assertIsNotNone(span.created_at)
+
+    @mock.patch.object(execution_log, "read_spans", return_value=[SPAN])
+    @mock.patch.object(execution_log, "read_resource_events", side_effect=OSError)
+    def test_failing_diagnostics_dont_fail_result(self, *_):
+        with self.assertLogs(execution_log.logger, "ERROR"):
+            self.exec_log.mark_result(False)
+
+        self.exec_log.refresh_from_db()
+        self.assertFalse(self.exec_log.is_success)
+        self.assertIsNotNone(self.exec_log.ended_at)
+        self.assertEqual(self.exec_log.spans.count(), 1)
@@ -1,4 +1,5 @@
 import json
+from unittest import mock
 
 from django.urls import reverse
 from rest_framework.test import APITestCase
@@ -7,6 +8,7 @@ from aws_environments.constants import InfraStatus
 from aws_environments.models import (
     Environment,
     ExecutionLog,
+    Project,
     Service,
 )
 from aws_environments.tests.factories import (
@@ -125,6 +127,35 @@ class ListEnvServicesTestCase(APITestCase):
         self.assertEqual(resp.json()[0]["slug"], service.slug)
 
 
+class CreateProjectTestCase(APITestCase):
+    def setUp(self) -> None:
+        self.user = UserFactory()
+        self.env = EnvironmentFactory(organization=self.user.organization)
+        self.env.set_status(InfraStatus.ready, None)
+        self.client.login(username=self.user.email, password="Aa123ewq!")
+        self.url = reverse("api:aws_env:projects", args=(self.env.slug,))
+
+    @mock.patch("aws_environments.views.project.create_project_infra.delay")
+    def test_not_forced_by_default(self, create_project_infra):
+        resp = self.client.post(self.url, dict(name="shop"), format="json")
+
+        self.assertEqual(resp.status_code, 201)
+        self.assertNotIn("force", resp.json()["project"])
+        exec_log = ExecutionLog.objects.get(slug=resp.json()["log"])
+        self.assertEqual(exec_log.get_params(), dict(name="shop", force=False))
+        create_project_infra.assert_called_once_with(
+            Project.objects.get().id, exec_log.id
+        )
+
+    @mock.patch("aws_environments.views.project.create_project_infra.delay")
+    def test_forced(self, _):
+        resp = self.client.post(self.url, dict(name="shop", force=True), format="json")
+
+        self.assertEqual(resp.status_code, 201)
+        exec_log = ExecutionLog.objects.get(slug=resp.json()["log"])
+        self.assertTrue(exec_log.get_params()["force"])
+
+
 # class CreateListProjectTestCase(APITestCase):
 #     def setUp(self) -> None:
 #         self.user = UserFactory()
@@ -14,7 +14,12 @@ from aws_environments.views import (
     EnvironmentList,
     EnvironmentListServices,
     EnvironmentVariables,
+    ExecutionApiCallsView,
     ExecutionLogDetailsView,
+    ExecutionLogsView,
+    ExecutionLogTailView,
+    ExecutionResourceEventsView,
+    ExecutionTimingView,
     ProjectEnvironmentVariables,
     ProjectResources,
     RemoveStaticsBucket,
@@ -60,6 +65,11 @@ urlpatterns = [
         ),
         name="project_env_vars",
     ),
+    path(
+        "project/<slug:project_slug>/environment-variables/sync",
+        ProjectEnvironmentVariables.as_view({"put": "sync"}),
+        name="project_env_vars_sync",
+    ),
     path(
         "project/<slug:project_slug>/resources/",
         ProjectResources.as_view({"get": "list"}),
@@ -87,12 +97,40 @@ urlpatterns = [
         ),
         name="service_env_vars",
     ),
+    path(
+        "service/<slug:slug>/environment-variables/sync",
+        EnvironmentVariables.as_view({"put": "sync"}),
+        name="service_env_vars_sync",
+    ),
     path("worker/<slug:slug>", WorkerDetails.as_view(), name="worker"),
     path(
         "execution/status/<slug:slug>",
         ExecutionLogDetailsView.as_view(),
         name="execution_log_details",
     ),
+    path(
+        "execution/<slug:slug>/resources",
+        ExecutionResourceEventsView.as_view(),
+        name="execution_resource_events",
+    ),
+    path(
+        "execution/<slug:slug>/timing",
+        ExecutionTimingView.as_view(),
+        name="execution_timing",
+    ),
+    path(
+        "execution/<slug:slug>/api-calls",
+        ExecutionApiCallsView.as_view(),
+        name="execution_api_calls",
+    ),
+    path(
+        "execution/<slug:slug>/logs", ExecutionLogsView.as_view(), name="execution_logs"
+    ),
+    path(
+        "execution/<slug:slug>/logs/<str:name>",
+        ExecutionLogTailView.as_view(),
+        name="execution_log_tail",
+    ),
     path(
         "resource/<slug:slug>",
         Resources.as_view({"get": "retrieve"}),
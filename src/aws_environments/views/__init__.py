@@ -4,7 +4,14 @@ from .build_worker import CreateWorker, WorkerDetails
 from .deployment import DeployService
 from .env_vars import EnvironmentVariables, ProjectEnvironmentVariables
 from .environment import EnvironmentCreate, EnvironmentList, EnvironmentListServices
-from .execution_log import ExecutionLogDetailsView
+from .execution_log import (
+    ExecutionApiCallsView,
+    ExecutionLogDetailsView,
+    ExecutionLogsView,
+    ExecutionLogTailView,
+    ExecutionResourceEventsView,
+    ExecutionTimingView,
+)
 from .project import CreateListProject
 from .service import CreateListUpdateServices, AddDB
 from .resource import (
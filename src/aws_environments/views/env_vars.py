@@ -1,17 +1,76 @@
+import itertools
 import logging
 
+from django.http import StreamingHttpResponse
 from rest_framework import status
 from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
 from rest_framework.viewsets import ModelViewSet
 
 from aws_environments.constants import InfraStatus
-from aws_environments.models import Project, Service
-from aws_environments.serializers import EnvironmentVariableSerializer
+from aws_environments.jobs import write_env_vars
+from aws_environments.models import ExecutionLog, Project, Service
+from aws_environments.serializers import (
+    EnvironmentVariableSerializer,
+    EnvironmentVariablesSyncSerializer,
+)
+from infra_executors.ssm import (
+    delete_parameters,
+    diff_parameters,
+    get_writes_limiter,
+    put_parameters,
+)
 from infra_executors.utils import get_boto3_client
 
 logger = logging.getLogger(__name__)
 
+# writes to more services than this run in the background
+ASYNC_WRITES_THRESHOLD = 10
+
+
+def stream_json_list(pages):
+    """Encode pages of items as a single json list, a page at a time."""
+    encoder = JSONEncoder()
+    separator = ""
+    yield "["
+    for page in pages:
+        for item in page:
+            yield separator + encoder.encode(item)
+            separator = ","
+    yield "]"
+
+
+def apply_env_vars_diff(owner, client, limiter, diff):
+    """Apply writes and deletes of the diff and respond with what was done.
+
+    Cached env vars of the owner, service or project, are dropped after any
+    write.
+    """
+    logger.info(
+        "Syncing env vars added=%s changed=%s deleted=%s unchanged=%s",
+        len(diff.added),
+        len(diff.changed),
+        len(diff.deleted),
+        len(diff.unchanged),
+    )
+    results = put_parameters(client, diff.added + diff.changed, limiter)
+    results += delete_parameters(client, diff.deleted, limiter)
+    if results:
+        owner.invalidate_env_vars()
+    failed = [result._asdict() for result in results if not result.is_success]
+
+    return Response(
+        dict(
+            added=[write.name for write in diff.added],
+            changed=[write.name for write in diff.changed],
+            deleted=diff.deleted,
+            unchanged=len(diff.unchanged),
+            failed=failed,
+        ),
+        status=status.HTTP_502_BAD_GATEWAY if failed else status.HTTP_200_OK,
+    )
+
 
 class EnvironmentVariables(ModelViewSet):
     serializer_class = EnvironmentVariableSerializer
@@ -40,6 +99,7 @@ class EnvironmentVariables(ModelViewSet):
             Overwrite=True,
         )
         # fmt: on
+        service.invalidate_env_vars()
 
         headers = self.get_success_headers(serializer.data)
         return Response(
@@ -50,6 +110,24 @@ class EnvironmentVariables(ModelViewSet):
         service = self.get_object()
         return Response(service.get_env_vars())
 
+    def sync(self, request, *args, **kwargs):
+        """Make env vars of the service match the given key/value document."""
+        serializer = EnvironmentVariablesSyncSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        service = self.get_object()
+
+        creds = service.project.environment.get_creds()
+        client = get_boto3_client("ssm", creds)
+        diff = diff_parameters(
+            service.get_env_var_parameters(client),
+            service.get_env_var_writes(
+                serializer.validated_data["env_vars"],
+                serializer.validated_data["is_secret"],
+            ),
+            serializer.validated_data["prune"],
+        )
+        return apply_env_vars_diff(service, client, get_writes_limiter(creds), diff)
+
     def destroy(self, request, *args, **kwargs):
         if not request.data["key_name"]:
             return Response(
@@ -63,6 +141,7 @@ class EnvironmentVariables(ModelViewSet):
         key_name = f"{service.get_ssm_prefix()}{request.data['key_name']}"
         try:
             client.delete_parameter(Name=key_name)
+            service.invalidate_env_vars()
             return Response(status=status.HTTP_204_NO_CONTENT)
         except Exception:
             logger.exception("Failed to delete env vars: %s", key_name)
@@ -99,55 +178,118 @@ class ProjectEnvironmentVariables(ModelViewSet):
         serializer.is_valid(raise_exception=True)
         project = self.get_object()
 
-        client = get_boto3_client("ssm", project.environment.get_creds())
-        added_keys = []
-        for service in project.services.filter(is_deleted=False):
-            key_name = (
-                f"{service.get_ssm_prefix()}{serializer.validated_data['key_name']}"
-            )
-
-            logger.info("Adding new variable: %s service_id=%s", key_name, service.id)
+        params = dict(
+            key_name=serializer.validated_data["key_name"],
+            key_value=serializer.validated_data["key_value"],
+            is_secure=serializer.validated_data.get("is_secure", True),
+        )
+        writes = project.get_env_var_writes(
+            {params["key_name"]: params["key_value"]}, params["is_secure"]
+        )
+        headers = self.get_success_headers(serializer.data)
 
-            client.put_parameter(
-                Name=key_name,
-                Value=serializer.validated_data["key_value"],
-                Type="SecureString"
-                if serializer.validated_data.get("is_secure", True)
-                else "String",
-                Overwrite=True,
+        if len(writes) > ASYNC_WRITES_THRESHOLD:
+            # the job writes the validated params, as they would be written here
+            exec_log = ExecutionLog.register(
+                self.request.user.organization,
+                ExecutionLog.ActionTypes.update,
+                params,
+                ExecutionLog.Components.project,
+                project.id,
+            )
+            write_env_vars.delay(project.id, exec_log.id)
+            return Response(
+                dict(log=exec_log.slug),
+                status=status.HTTP_202_ACCEPTED,
+                headers=headers,
             )
 
-            added_keys.append(key_name)
+        creds = project.environment.get_creds()
+        logger.info(
+            "Adding new variables: %s project_id=%s",
+            [write.name for write in writes],
+            project.id,
+        )
+        results = put_parameters(
+            get_boto3_client("ssm", creds), writes, get_writes_limiter(creds)
+        )
+        project.invalidate_env_vars()
+        if not all(result.is_success for result in results):
+            return Response(
+                dict(
+                    detail="Failed to add env var to some services.",
+                    results=[result._asdict() for result in results],
+                ),
+                status=status.HTTP_502_BAD_GATEWAY,
+            )
 
-        headers = self.get_success_headers(serializer.data)
+        added_keys = [result.name for result in results]
         return Response(added_keys, status=status.HTTP_201_CREATED, headers=headers)
 
     def list(self, request, *args, **kwargs):
+        """Stream env vars of all services of the project, page by page."""
         project = self.get_object()
-        env_vars = []
-        for service in project.services.all():
-            env_vars.extend(service.get_env_vars())
-        return Response(env_vars)
+        pages = project.env_vars_pages()
+        # errors of the first page are still reported with an error status
+        first_page = next(pages, [])
+        return StreamingHttpResponse(
+            stream_json_list(itertools.chain([first_page], pages)),
+            content_type="application/json",
+        )
+
+    def sync(self, request, *args, **kwargs):
+        """Make env vars of all project services match the given document."""
+        serializer = EnvironmentVariablesSyncSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        project = self.get_object()
+
+        creds = project.environment.get_creds()
+        client = get_boto3_client("ssm", creds)
+        diff = diff_parameters(
+            project.get_env_var_parameters(client),
+            project.get_env_var_writes(
+                serializer.validated_data["env_vars"],
+                serializer.validated_data["is_secret"],
+            ),
+            serializer.validated_data["prune"],
+        )
+        return apply_env_vars_diff(project, client, get_writes_limiter(creds), diff)
 
     def destroy(self, request, *args, **kwargs):
+        """Delete the env var from every service of the project."""
         if not request.data["key_name"]:
             return Response(
                 data=dict(detail="Must provide key name"),
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        service = self.get_object()
-        client = get_boto3_client("ssm", service.project.environment.get_creds())
+        project = self.get_object()
+        creds = project.environment.get_creds()
+        names = project.get_env_var_parameter_names(request.data["key_name"])
+        logger.info("Deleting env vars: %s project_id=%s", names, project.id)
+        results = delete_parameters(
+            get_boto3_client("ssm", creds), names, get_writes_limiter(creds)
+        )
+        project.invalidate_env_vars()
 
-        key_name = f"{service.get_ssm_prefix()}{request.data['key_name']}"
-        try:
-            client.delete_parameter(Name=key_name)
-            return Response(status=status.HTTP_204_NO_CONTENT)
-        except Exception:
-            logger.exception("Failed to delete env vars: %s", key_name)
+        failed = [
+            result._asdict()
+            for result in results
+            if not result.is_success and result.error != "ParameterNotFound"
+        ]
+        if failed:
+            logger.error("Failed to delete env vars: %s", failed)
+            return Response(
+                dict(
+                    detail="Failed to delete env var of some services.", results=failed
+                ),
+                status=status.HTTP_502_BAD_GATEWAY,
+            )
+        if not any(result.is_success for result in results):
             return Response(
                 data={
                     "detail": "Error deleting key. Does this key exist? Check key name and try again."
                 },
                 status=status.HTTP_400_BAD_REQUEST,
             )
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -1,7 +1,22 @@
-from rest_framework.generics import RetrieveAPIView
+from time import monotonic, sleep
+
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from rest_framework.generics import ListAPIView, RetrieveAPIView
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
 from aws_environments.models import ExecutionLog
-from aws_environments.serializers import ExecutionLogSerializer
+from aws_environments.serializers import (
+    ExecutionApiCallSerializer,
+    ExecutionLogSerializer,
+    ExecutionResourceEventSerializer,
+    LogTailParamsSerializer,
+    PhaseTimingSerializer,
+)
+from infra_executors.run_logs import get_run_log_path, get_run_logs, read_log_chunk
+
+LOG_POLL_INTERVAL_SECONDS = 1
 
 
 class ExecutionLogDetailsView(RetrieveAPIView):
@@ -11,3 +26,104 @@ class ExecutionLogDetailsView(RetrieveAPIView):
 
     def get_queryset(self):
         return ExecutionLog.objects.filter(organization=self.request.user.organization)
+
+
+class ExecutionResourceEventsView(ListAPIView):
+    """Per resource progress of the execution, live while it is running."""
+
+    serializer_class = ExecutionResourceEventSerializer
+
+    def get_queryset(self):
+        exec_log = get_object_or_404(
+            ExecutionLog.objects.filter(organization=self.request.user.organization),
+            slug=self.kwargs["slug"],
+        )
+        return exec_log.get_resource_events()
+
+
+class ExecutionTimingView(APIView):
+    """Time spent in each phase of the execution, live while it is running."""
+
+    def get(self, request, slug):
+        exec_log = get_object_or_404(
+            ExecutionLog.objects.filter(organization=request.user.organization),
+            slug=slug,
+        )
+        timing = exec_log.get_timing()
+        return Response(
+            dict(
+                phases=PhaseTimingSerializer(
+                    [phase._asdict() for phase in timing], many=True
+                ).data,
+                is_finished=exec_log.ended_at is not None,
+            )
+        )
+
+
+class ExecutionApiCallsView(ListAPIView):
+    """Aws api calls made by the execution per operation, most called first.
+
+    Calls are stored when the execution finishes.
+    """
+
+    serializer_class = ExecutionApiCallSerializer
+
+    def get_queryset(self):
+        exec_log = get_object_or_404(
+            ExecutionLog.objects.filter(organization=self.request.user.organization),
+            slug=self.kwargs["slug"],
+        )
+        return exec_log.api_calls.order_by("-calls", "service", "operation")
+
+
+class ExecutionLogsView(APIView):
+    """Lists terraform run logs of the execution."""
+
+    def get(self, request, slug):
+        exec_log = get_object_or_404(
+            ExecutionLog.objects.filter(organization=request.user.organization),
+            slug=slug,
+        )
+        return Response(
+            dict(
+                logs=[log._asdict() for log in get_run_logs(exec_log.id)],
+                is_finished=exec_log.ended_at is not None,
+            )
+        )
+
+
+class ExecutionLogTailView(APIView):
+    """Returns run log from the offset.
+
+    If there is no new output yet and the execution is still running, waits
+    for it up to `wait` seconds.
+    """
+
+    def get(self, request, slug, name):
+        exec_log = get_object_or_404(
+            ExecutionLog.objects.filter(organization=request.user.organization),
+            slug=slug,
+        )
+        log_path = get_run_log_path(exec_log.id, name)
+        if not log_path:
+            raise Http404
+
+        params = LogTailParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        offset = params.validated_data["offset"]
+        deadline = monotonic() + params.validated_data["wait"]
+
+        chunk = read_log_chunk(log_path, offset)
+        while not chunk.data and not exec_log.ended_at and monotonic() < deadline:
+            sleep(LOG_POLL_INTERVAL_SECONDS)
+            exec_log.refresh_from_db(fields=["ended_at"])
+            chunk = read_log_chunk(log_path, offset)
+
+        return Response(
+            dict(
+                name=name,
+                data=chunk.data,
+                offset=chunk.offset,
+                is_finished=exec_log.ended_at is not None,
+            )
+        )
@@ -28,6 +28,7 @@ class CreateListProject(ModelViewSet):
 
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
+        force = serializer.validated_data.pop("force")
 
         project = serializer.save(
             environment=env, organization=self.request.user.organization
@@ -37,7 +38,7 @@ class CreateListProject(ModelViewSet):
         exec_log = ExecutionLog.register(
             self.request.user.organization,
             ExecutionLog.ActionTypes.create,
-            request.data,
+            {**request.data, "force": force},
             ExecutionLog.Components.project,
             project.id,
         )
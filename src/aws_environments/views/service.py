@@ -39,6 +39,7 @@ class CreateListUpdateServices(ModelViewSet):
 
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
+        force = serializer.validated_data.pop("force")
 
         is_valid, error_reason = check_if_service_can_be_created(
             serializer.validated_data, project
@@ -57,7 +58,7 @@ class CreateListUpdateServices(ModelViewSet):
         exec_log = ExecutionLog.register(
             self.request.user.organization,
             ExecutionLog.ActionTypes.create,
-            request.data,
+            {**request.data, "force": force},
             ExecutionLog.Components.service,
             service.id,
         )
@@ -101,6 +102,7 @@ class CreateListUpdateServices(ModelViewSet):
 
         serializer = self.get_serializer(data=payload)
         serializer.is_valid(raise_exception=True)
+        force = serializer.validated_data.pop("force")
         service = serializer.save(
             project=project,
             organization=project.organization,
@@ -110,7 +112,7 @@ class CreateListUpdateServices(ModelViewSet):
         exec_log = ExecutionLog.register(
             self.request.user.organization,
             ExecutionLog.ActionTypes.create,
-            request.data,
+            {**request.data, "force": force},
             ExecutionLog.Components.service,
             service.id,
         )
@@ -0,0 +1,6 @@
+"""Offline benchmarks of jobs with fake terraform and aws.
+
+Run with::
+
+    python manage.py benchmark_jobs [scenario] --jobs 10 --concurrency 4
+"""
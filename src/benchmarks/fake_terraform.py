@@ -0,0 +1,315 @@
+"""Stand-in of the terraform binary for benchmarks.
+
+Simulates latency of terraform commands and prints output in the format of
+terraform 0.13, so executors, progress tracking and output parsing run as they
+do against aws. Resources and outputs are read from the `*.tf` files of the
+working directory, so every configuration under `infra_executors/terraform`
+gets outputs in the shape its callers expect.
+
+Usage::
+
+    python fake_terraform.py [--latency-scale N] [--state-dir DIR]
+        [--calls-log FILE] <terraform command and arguments>
+
+States are written to the state dir per backend key in the format of
+terraform 0.13, next to the inputs they were applied with, so plan reports no
+changes when the same inputs were already applied. `benchmarks.fake_aws`
+serves them as objects of the state bucket.
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+# seconds, at latency scale 1
+INIT_SECONDS = 2.0
+TEMPLATE_INIT_SECONDS = 5.0
+PLAN_SECONDS = 3.0
+REFRESH_SECONDS_PER_RESOURCE = 0.2
+APPLY_SECONDS_PER_RESOURCE = 2.0
+DESTROY_SECONDS_PER_RESOURCE = 1.0
+OUTPUT_SECONDS = 0.8
+
+BACKEND_KEY_FILE = "fake_backend_key"
+TFVARS_FILE_NAME = "run.auto.tfvars.json"
+REGION = "us-east-2"
+ACCOUNT_ID = "000000000000"
+TERRAFORM_VERSION = "0.13.5"
+
+RESOURCE_RE = re.compile(r'^(resource|module)\s+"([^"]+)"(?:\s+"([^"]+)")?', re.M)
+OUTPUT_RE = re.compile(r'^output\s+"([^"]+)"\s*{(.*?)^}', re.M | re.S)
+VALUE_RE = re.compile(r"^\s*value\s*=\s*(.+)$", re.M)
+LIST_VALUE_RE = re.compile(r"\.\*\.|\[\*\]|^flatten\(")
+
+# outputs which are lists of objects
+OBJECT_OUTPUTS = {
+    "cache_nodes": lambda name: {
+        "address": f"{name}.fake.cache.amazonaws.com",
+        "availability_zone": f"{REGION}a",
+        "id": "0001",
+        "port": 6379,
+    },
+    "domain_validation_options": lambda name: {
+        "domain_name": f"{name}.fake.chiliseed.com",
+        "resource_record_name": f"_{name}.fake.chiliseed.com.",
+        "resource_record_type": "CNAME",
+        "resource_record_value": f"_{name}.acm-validations.aws.",
+    },
+}
+
+
+def _digest(*parts: str) -> str:
+    digest = hashlib.blake2b(digest_size=6)
+    for part in parts:
+        digest.update(part.encode())
+    return digest.hexdigest()
+
+
+def get_state_file(state_dir: str, backend_key: str) -> str:
+    """Path of the state stored under the backend key."""
+    return os.path.join(state_dir, f"{_digest(backend_key)}.tfstate")
+
+
+def _read_config(config_dir: str = ".") -> str:
+    config = ""
+    for path in sorted(glob.glob(os.path.join(config_dir, "*.tf"))):
+        with open(path) as tf_file:
+            config += tf_file.read() + "\n"
+    return config
+
+
+def get_resources(config: str) -> List[str]:
+    """Addresses of resources and modules of the configuration."""
+    addresses = []
+    for kind, first, second in RESOURCE_RE.findall(config):
+        if kind == "module":
+            addresses.append(f"module.{first}.aws_resource.this")
+        else:
+            addresses.append(f"{first}.{second}")
+    return addresses
+
+
+def fake_value(name: str, expression: str, seed: str) -> Any:
+    """Value of the output, deterministic for the backend key."""
+    for marker, build in OBJECT_OUTPUTS.items():
+        if marker in expression:
+            return [build(f"{name}-{seed}")]
+
+    value = f"fake-{name.replace('_', '-')}-{seed}"
+    if name.endswith("_arn") or name.endswith("_arns") or name == "arn":
+        value = f"arn:aws:fake:{REGION}:{ACCOUNT_ID}:{value}"
+    if LIST_VALUE_RE.search(expression):
+        return [value]
+    return value
+
+
+def get_outputs(config: str, seed: str) -> Dict[str, Any]:
+    """Outputs in the format of `terraform output -json`."""
+    outputs = {}
+    for name, body in OUTPUT_RE.findall(config):
+        match = VALUE_RE.search(body)
+        expression = match.group(1).strip() if match else ""
+        value = fake_value(name, expression, seed)
+        outputs[name] = dict(
+            sensitive="sensitive" in body and "true" in body,
+            type=["list", "dynamic"] if isinstance(value, list) else "string",
+            value=value,
+        )
+    return outputs
+
+
+def read_state(state_dir: str, backend_key: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(get_state_file(state_dir, backend_key)) as state_file:
+            return json.load(state_file)
+    except (OSError, ValueError):
+        return None
+
+
+def write_state(
+    state_dir: str,
+    backend_key: str,
+    outputs: Dict[str, Any],
+    inputs: Optional[str] = None,
+) -> None:
+    """Write next serial of the state, as terraform does after every change.
+
+    Inputs the state was applied with are kept next to it, plan of the same
+    inputs reports no changes.
+    """
+    previous = read_state(state_dir, backend_key) or {}
+    state = dict(
+        version=4,
+        terraform_version=TERRAFORM_VERSION,
+        serial=previous.get("serial", 0) + 1,
+        lineage=previous.get("lineage") or str(uuid.uuid4()),
+        outputs=outputs,
+        resources=[],
+    )
+    state_path = get_state_file(state_dir, backend_key)
+    os.makedirs(state_dir, exist_ok=True)
+    tmp_path = f"{state_path}.{uuid.uuid4().hex[:8]}"
+    with open(tmp_path, "w") as state_file:
+        json.dump(state, state_file, indent=2)
+    # state object is replaced at once, like a put to the s3 backend
+    os.replace(tmp_path, state_path)
+
+    inputs_path = f"{state_path}.inputs"
+    if inputs is None:
+        if os.path.exists(inputs_path):
+            os.remove(inputs_path)
+        return
+    with open(inputs_path, "w") as inputs_file:
+        inputs_file.write(inputs)
+
+
+def seed_state(state_dir: str, backend_key: str, config_dir: str) -> None:
+    """Write state of a stack applied before, with outputs of its config dir."""
+    outputs = get_outputs(_read_config(config_dir), _digest(backend_key))
+    write_state(state_dir, backend_key, outputs)
+
+
+class FakeTerraform:
+    """Executes terraform commands in the current directory."""
+
+    def __init__(self, latency_scale: float, state_dir: str):
+        self.latency_scale = latency_scale
+        self.state_dir = state_dir
+
+    def sleep(self, seconds: float) -> None:
+        time.sleep(seconds * self.latency_scale)
+
+    def backend_key(self) -> str:
+        try:
+            with open(BACKEND_KEY_FILE) as key_file:
+                return key_file.read()
+        except FileNotFoundError:
+            return ""
+
+    def state_file(self) -> str:
+        return get_state_file(self.state_dir, self.backend_key())
+
+    def read_state(self) -> Optional[Dict[str, Any]]:
+        return read_state(self.state_dir, self.backend_key())
+
+    def write_state(self, outputs: Dict[str, Any], inputs: Optional[str]) -> None:
+        write_state(self.state_dir, self.backend_key(), outputs, inputs)
+
+    def applied_inputs(self) -> Optional[str]:
+        try:
+            with open(f"{self.state_file()}.inputs") as inputs_file:
+                return inputs_file.read()
+        except OSError:
+            return None
+
+    def inputs_hash(self, var_file: Optional[str]) -> str:
+        inputs = _read_config()
+        for path in (TFVARS_FILE_NAME, var_file):
+            if path and os.path.exists(path):
+                with open(path) as vars_file:
+                    inputs += vars_file.read()
+        return _digest(inputs)
+
+    def init(self, args: List[str]) -> int:
+        for arg in args:
+            if arg.startswith("-backend-config="):
+                key = arg.split("=", 1)[1].strip('"')
+                if key.startswith("key="):
+                    with open(BACKEND_KEY_FILE, "w") as key_file:
+                        key_file.write(key[len("key=") :])
+        if "-backend=false" in args:
+            self.sleep(TEMPLATE_INIT_SECONDS)
+        else:
+            self.sleep(INIT_SECONDS)
+        print("Initializing the backend...")
+        print("Initializing provider plugins...")
+        print("Terraform has been successfully initialized!")
+        return 0
+
+    def plan(self, args: List[str]) -> int:
+        options = dict(arg.split("=", 1) for arg in args if "=" in arg)
+        resources = get_resources(_read_config())
+        for address in resources:
+            print(f"{address}: Refreshing state... [id=fake]")
+        self.sleep(PLAN_SECONDS + REFRESH_SECONDS_PER_RESOURCE * len(resources))
+
+        inputs = self.inputs_hash(options.get("-var-file"))
+        if inputs == self.applied_inputs():
+            print("No changes. Infrastructure is up-to-date.")
+            return 0
+
+        if "-out" in options:
+            with open(options["-out"], "w") as plan_file:
+                json.dump(dict(inputs=inputs, resources=resources), plan_file)
+        print(f"Plan: {len(resources)} to add, 0 to change, 0 to destroy.")
+        return 2 if "-detailed-exitcode" in args else 0
+
+    def apply(self, args: List[str]) -> int:
+        with open(args[-1]) as plan_file:
+            plan = json.load(plan_file)
+        for address in plan["resources"]:
+            print(f"{address}: Creating...")
+            started = time.monotonic()
+            self.sleep(APPLY_SECONDS_PER_RESOURCE)
+            elapsed = max(int(time.monotonic() - started), 0)
+            print(f"{address}: Creation complete after {elapsed}s [id=fake]")
+
+        seed = _digest(self.backend_key())
+        self.write_state(get_outputs(_read_config(), seed), plan["inputs"])
+        print(
+            f"Apply complete! Resources: {len(plan['resources'])} added, 0 changed, "
+            f"0 destroyed."
+        )
+        return 0
+
+    def output(self, args: List[str]) -> int:
+        self.sleep(OUTPUT_SECONDS)
+        state = self.read_state()
+        if state is None:
+            # stack was never applied
+            outputs = get_outputs(_read_config(), _digest(self.backend_key()))
+        else:
+            outputs = state["outputs"]
+        print(json.dumps(outputs))
+        return 0
+
+    def destroy(self, args: List[str]) -> int:
+        resources = get_resources(_read_config())
+        for address in resources:
+            print(f"{address}: Destroying... [id=fake]")
+            self.sleep(DESTROY_SECONDS_PER_RESOURCE)
+            print(f"{address}: Destruction complete after 1s")
+        self.write_state({}, None)
+        print(f"Destroy complete! Resources: {len(resources)} destroyed.")
+        return 0
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(prog="fake-terraform")
+    parser.add_argument("--latency-scale", type=float, default=1.0)
+    parser.add_argument("--state-dir", default=os.path.join(os.getcwd(), ".state"))
+    parser.add_argument("--calls-log")
+    parser.add_argument("command")
+    parser.add_argument("args", nargs=argparse.REMAINDER)
+    options = parser.parse_args(argv)
+
+    if options.calls_log:
+        with open(options.calls_log, "a") as calls_log:
+            calls_log.write(f"{options.command}\n")
+
+    terraform = FakeTerraform(options.latency_scale, options.state_dir)
+    command = getattr(terraform, options.command, None)
+    if not command:
+        print(f"Unsupported command {options.command}", file=sys.stderr)
+        return 1
+    return command(options.args)
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
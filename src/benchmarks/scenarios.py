@@ -0,0 +1,436 @@
+"""Scenarios running jobs concurrently against fake terraform and aws.
+
+Every scenario runs in its own process forked from the command, so its peak
+RSS is not hidden by the peak of an earlier scenario. It creates an
+organization with an environment and a project which are already launched,
+prepares the components of N jobs and runs the jobs directly, without celery,
+in a thread pool.
+
+Fakes are installed with `unittest.mock.patch` for the duration of the
+scenario: boto3 clients are replaced by `benchmarks.fake_aws`, a `terraform`
+executable running `benchmarks.fake_terraform` is put first on the PATH of
+terraform processes, and work dirs of executors (logs, plans, workspaces,
+caches, locks and keys) are moved to a temporary dir.
+"""
+import multiprocessing
+import os
+import resource
+import shlex
+import stat
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from functools import partial
+from time import monotonic
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+from unittest import mock
+
+from django.db import connection, connections
+
+from aws_environments.constants import InfraStatus
+from aws_environments.jobs import (
+    create_service_infra,
+    deploy_version_to_service,
+    launch_database,
+)
+from aws_environments.models import (
+    Environment,
+    EnvironmentConf,
+    ExecutionLog,
+    Project,
+    ProjectConf,
+    Resource,
+    ResourceConf,
+    Service,
+    ServiceConf,
+    ServiceDeployment,
+)
+from benchmarks import fake_terraform
+from benchmarks.fake_aws import FakeAws
+from common.crypto import get_uuid_hex
+from infra_executors import terraform_executor, utils, workspace
+from infra_executors.clients_cache import ClientsCache
+from infra_executors.constants import INFRA_DIR, TERRAFORM_DIR, TERRAFORM_PLUGIN_DIR
+from infra_executors.constructors import build_project_state_key
+from infra_executors.logger import get_logger
+from organizations.models import Organization
+
+logger = get_logger("benchmarks")
+
+ENV_VARS_PER_SERVICE = 20
+# modules which keep work dirs of executors in module constants
+PATCHED_MODULES_PREFIXES = ("infra_executors.", "aws_environments.")
+
+JobCall = Tuple[Callable, Tuple[Any, ...]]
+
+
+class BenchmarkReport(NamedTuple):
+    scenario: str
+    jobs: int
+    concurrency: int
+    succeeded: int
+    # seconds
+    wall_time: float
+    # terraform processes started
+    subprocesses: int
+    aws_calls: int
+    # peak resident set size of the scenario process and its growth while the
+    # scenario ran, and of the largest terraform process, in MB
+    peak_rss_mb: float
+    rss_growth_mb: float
+    peak_child_rss_mb: float
+
+
+def _peak_rss_mb(who: int) -> float:
+    # ru_maxrss is in kilobytes on linux
+    return resource.getrusage(who).ru_maxrss / 1024
+
+
+def _relocated_dir(path: str, work_dir: str) -> Optional[str]:
+    """Path of the work dir in the benchmark dir, None if it is kept."""
+    if path == TERRAFORM_PLUGIN_DIR:
+        return os.path.join(work_dir, "plugins")
+    if path == TERRAFORM_DIR or path.startswith(TERRAFORM_DIR + os.sep):
+        # configurations are used as they are
+        return None
+    if path.startswith(INFRA_DIR + os.sep):
+        return os.path.join(work_dir, os.path.relpath(path, INFRA_DIR))
+    return None
+
+
+def _write_terraform_bin(
+    bin_dir: str, latency_scale: float, state_dir: str, calls_log: str
+) -> None:
+    command = " ".join(
+        shlex.quote(part)
+        for part in (
+            sys.executable,
+            fake_terraform.__file__,
+            "--latency-scale",
+            str(latency_scale),
+            "--state-dir",
+            state_dir,
+            "--calls-log",
+            calls_log,
+        )
+    )
+    os.makedirs(bin_dir)
+    terraform_bin = os.path.join(bin_dir, "terraform")
+    with open(terraform_bin, "w") as bin_file:
+        bin_file.write(f'#!/bin/sh\nexec {command} "$@"\n')
+    os.chmod(terraform_bin, stat.S_IRWXU)
+
+
+def _execute_with_bin_dir(
+    execute_shell_command: Callable[..., Tuple[int, str]],
+    bin_dir: str,
+    cmd: List[str],
+    env_vars: Optional[Dict[str, str]],
+    *args: Any,
+    **kwargs: Any,
+) -> Tuple[int, str]:
+    """Execute shell command with bin dir first on its PATH."""
+    path = os.pathsep.join([bin_dir, os.environ.get("PATH", os.defpath)])
+    env_vars = dict(os.environ if env_vars is None else env_vars, PATH=path)
+    return execute_shell_command(cmd, env_vars, *args, **kwargs)
+
+
+@contextmanager
+def fake_infra(aws: FakeAws, work_dir: str, latency_scale: float) -> Iterator[str]:
+    """Point executors to fake terraform and aws, yield path of the calls log."""
+    calls_log = os.path.join(work_dir, "terraform_calls.log")
+    bin_dir = os.path.join(work_dir, "bin")
+    _write_terraform_bin(bin_dir, latency_scale, aws.state_dir, calls_log)
+
+    with ExitStack() as patches:
+        for name, module in list(sys.modules.items()):
+            if not name.startswith(PATCHED_MODULES_PREFIXES):
+                continue
+            for attr, value in list(vars(module).items()):
+                if not attr.endswith("_DIR") or not isinstance(value, str):
+                    continue
+                relocated = _relocated_dir(value, work_dir)
+                if relocated:
+                    # executors expect work dirs of the deployment to exist
+                    os.makedirs(relocated, exist_ok=True)
+                    patches.enter_context(mock.patch.object(module, attr, relocated))
+
+        patches.enter_context(
+            mock.patch.object(utils, "_create_boto3_client", aws.client)
+        )
+        patches.enter_context(mock.patch.object(utils, "CLIENTS_CACHE", ClientsCache()))
+        for module, attr in (
+            (terraform_executor, "execute_shell_command"),
+            (terraform_executor, "execute_shell_command_async"),
+            (workspace, "execute_shell_command"),
+        ):
+            execute = partial(_execute_with_bin_dir, getattr(module, attr), bin_dir)
+            patches.enter_context(mock.patch.object(module, attr, execute))
+        yield calls_log
+
+
+@contextmanager
+def benchmark_database() -> Iterator[None]:
+    """Run with a throwaway database, scenarios never touch the real one."""
+    old_name = connection.creation.create_test_db(
+        verbosity=0, autoclobber=True, serialize=False
+    )
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def create_project(organization: Organization, aws: FakeAws) -> Project:
+    """Environment and project with their infra launched."""
+    environment = Environment.objects.create(
+        organization=organization,
+        name=f"bench{get_uuid_hex(3)}",
+        domain="bench.chiliseed.com",
+        region=Environment.REGIONS.ohio,
+        configuration=EnvironmentConf(
+            vpc_id="vpc-0fake",
+            access_key_id="fake",
+            access_key_secret="fake",
+            r53_zone_id="ZFAKE",
+        ).to_str(),
+    )
+    environment.set_status(InfraStatus.ready)
+
+    project = Project.objects.create(
+        organization=organization,
+        environment=environment,
+        name="bench-api",
+        configuration=ProjectConf(
+            alb_name="bench-api-alb",
+            alb_public_dns="bench-api-alb.us-east-2.elb.amazonaws.com",
+            ecs_cluster="bench-api",
+            ecs_executor_role_arn="arn:aws:iam::000000000000:role/bench-api-ecs",
+        ).to_str(),
+    )
+    project.set_status(InfraStatus.ready)
+
+    # outputs of the project stacks are read from their states by the jobs
+    common_conf = project.get_common_conf(0)
+    for config_dir in ("alb", "ecs"):
+        fake_terraform.seed_state(
+            aws.state_dir,
+            build_project_state_key(common_conf, config_dir),
+            os.path.join(TERRAFORM_DIR, config_dir),
+        )
+    return project
+
+
+def create_service(project: Project, index: int, status: str) -> Service:
+    service = Service.objects.create(
+        organization=project.organization,
+        project=project,
+        environment=project.environment,
+        name=f"service{index}",
+        subdomain=f"service{index}",
+        container_port=8000,
+        alb_port_http=8000 + index * 2,
+        alb_port_https=8001 + index * 2,
+    )
+    service.set_status(status)
+    return service
+
+
+def prepare_create_service_infra(
+    project: Project, aws: FakeAws, jobs: int
+) -> List[JobCall]:
+    calls = []
+    for index in range(jobs):
+        service = create_service(project, index, InfraStatus.changes_pending)
+        exec_log = ExecutionLog.register(
+            project.organization,
+            ExecutionLog.ActionTypes.create,
+            dict(name=service.name),
+            ExecutionLog.Components.service,
+            service.id,
+        )
+        calls.append((create_service_infra, (service.id, exec_log.id)))
+    return calls
+
+
+def prepare_launch_database(project: Project, aws: FakeAws, jobs: int) -> List[JobCall]:
+    calls = []
+    for index in range(jobs):
+        db = Resource.objects.create(
+            organization=project.organization,
+            environment=project.environment,
+            project=project,
+            name=f"db{index}",
+            kind=Resource.Types.db,
+            preset=Resource.Presets.dev,
+            engine=Resource.EngineTypes.postgres,
+        )
+        db.set_identifier(db.name, project.environment)
+        preset = Resource.DB_PRESETS[db.preset]
+        engine_defaults = Resource.ENGINE_DEFAULTS[db.engine]
+        db.set_conf(
+            ResourceConf(
+                instance_type=preset.instance_type,
+                engine=db.engine,
+                engine_version=engine_defaults.engine_version,
+                allocated_storage=preset.allocated_storage,
+                username="bench",
+                password=get_uuid_hex(20),
+                port=engine_defaults.port,
+            )
+        )
+        db.set_status(InfraStatus.changes_pending)
+        exec_log = ExecutionLog.register(
+            project.organization,
+            ExecutionLog.ActionTypes.create,
+            dict(name=db.name),
+            ExecutionLog.Components.resource,
+            db.id,
+        )
+        calls.append((launch_database, (db.id, exec_log.id)))
+    return calls
+
+
+def prepare_deploy_version_to_service(
+    project: Project, aws: FakeAws, jobs: int
+) -> List[JobCall]:
+    # parameters are seeded directly, they don't count as calls of the jobs
+    ssm = aws.get_api("ssm", project.environment.region)
+    calls = []
+    for index in range(jobs):
+        service = create_service(project, index, InfraStatus.ready)
+        service.set_conf(
+            ServiceConf(
+                ecr_repo_name=f"{project.name}/{service.name}",
+                ecr_repo_url=(
+                    f"000000000000.dkr.ecr.us-east-2.amazonaws.com/"
+                    f"{project.name}/{service.name}"
+                ),
+                target_group_arn=(
+                    f"arn:aws:elasticloadbalancing:us-east-2:000000000000:"
+                    f"targetgroup/{service.name}/fake"
+                ),
+                own_states=True,
+            )
+        )
+        for var_index in range(ENV_VARS_PER_SERVICE):
+            ssm.put_parameter(
+                Name=f"{service.get_ssm_prefix()}VAR_{var_index}",
+                Value=get_uuid_hex(8),
+                Type="SecureString",
+            )
+
+        deployment = ServiceDeployment.objects.create(
+            organization=project.organization,
+            environment=project.environment,
+            project=project,
+            service=service,
+            version="bench",
+        )
+        exec_log = ExecutionLog.register(
+            project.organization,
+            ExecutionLog.ActionTypes.create,
+            dict(version=deployment.version),
+            ExecutionLog.Components.deployment,
+            deployment.id,
+        )
+        calls.append((deploy_version_to_service, (deployment.id, exec_log.id)))
+    return calls
+
+
+SCENARIOS: Dict[str, Callable[[Project, FakeAws, int], List[JobCall]]] = {
+    "create_service_infra": prepare_create_service_infra,
+    "launch_database": prepare_launch_database,
+    "deploy_version_to_service": prepare_deploy_version_to_service,
+}
+
+
+def _run_job(job_call: JobCall) -> bool:
+    job, args = job_call
+    try:
+        return bool(job(*args))
+    except Exception:
+        logger.exception("Benchmark job %s%s failed", job.name, args)
+        return False
+    finally:
+        # connections are per thread, don't leave them behind in the pool
+        connection.close()
+
+
+def run_scenario(
+    scenario: str,
+    jobs: int,
+    concurrency: int,
+    latency_scale: float = 0.05,
+    aws_latency: float = 0.05,
+    scale_seconds: float = 1.0,
+) -> BenchmarkReport:
+    """Run N jobs of the scenario concurrently in this process and measure them.
+
+    Parameters
+    ----------
+    scenario : str
+        one of `SCENARIOS`
+    jobs : int
+        number of jobs to run
+    concurrency : int
+        number of jobs running at the same time
+    latency_scale : float
+        multiplier of the simulated latency of terraform commands
+    aws_latency : float
+        seconds every aws api call takes
+    scale_seconds : float
+        seconds ecs services take to reach their desired count
+
+    Returns
+    -------
+    BenchmarkReport
+    """
+    initial_rss_mb = _peak_rss_mb(resource.RUSAGE_SELF)
+    with tempfile.TemporaryDirectory(prefix="benchmark-") as work_dir:
+        aws = FakeAws(
+            os.path.join(work_dir, "states"),
+            latency=aws_latency,
+            scale_seconds=scale_seconds,
+        )
+        with fake_infra(aws, work_dir, latency_scale) as calls_log:
+            organization = Organization.objects.create(name=f"benchmark-{scenario}")
+            project = create_project(organization, aws)
+            calls = SCENARIOS[scenario](project, aws, jobs)
+
+            logger.info("Running %s jobs of %s", len(calls), scenario)
+            started_at = monotonic()
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                results = list(pool.map(_run_job, calls))
+            wall_time = monotonic() - started_at
+
+        try:
+            with open(calls_log) as calls_file:
+                subprocesses = sum(1 for _ in calls_file)
+        except FileNotFoundError:
+            subprocesses = 0
+
+    peak_rss_mb = _peak_rss_mb(resource.RUSAGE_SELF)
+    return BenchmarkReport(
+        scenario=scenario,
+        jobs=jobs,
+        concurrency=concurrency,
+        succeeded=sum(results),
+        wall_time=wall_time,
+        subprocesses=subprocesses,
+        aws_calls=aws.call_count,
+        peak_rss_mb=peak_rss_mb,
+        rss_growth_mb=peak_rss_mb - initial_rss_mb,
+        peak_child_rss_mb=_peak_rss_mb(resource.RUSAGE_CHILDREN),
+    )
+
+
+def run_scenario_in_process(scenario: str, **options: Any) -> BenchmarkReport:
+    """Run the scenario in a process forked for it, see `run_scenario`."""
+    # connections can't be shared with the forked process
+    connections.close_all()
+    with ProcessPoolExecutor(
+        max_workers=1, mp_context=multiprocessing.get_context("fork")
+    ) as pool:
+        return pool.submit(run_scenario, scenario, **options).result()
@@ -0,0 +1,366 @@
+"""Process metrics in prometheus text exposition format.
+
+Every process, the web app and celery workers alike, keeps its metrics in
+memory and periodically writes a snapshot of them to `settings.METRICS_DIR`.
+The metrics view merges snapshots of all processes sharing the directory, so a
+single scrape of the control center covers the workers too.
+
+Counters must not go back when a worker is replaced, so metrics of exited
+processes are folded into a single aggregate snapshot: by the process itself
+when it exits, and by the scrape for processes of its host which were killed.
+"""
+import atexit
+import fcntl
+import glob
+import json
+import logging
+import os
+import socket
+import threading
+from contextlib import contextmanager
+from time import monotonic
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+
+from common.crypto import get_uuid_hex
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL_SECONDS = 10
+# seconds, from a single api call up to a database launch
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# metrics of exited processes of all hosts
+EXITED_SNAPSHOT_NAME = "exited.json"
+
+LabelValues = Tuple[str, ...]
+# metric family as stored in snapshots
+Family = Dict[str, Any]
+
+
+class Metric:
+    """Base of metrics kept by the registry."""
+
+    kind = ""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        registry: Optional["Registry"] = None,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.registry = registry or REGISTRY
+        self.values: Dict[LabelValues, Any] = {}
+        self.registry.register(self)
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"Metric {self.name} expects labels {self.labelnames}, got {labels}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def family(self) -> Family:
+        """Snapshot of the metric, caller holds the registry lock."""
+        return dict(
+            kind=self.kind,
+            documentation=self.documentation,
+            labelnames=list(self.labelnames),
+            values=[[list(key), value] for key, value in self.values.items()],
+        )
+
+
+class Counter(Metric):
+    """Monotonically increasing value."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self.registry.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+        self.registry.maybe_flush()
+
+
+class Histogram(Metric):
+    """Distribution of observed values."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        registry: Optional["Registry"] = None,
+    ):
+        self.buckets = sorted(buckets)
+        super().__init__(name, documentation, labelnames, registry)
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self.registry.lock:
+            # counts per bucket, sum, count
+            observed = self.values.setdefault(key, [[0] * len(self.buckets), 0, 0])
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    observed[0][index] += 1
+                    break
+            observed[1] += value
+            observed[2] += 1
+        self.registry.maybe_flush()
+
+    def family(self) -> Family:
+        return dict(super().family(), buckets=self.buckets)
+
+
+class Registry:
+    """Metrics of the process and their snapshots."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics: Dict[str, Metric] = {}
+        self._start_process()
+
+    def _start_process(self) -> None:
+        self.snapshot_name = (
+            f"{socket.gethostname()}-{os.getpid()}-{get_uuid_hex(4)}.json"
+        )
+        self.last_flush = monotonic()
+        self.is_closed = False
+
+    def after_fork(self) -> None:
+        """Start with empty metrics in a forked process, i.e. celery worker."""
+        self.lock = threading.Lock()
+        for metric in self.metrics.values():
+            metric.values = {}
+        self._start_process()
+
+    def register(self, metric: Metric) -> None:
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self.metrics[metric.name] = metric
+
+    def snapshot(self) -> Dict[str, Family]:
+        with self.lock:
+            return {
+                name: metric.family()
+                for name, metric in self.metrics.items()
+                if metric.values
+            }
+
+    def flush(self) -> None:
+        """Write snapshot of the process metrics."""
+        self.last_flush = monotonic()
+        snapshot = self.snapshot()
+        if not snapshot or self.is_closed:
+            return
+        try:
+            os.makedirs(settings.METRICS_DIR, exist_ok=True)
+            _write_snapshot(
+                os.path.join(settings.METRICS_DIR, self.snapshot_name), snapshot
+            )
+        except OSError:
+            logger.exception("Failed to write metrics snapshot")
+
+    def close(self) -> None:
+        """Fold metrics of the exiting process into metrics of exited ones.
+
+        Metrics recorded after that are not exported anymore.
+        """
+        if self.is_closed:
+            return
+        self.flush()
+        self.is_closed = True
+        try:
+            with _snapshots_lock():
+                _fold([os.path.join(settings.METRICS_DIR, self.snapshot_name)])
+        except OSError:
+            logger.exception("Failed to fold metrics snapshot")
+
+    def maybe_flush(self) -> None:
+        if monotonic() - self.last_flush >= FLUSH_INTERVAL_SECONDS:
+            self.flush()
+
+
+REGISTRY = Registry()
+os.register_at_fork(after_in_child=REGISTRY.after_fork)
+atexit.register(REGISTRY.close)
+
+
+def _write_snapshot(path: str, snapshot: Dict[str, Family]) -> None:
+    tmp_path = f"{path}.{get_uuid_hex(4)}"
+    with open(tmp_path, "w") as snapshot_file:
+        json.dump(snapshot, snapshot_file)
+    os.replace(tmp_path, path)
+
+
+def _read_snapshot(path: str) -> Optional[Dict[str, Family]]:
+    try:
+        with open(path) as snapshot_file:
+            return json.load(snapshot_file)
+    except (OSError, ValueError):
+        return None
+
+
+@contextmanager
+def _snapshots_lock() -> Iterator[None]:
+    """Serialize folding of snapshots with reading them."""
+    os.makedirs(settings.METRICS_DIR, exist_ok=True)
+    with open(os.path.join(settings.METRICS_DIR, "snapshots.lock"), "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _snapshot_pid(path: str) -> Optional[int]:
+    """Return pid of the process of this host that wrote the snapshot."""
+    host, _, rest = os.path.basename(path).rpartition("-")
+    host, _, pid = host.rpartition("-")
+    if host != socket.gethostname() or not pid.isdigit() or not rest:
+        return None
+    return int(pid)
+
+
+def _is_running(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # exists, but belongs to somebody else
+        return True
+    return True
+
+
+def _fold(paths: Sequence[str]) -> None:
+    """Merge snapshots into metrics of exited processes and remove them.
+
+    Caller holds the snapshots lock.
+    """
+    exited_path = os.path.join(settings.METRICS_DIR, EXITED_SNAPSHOT_NAME)
+    exited = _read_snapshot(exited_path) or {}
+    folded = []
+    for path in paths:
+        snapshot = _read_snapshot(path)
+        if snapshot is not None:
+            _merge_snapshot(exited, snapshot)
+            folded.append(path)
+    if not folded:
+        return
+    _write_snapshot(exited_path, exited)
+    for path in folded:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def _merge(merged: Family, family: Family) -> None:
+    values = {tuple(key): value for key, value in merged["values"]}
+    for key, value in family["values"]:
+        key = tuple(key)
+        if key not in values:
+            values[key] = value
+        elif family["kind"] == Histogram.kind:
+            values[key] = [
+                [a + b for a, b in zip(values[key][0], value[0])],
+                values[key][1] + value[1],
+                values[key][2] + value[2],
+            ]
+        else:
+            values[key] += value
+    merged["values"] = [[list(key), value] for key, value in values.items()]
+
+
+def _merge_snapshot(families: Dict[str, Family], snapshot: Dict[str, Family]) -> None:
+    for name, family in snapshot.items():
+        if name not in families:
+            families[name] = family
+        elif families[name].get("buckets") == family.get("buckets"):
+            _merge(families[name], family)
+
+
+def collect() -> Dict[str, Family]:
+    """Merge metrics snapshots of all processes.
+
+    Snapshots of processes of this host which are gone without closing their
+    registry, i.e. killed workers, are folded into metrics of exited ones.
+    """
+    REGISTRY.flush()
+    families: Dict[str, Family] = {}
+    with _snapshots_lock():
+        paths = sorted(glob.glob(os.path.join(settings.METRICS_DIR, "*.json")))
+        pids = {path: _snapshot_pid(path) for path in paths}
+        killed = [path for path, pid in pids.items() if pid and not _is_running(pid)]
+        if killed:
+            _fold(killed)
+            paths = sorted(glob.glob(os.path.join(settings.METRICS_DIR, "*.json")))
+        for path in paths:
+            snapshot = _read_snapshot(path)
+            if snapshot is not None:
+                _merge_snapshot(families, snapshot)
+    return families
+
+
+def gauge_family(
+    documentation: str,
+    labelnames: Sequence[str],
+    values: List[Tuple[Sequence[Any], float]],
+) -> Family:
+    """Build family of a gauge computed when metrics are collected."""
+    return dict(
+        kind="gauge",
+        documentation=documentation,
+        labelnames=list(labelnames),
+        values=[[[str(label) for label in key], value] for key, value in values],
+    )
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return f"{{{pairs}}}"
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != float("inf") else "+Inf"
+
+
+def render(families: Dict[str, Family]) -> str:
+    """Render metrics in prometheus text exposition format."""
+    lines = []
+    for name in sorted(families):
+        family = families[name]
+        lines.append(f"# HELP {name} {_escape(family['documentation'])}")
+        lines.append(f"# TYPE {name} {family['kind']}")
+        labelnames = family["labelnames"]
+        for key, value in sorted(family["values"]):
+            if family["kind"] != Histogram.kind:
+                lines.append(f"{name}{_labels(labelnames, key)} {_number(value)}")
+                continue
+
+            counts, total, count = value
+            cumulative = 0
+            for bound, bucket_count in zip(family["buckets"], counts):
+                cumulative += bucket_count
+                bucket_labels = _labels([*labelnames, "le"], [*key, _number(bound)])
+                lines.append(f"{name}_bucket{bucket_labels} {_number(cumulative)}")
+            inf_labels = _labels([*labelnames, "le"], [*key, "+Inf"])
+            lines.append(f"{name}_bucket{inf_labels} {_number(count)}")
+            lines.append(f"{name}_sum{_labels(labelnames, key)} {_number(total)}")
+            lines.append(f"{name}_count{_labels(labelnames, key)} {_number(count)}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,193 @@
+import json
+import os
+import tempfile
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from common import metrics
+
+
+class RenderTestCase(SimpleTestCase):
+    def test_counter(self):
+        families = dict(
+            chiliseed_jobs_total=dict(
+                kind="counter",
+                documentation="Jobs run.",
+                labelnames=["job", "state"],
+                values=[[["update", "ok"], 2], [["create", "ok"], 1]],
+            )
+        )
+
+        self.assertEqual(
+            metrics.render(families),
+            "# HELP chiliseed_jobs_total Jobs run.\n"
+            "# TYPE chiliseed_jobs_total counter\n"
+            'chiliseed_jobs_total{job="create",state="ok"} 1.0\n'
+            'chiliseed_jobs_total{job="update",state="ok"} 2.0\n',
+        )
+
+    def test_escapes_label_values_and_documentation(self):
+        families = dict(
+            errors=dict(
+                kind="counter",
+                documentation="Errors\nby message.",
+                labelnames=["message"],
+                values=[[['say "hi" \\ bye'], 1]],
+            )
+        )
+
+        self.assertEqual(
+            metrics.render(families).splitlines(),
+            [
+                r"# HELP errors Errors\nby message.",
+                "# TYPE errors counter",
+                r'errors{message="say \"hi\" \\ bye"} 1.0',
+            ],
+        )
+
+    def test_histogram_buckets_are_cumulative(self):
+        families = dict(
+            seconds=dict(
+                kind="histogram",
+                documentation="Duration.",
+                labelnames=["task"],
+                buckets=[1, 10],
+                values=[[["build"], [[1, 2], 17.5, 4]]],
+            )
+        )
+
+        self.assertEqual(
+            metrics.render(families).splitlines()[2:],
+            [
+                'seconds_bucket{task="build",le="1.0"} 1.0',
+                'seconds_bucket{task="build",le="10.0"} 3.0',
+                'seconds_bucket{task="build",le="+Inf"} 4.0',
+                'seconds_sum{task="build"} 17.5',
+                'seconds_count{task="build"} 4.0',
+            ],
+        )
+
+    def test_gauge_without_labels(self):
+        families = dict(in_flight=metrics.gauge_family("In flight.", [], [([], 3)]))
+
+        self.assertEqual(metrics.render(families).splitlines()[2:], ["in_flight 3.0"])
+
+
+class SnapshotsTestCase(SimpleTestCase):
+    def setUp(self) -> None:
+        metrics_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(metrics_dir.cleanup)
+        self.metrics_dir = metrics_dir.name
+        settings_override = override_settings(METRICS_DIR=self.metrics_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        # keep metrics of the test process out of collected ones
+        patcher = mock.patch.object(metrics, "REGISTRY", metrics.Registry())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def registry_with_counter(self, amount):
+        registry = metrics.Registry()
+        counter = metrics.Counter("jobs", "Jobs run.", ["job"], registry=registry)
+        counter.inc(amount, job="update")
+        registry.flush()
+        return registry
+
+    def write_snapshot(self, name, amount):
+        registry = metrics.Registry()
+        metrics.Counter("jobs", "Jobs run.", ["job"], registry=registry).inc(
+            amount, job="update"
+        )
+        self.write_registry_snapshot(name, registry)
+
+    def write_registry_snapshot(self, name, registry):
+        with open(os.path.join(self.metrics_dir, name), "w") as snapshot_file:
+            json.dump(registry.snapshot(), snapshot_file)
+
+    def collected_jobs(self):
+        families = metrics.collect()
+        return {tuple(key): value for key, value in families["jobs"]["values"]}
+
+    def snapshot_names(self):
+        return sorted(name for name in os.listdir(self.metrics_dir) if ".json" in name)
+
+    def test_merges_snapshots_of_processes(self):
+        self.registry_with_counter(2)
+        self.registry_with_counter(3)
+
+        self.assertEqual(self.collected_jobs(), {("update",): 5})
+
+    def test_histograms_with_other_buckets_are_not_merged(self):
+        for name, buckets in (
+            ("a.json", [1, 10]),
+            ("b.json", [5]),
+            ("c.json", [1, 10]),
+        ):
+            registry = metrics.Registry()
+            metrics.Histogram(
+                "seconds", "Duration.", buckets=buckets, registry=registry
+            ).observe(1)
+            self.write_registry_snapshot(name, registry)
+
+        family = metrics.collect()["seconds"]
+
+        self.assertEqual(family["buckets"], [1, 10])
+        self.assertEqual(family["values"], [[[], [[2, 0], 2, 2]]])
+
+    def test_close_folds_snapshot_into_exited(self):
+        registry = self.registry_with_counter(2)
+        self.registry_with_counter(3)
+
+        registry.close()
+        registry.close()
+
+        self.assertNotIn(registry.snapshot_name, self.snapshot_names())
+        self.assertIn(metrics.EXITED_SNAPSHOT_NAME, self.snapshot_names())
+        self.assertEqual(self.collected_jobs(), {("update",): 5})
+
+    def test_metrics_after_close_are_not_exported(self):
+        registry = self.registry_with_counter(2)
+        registry.close()
+
+        registry.metrics["jobs"].inc(job="update")
+        registry.flush()
+
+        self.assertEqual(self.snapshot_names(), [metrics.EXITED_SNAPSHOT_NAME])
+        self.assertEqual(self.collected_jobs(), {("update",): 2})
+
+    def test_exited_processes_are_accumulated(self):
+        for amount in (1, 2, 3):
+            self.registry_with_counter(amount).close()
+
+        self.assertEqual(self.snapshot_names(), [metrics.EXITED_SNAPSHOT_NAME])
+        self.assertEqual(self.collected_jobs(), {("update",): 6})
+
+    @mock.patch.object(metrics.socket, "gethostname", return_value="web-1")
+    def test_scrape_folds_snapshots_of_killed_processes(self, _):
+        self.write_snapshot("web-1-100-abcd.json", 2)
+        self.write_snapshot("web-1-200-abcd.json", 3)
+        # processes of other hosts can't be checked
+        self.write_snapshot("web-2-100-abcd.json", 4)
+
+        with mock.patch.object(
+            metrics, "_is_running", side_effect=lambda pid: pid == 200
+        ):
+            self.assertEqual(self.collected_jobs(), {("update",): 9})
+
+        self.assertEqual(
+            self.snapshot_names(),
+            [
+                metrics.EXITED_SNAPSHOT_NAME,
+                "web-1-200-abcd.json",
+                "web-2-100-abcd.json",
+            ],
+        )
+        self.assertEqual(self.collected_jobs(), {("update",): 9})
+
+    def test_is_running(self):
+        self.assertTrue(metrics._is_running(os.getpid()))
+        with mock.patch.object(metrics.os, "kill", side_effect=ProcessLookupError):
+            self.assertFalse(metrics._is_running(12345))
+        with mock.patch.object(metrics.os, "kill", side_effect=PermissionError):
+            self.assertTrue(metrics._is_running(1))
@@ -0,0 +1,45 @@
+"""Accounting of aws api calls made while serving requests."""
+import logging
+
+from common.metrics import Histogram
+from infra_executors.api_calls import (
+    describe_api_calls,
+    recording,
+    summarize_api_calls,
+)
+
+logger = logging.getLogger(__name__)
+
+REQUEST_AWS_CALLS = Histogram(
+    "chiliseed_request_aws_calls",
+    "Aws api calls made to serve a request.",
+    ["view"],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+
+
+class AwsApiCallsMiddleware:
+    """Count aws api calls of every request, by view."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with recording() as api_calls:
+            response = self.get_response(request)
+
+        if request.resolver_match is None:
+            return response
+
+        summaries = summarize_api_calls(api_calls)
+        calls = sum(summary.calls for summary in summaries)
+        view = request.resolver_match.view_name
+        REQUEST_AWS_CALLS.observe(calls, view=view)
+        if calls:
+            logger.info(
+                "Request made %s aws api calls. view=%s calls=%s",
+                calls,
+                view,
+                describe_api_calls(summaries),
+            )
+        return response
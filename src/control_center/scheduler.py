@@ -5,6 +5,8 @@ from celery import Celery
 from celery.signals import setup_logging
 from django.conf import settings
 from django_structlog.celery.steps import DjangoStructLogInitStep
+from kombu import Queue
+from kombu.common import Broadcast
 
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "control_center.settings")
@@ -23,6 +25,9 @@ app.config_from_object("django.conf:settings", namespace="CELERY")
 # A step to initialize django-structlog
 app.steps['worker'].add(DjangoStructLogInitStep)
 
+# Registers task signal handlers
+import control_center.task_metrics  # noqa: E402,F401
+
 
 @setup_logging.connect
 def config_loggers(*args, **kwags):  # noqa
@@ -31,4 +36,24 @@ def config_loggers(*args, **kwags):  # noqa
 
 app.autodiscover_tasks(lambda: settings.INSTALLED_APPS)
 
-app.conf.beat_schedule = {}
+# every worker gets own queue bound to the maintenance exchange, so tasks
+# sent to the exchange run on every node, i.e. to clean up its disk
+MAINTENANCE_EXCHANGE = "maintenance"
+app.conf.task_queues = (
+    Queue(app.conf.task_default_queue),
+    Broadcast(MAINTENANCE_EXCHANGE),
+)
+
+RETENTION_INTERVAL_SECONDS = 60 * 60
+
+app.conf.beat_schedule = {
+    "apply-artifacts-retention": {
+        "task": "aws_environments.jobs.maintenance.apply_artifacts_retention",
+        "schedule": RETENTION_INTERVAL_SECONDS,
+        "options": {
+            "exchange": MAINTENANCE_EXCHANGE,
+            # workers which were down skip missed runs
+            "expires": RETENTION_INTERVAL_SECONDS,
+        },
+    },
+}
@@ -67,6 +67,7 @@ class Base(Configuration):
         "django.middleware.clickjacking.XFrameOptionsMiddleware",
         'django_structlog.middlewares.RequestMiddleware',
         'django_structlog.middlewares.CeleryMiddleware',
+        "control_center.middleware.AwsApiCallsMiddleware",
     ]
 
     ROOT_URLCONF = "control_center.urls"
@@ -180,10 +181,30 @@ class Base(Configuration):
         SECRET_KEY,
     ]
 
+    # env vars of services, encrypted, shared by web and worker processes.
+    # ENV_VARS_CACHE_DIR must be a directory shared by web and worker
+    # containers of all nodes, otherwise writes don't invalidate other caches
+    CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        "env_vars": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": env.str(
+                "ENV_VARS_CACHE_DIR",
+                default=os.path.join(BASE_DIR, "cache", "env_vars"),
+            ),
+            "TIMEOUT": env.int("ENV_VARS_CACHE_TTL", default=15 * 60),
+        },
+    }
+
     CORS_ORIGIN_ALLOW_ALL = True
 
     CORS_URLS_REGEX = r"^/api/.*$"
 
+    # snapshots of process metrics, shared by web and worker processes
+    METRICS_DIR = env.str("METRICS_DIR", default=os.path.join(BASE_DIR, "metrics"))
+    # bearer token required to scrape metrics, not served if empty
+    METRICS_TOKEN = env.str("METRICS_TOKEN", default="")
+
     LOGGING = {
         "version": 1,
         "disable_existing_loggers": False,
@@ -0,0 +1,67 @@
+"""Metrics of celery tasks."""
+from time import monotonic, time
+from typing import Dict
+
+from celery.signals import (
+    before_task_publish,
+    task_postrun,
+    task_prerun,
+    worker_process_shutdown,
+)
+
+from common.metrics import REGISTRY, Counter, Histogram
+
+TASK_SECONDS = Histogram(
+    "chiliseed_task_duration_seconds", "Duration of celery tasks.", ["task", "state"],
+)
+TASK_QUEUE_WAIT_SECONDS = Histogram(
+    "chiliseed_task_queue_wait_seconds",
+    "Time celery tasks waited in the queue before a worker started them.",
+    ["task"],
+)
+TASKS_STARTED = Counter(
+    "chiliseed_tasks_started_total", "Celery tasks started by workers.", ["task"],
+)
+
+# start of tasks running in this process, by task id
+_started: Dict[str, float] = {}
+
+
+def _task_name(name: str) -> str:
+    """Short name of the task. i.e.: launch_database"""
+    return name.rpartition(".")[2]
+
+
+@before_task_publish.connect
+def stamp_published_at(headers=None, **_):
+    if headers is not None:
+        headers.setdefault("published_at", time())
+
+
+@task_prerun.connect
+def task_started(task_id=None, task=None, **_):
+    name = _task_name(task.name)
+    _started[task_id] = monotonic()
+    TASKS_STARTED.inc(task=name)
+
+    published_at = getattr(task.request, "published_at", None)
+    if published_at:
+        # clocks of web and worker hosts may drift apart
+        TASK_QUEUE_WAIT_SECONDS.observe(max(time() - published_at, 0), task=name)
+
+
+@task_postrun.connect
+def task_finished(task_id=None, task=None, state=None, **_):
+    started = _started.pop(task_id, None)
+    if started is None:
+        return
+    TASK_SECONDS.observe(
+        monotonic() - started, task=_task_name(task.name), state=state or "UNKNOWN"
+    )
+    # tasks are long, export their metrics right away
+    REGISTRY.flush()
+
+
+@worker_process_shutdown.connect
+def close_metrics(**_):
+    REGISTRY.close()
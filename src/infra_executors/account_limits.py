@@ -0,0 +1,141 @@
+"""Limits load put on a single aws account.
+
+Every celery worker talks to customer accounts on its own, so without limits
+a few concurrent jobs hitting the same account get throttled by aws. Load is
+limited per account, identified by access key and region:
+
+* terraform commands take one of a fixed number of slots, held in lock files
+  shared by all workers of the node. Slots are not shared between nodes, so
+  an account gets up to that many terraform runs from every node running
+  workers.
+* boto3 calls go through a per process rate limiter and use adaptive retries,
+  which slow the client down further when aws starts throttling. Bulk writes
+  of ssm parameters are limited further by a limiter of their own.
+"""
+import fcntl
+import hashlib
+import os
+import random
+import threading
+from contextlib import contextmanager
+from time import monotonic, sleep
+from typing import Dict, Iterator
+
+from botocore.config import Config  # type: ignore
+
+from infra_executors.constants import AwsCredentials, LOCKS_DIR
+from infra_executors.logger import get_logger
+
+logger = get_logger("account-limits")
+
+# terraform commands running at the same time against a single account from
+# workers of a single node
+MAX_TERRAFORM_RUNS_PER_ACCOUNT_PER_NODE = 4
+SLOT_POLL_SECONDS = 2
+# boto3 requests per second against a single account from a single process
+API_CALLS_PER_SECOND = 10
+API_MAX_ATTEMPTS = 10
+# ssm parameter writes per second against a single account from a single
+# process, on top of the limit of all calls, ssm throttles writes much sooner
+SSM_WRITES_PER_SECOND = 5
+# clients are shared by all threads of the process, i.e. steps of executors
+# running in parallel, default of botocore is 10
+MAX_POOL_CONNECTIONS = 25
+
+BOTO3_CONFIG = Config(
+    retries={"mode": "adaptive", "max_attempts": API_MAX_ATTEMPTS},
+    max_pool_connections=MAX_POOL_CONNECTIONS,
+)
+
+
+def get_account_key(creds: AwsCredentials) -> str:
+    """Identify account and region without exposing the access key."""
+    return hashlib.blake2b(
+        f"{creds.access_key}:{creds.region}".encode(), digest_size=16
+    ).hexdigest()
+
+
+@contextmanager
+def terraform_slot(
+    creds: AwsCredentials, slots: int = MAX_TERRAFORM_RUNS_PER_ACCOUNT_PER_NODE
+) -> Iterator[None]:
+    """Wait for a free terraform slot of the account on this node and hold it."""
+    os.makedirs(LOCKS_DIR, exist_ok=True)
+    account_key = get_account_key(creds)
+    waiting_since = None
+    while True:
+        for slot in range(slots):
+            lock_file = open(os.path.join(LOCKS_DIR, f"{account_key}.{slot}.slot"), "a")
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                lock_file.close()
+                continue
+
+            if waiting_since is not None:
+                logger.info(
+                    "Got terraform slot after %.1f seconds. account=%s",
+                    monotonic() - waiting_since,
+                    account_key,
+                )
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+                lock_file.close()
+            return
+
+        if waiting_since is None:
+            logger.info("All terraform slots are taken. account=%s", account_key)
+            waiting_since = monotonic()
+        sleep(random.uniform(SLOT_POLL_SECONDS / 2, SLOT_POLL_SECONDS))  # nosec
+
+
+class RateLimiter:
+    """Thread-safe token bucket."""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated_at = monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a call is allowed."""
+        while True:
+            with self.lock:
+                now = monotonic()
+                self.tokens = min(
+                    self.rate, self.tokens + (now - self.updated_at) * self.rate
+                )
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_for = (1 - self.tokens) / self.rate
+            sleep(wait_for)
+
+
+_rate_limiters: Dict[str, RateLimiter] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(
+    creds: AwsCredentials, kind: str = "api", rate: float = API_CALLS_PER_SECOND
+) -> RateLimiter:
+    """Return rate limiter of the kind of calls, shared within the account."""
+    limiter_key = f"{kind}:{get_account_key(creds)}"
+    with _rate_limiters_lock:
+        if limiter_key not in _rate_limiters:
+            _rate_limiters[limiter_key] = RateLimiter(rate)
+        return _rate_limiters[limiter_key]
+
+
+def limit_api_calls(client, creds: AwsCredentials) -> None:
+    """Make every request of the client, retries included, wait for the limiter."""
+    limiter = get_rate_limiter(creds)
+
+    def wait_for_limiter(**_):
+        limiter.acquire()
+
+    client.meta.events.register("before-send", wait_for_limiter)
@@ -20,7 +20,10 @@ class SSLConfigs(NamedTuple):
 
 
 def create_acm(
-    creds: AwsCredentials, params: GeneralConfiguration, run_config: SSLConfigs,
+    creds: AwsCredentials,
+    params: GeneralConfiguration,
+    run_config: SSLConfigs,
+    force: bool = False,
 ) -> Any:
     """Create ACM certificate."""
     logger.info("Executing run_id=%s", params.run_id)
@@ -36,7 +39,7 @@ def create_acm(
             variables_file_name="",
         ),
     )
-    return executor.execute_apply()
+    return executor.execute_apply(force=force)
 
 
 def destroy_acm(
@@ -76,4 +79,4 @@ def get_acm_details(
             variables_file_name="",
         ),
     )
-    return executor.get_outputs()
+    return executor.get_outputs(read_state=True)
@@ -2,7 +2,10 @@
 from typing import Any, List, NamedTuple, NewType
 
 from infra_executors.constants import AwsCredentials, GeneralConfiguration
-from infra_executors.constructors import build_project_state_key
+from infra_executors.constructors import (
+    build_project_state_key,
+    build_service_state_key,
+)
 from infra_executors.logger import get_logger
 from infra_executors.terraform_executor import (
     ExecutorConfiguration,
@@ -44,8 +47,27 @@ class ALBConfigs(NamedTuple):
     deregistration_delay: int = 300  # in seconds
 
 
+class ALBListenerConfigs(NamedTuple):
+    """Configures listeners and target group of a single service."""
+
+    alb_arn: str
+    alb_security_group_id: str
+    name: str
+    container_port: int
+    alb_port_http: int
+    alb_port_https: int
+    health_check_endpoint: str
+    health_check_protocol: Protocol
+    ssl_certificate_arn: str
+
+    deregistration_delay: int = 300  # in seconds
+
+
 def create_alb(
-    creds: AwsCredentials, params: GeneralConfiguration, alb_conf: ALBConfigs
+    creds: AwsCredentials,
+    params: GeneralConfiguration,
+    alb_conf: ALBConfigs,
+    force: bool = False,
 ) -> Any:
     """Create and manage alb."""
     logger.info("Executing run_id=%s", params.run_id)
@@ -61,7 +83,7 @@ def create_alb(
             variables_file_name="",
         ),
     )
-    return executor.execute_apply()
+    return executor.execute_apply(force=force)
 
 
 def get_alb_details(
@@ -79,7 +101,7 @@ def get_alb_details(
             variables_file_name="",
         ),
     )
-    return executor.get_outputs()
+    return executor.get_outputs(read_state=True)
 
 
 def destroy_alb(
@@ -100,3 +122,48 @@ def destroy_alb(
         ),
     )
     return executor.execute_destroy()
+
+
+def create_alb_listener(
+    creds: AwsCredentials,
+    params: GeneralConfiguration,
+    listener_conf: ALBListenerConfigs,
+    force: bool = False,
+) -> Any:
+    """Create and manage service listeners on the project alb."""
+    logger.info("Executing run_id=%s", params.run_id)
+    executor = TerraformExecutor(
+        creds=creds,
+        general_configs=params,
+        cmd_configs=listener_conf,
+        executor_configs=ExecutorConfiguration(
+            name="alb_listener",
+            action="create",
+            config_dir="alb_listener",
+            state_key=build_service_state_key(params, "alb_listener"),
+            variables_file_name="",
+        ),
+    )
+    return executor.execute_apply(force=force)
+
+
+def destroy_alb_listener(
+    creds: AwsCredentials,
+    params: GeneralConfiguration,
+    listener_conf: ALBListenerConfigs,
+) -> Any:
+    """Destroy service listeners."""
+    logger.info("Executing run_id=%s", params.run_id)
+    executor = TerraformExecutor(
+        creds=creds,
+        general_configs=params,
+        cmd_configs=listener_conf,
+        executor_configs=ExecutorConfiguration(
+            name="alb_listener",
+            action="destroy",
+            config_dir="alb_listener",
+            state_key=build_service_state_key(params, "alb_listener"),
+            variables_file_name="",
+        ),
+    )
+    return executor.execute_destroy()
@@ -0,0 +1,200 @@
+"""Accounting of aws api calls.
+
+Every client built by `get_boto3_client` counts its calls, retries, throttled
+attempts and latency per operation into the recording of the current context,
+set by `recording`. Jobs record the calls of their execution and web requests
+the calls made while serving them, so patterns like a call per item of a list
+show up in their summaries. Calls outside of a recording are only exported as
+metrics.
+"""
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import monotonic
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from common.metrics import Counter
+
+AWS_CALL_RETRIES = Counter(
+    "chiliseed_aws_call_retries_total",
+    "Retried attempts of aws api calls.",
+    ["service", "operation"],
+)
+AWS_CALL_THROTTLES = Counter(
+    "chiliseed_aws_call_throttles_total",
+    "Attempts of aws api calls throttled by aws.",
+    ["service", "operation"],
+)
+
+# error codes aws uses for throttling, as retried by botocore
+THROTTLING_ERROR_CODES = frozenset(
+    (
+        "Throttling",
+        "ThrottlingException",
+        "ThrottledException",
+        "RequestThrottledException",
+        "TooManyRequestsException",
+        "ProvisionedThroughputExceededException",
+        "TransactionInProgressException",
+        "RequestLimitExceeded",
+        "BandwidthLimitExceeded",
+        "LimitExceededException",
+        "RequestThrottled",
+        "SlowDown",
+        "PriorRequestNotComplete",
+        "EC2ThrottledException",
+    )
+)
+
+
+class ApiCallsSummary(NamedTuple):
+    """Calls of a single operation."""
+
+    service: str
+    operation: str
+    calls: int
+    # attempts beyond the first one of each call
+    retries: int
+    # attempts rejected by aws throttling
+    throttles: int
+    errors: int
+    # seconds, retries included
+    total: float
+    maximum: float
+
+
+# counters of calls per (service, operation):
+# calls, retries, throttles, errors, total, maximum
+ApiCalls = Dict[Tuple[str, str], List[Any]]
+
+# guards counters of all recordings, updates are short
+_lock = threading.Lock()
+
+
+def record_api_call(
+    api_calls: ApiCalls,
+    service: str,
+    operation: str,
+    duration: float,
+    retries: int,
+    throttles: int,
+    is_error: bool,
+) -> None:
+    """Count a single call, safe to call from any thread."""
+    with _lock:
+        counters = api_calls.setdefault((service, operation), [0, 0, 0, 0, 0.0, 0.0])
+        counters[0] += 1
+        counters[1] += retries
+        counters[2] += throttles
+        counters[3] += int(is_error)
+        counters[4] += duration
+        counters[5] = max(counters[5], duration)
+
+
+def _merge_api_calls(into: ApiCalls, api_calls: ApiCalls) -> None:
+    with _lock:
+        for key, counters in api_calls.items():
+            merged = into.setdefault(key, [0, 0, 0, 0, 0.0, 0.0])
+            for index in range(5):
+                merged[index] += counters[index]
+            merged[5] = max(merged[5], counters[5])
+
+
+def summarize_api_calls(api_calls: ApiCalls) -> List[ApiCallsSummary]:
+    """Operations ordered by number of calls, most called first."""
+    with _lock:
+        summaries = [
+            ApiCallsSummary(service, operation, *counters)
+            for (service, operation), counters in api_calls.items()
+        ]
+    return sorted(summaries, key=lambda s: (-s.calls, s.service, s.operation))
+
+
+def describe_api_calls(summaries: List[ApiCallsSummary]) -> str:
+    """Short description of calls for logs. i.e.: ssm.GetParameter=12/r1/t1"""
+    described = []
+    for summary in summaries:
+        description = f"{summary.service}.{summary.operation}={summary.calls}"
+        if summary.retries:
+            description += f"/r{summary.retries}"
+        if summary.throttles:
+            description += f"/t{summary.throttles}"
+        described.append(description)
+    return " ".join(described)
+
+
+current_api_calls: ContextVar[Optional[ApiCalls]] = ContextVar(
+    "current_api_calls", default=None
+)
+
+
+@contextmanager
+def recording() -> Iterator[ApiCalls]:
+    """Count api calls made within the block, threads started from it included.
+
+    Threads must run in a copy of the context, see `infra_executors.dag`. Calls
+of a recording within another one are counted in the outer recording too.
+    """
+    outer = current_api_calls.get()
+    api_calls: ApiCalls = {}
+    token = current_api_calls.set(api_calls)
+    try:
+        yield api_calls
+    finally:
+        current_api_calls.reset(token)
+        if outer is not None:
+            _merge_api_calls(outer, api_calls)
+
+
+def _is_throttled(response: Optional[Tuple[Any, Dict[str, Any]]]) -> bool:
+    if response is None:
+        return False
+    http_response, parsed = response
+    code = parsed.get("Error", {}).get("Code")
+    return http_response.status_code == 429 or code in THROTTLING_ERROR_CODES
+
+
+def count_api_calls(client) -> None:
+    """Count every api call of the boto3 client in the current recording."""
+    service = client.meta.service_model.service_name
+
+    def start_call(context, **_):
+        context["accounting_start"] = monotonic()
+        context["accounting_attempts"] = 0
+        context["accounting_throttles"] = 0
+
+    def check_attempt(response, attempts, request_dict, **_):
+        # emitted after every attempt, before botocore decides to retry it
+        context = request_dict.get("context", {})
+        if "accounting_start" not in context:
+            return
+        context["accounting_attempts"] = attempts
+        if _is_throttled(response):
+            context["accounting_throttles"] += 1
+
+    def finish_call(http_response, model, context, **_):
+        if "accounting_start" not in context:
+            return
+        retries = max(context["accounting_attempts"] - 1, 0)
+        throttles = context["accounting_throttles"]
+        if retries:
+            AWS_CALL_RETRIES.inc(retries, service=service, operation=model.name)
+        if throttles:
+            AWS_CALL_THROTTLES.inc(throttles, service=service, operation=model.name)
+
+        api_calls = current_api_calls.get()
+        if api_calls is not None:
+            record_api_call(
+                api_calls,
+                service,
+                model.name,
+                monotonic() - context["accounting_start"],
+                retries,
+                throttles,
+                http_response.status_code >= 400,
+            )
+
+    # first, before any handler which answers the call without sending it
+    client.meta.events.register_first("before-call.*.*", start_call)
+    client.meta.events.register("needs-retry", check_attempt)
+    client.meta.events.register("after-call", finish_call)
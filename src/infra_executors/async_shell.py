@@ -0,0 +1,258 @@
+"""Asyncio based engine for shell commands.
+
+Unlike `infra_executors.utils.execute_shell_command`, which blocks a thread on
+reading a single process, all commands of a worker process are driven by one
+event loop running in a background thread. Threads of a job, i.e. parallel
+provisioning steps, only wait for their results, so a worker runs several
+terraform processes while reading their output from a single thread. Each
+process streams its output to its own log file and consumers and can have its
+own timeout, after which its whole process group is killed.
+"""
+import asyncio
+import logging
+import os
+import signal
+import threading
+from collections import deque
+from typing import Deque, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+from infra_executors.utils import OutputConsumer, _line_handler
+
+logger = logging.getLogger(__name__)
+
+# max length of a single output line
+STREAM_LIMIT_BYTES = 1024 * 1024
+
+_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_LOOP_LOCK = threading.Lock()
+
+
+class ShellCommand(NamedTuple):
+    """Shell command to be executed by the engine."""
+
+    cmd: List[str]
+    env_vars: Optional[Mapping[str, str]]
+    cwd: Optional[str]
+    log_to: Optional[str]
+    # seconds, process is killed once it runs longer than that
+    timeout: Optional[float] = None
+    # called with every line of the process output
+    consumers: Sequence[OutputConsumer] = ()
+    # capture complete stdout, stderr is written to the log only
+    capture_output: bool = False
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """Return event loop of the engine, start it on first use."""
+    global _LOOP
+    with _LOOP_LOCK:
+        if _LOOP is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=loop.run_forever, name="shell-commands", daemon=True
+            ).start()
+            _LOOP = loop
+        return _LOOP
+
+
+def _reset_after_fork() -> None:
+    """Loop thread doesn't survive fork, i.e. of celery pool workers."""
+    global _LOOP, _LOOP_LOCK
+    _LOOP = None
+    _LOOP_LOCK = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+async def _stream_output(
+    process: asyncio.subprocess.Process, command: ShellCommand, tail: Deque[str]
+) -> None:
+    """Read process output line by line and pass it on."""
+    logfile = open(command.log_to, "ab") if command.log_to else None
+    try:
+        handle_line = _line_handler(logfile, command.consumers, tail)
+        async for line in process.stdout:  # type: ignore
+            handle_line(line)
+    finally:
+        if logfile:
+            logfile.close()
+
+
+async def _capture_output(
+    process: asyncio.subprocess.Process, captured: List[bytes]
+) -> None:
+    """Read complete process stdout."""
+    captured.append(await process.stdout.read())  # type: ignore
+
+
+def _kill(process: asyncio.subprocess.Process) -> None:
+    """Kill process together with terraform plugins it started."""
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+async def run_shell_command(command: ShellCommand) -> Tuple[int, str]:
+    """Execute shell command within the running event loop.
+
+    Parameters
+    ----------
+    command : ShellCommand
+        command to execute
+
+    Returns
+    -------
+    process return code : int
+        0 - success
+        1 - error
+        -N - process was terminated by signal N, -9 when it timed out
+    output : str
+        complete stdout if capture_output is set, otherwise the tail of
+        combined stdout and stderr of the process
+    """
+    logfile = (
+        open(command.log_to, "ab")
+        if command.capture_output and command.log_to
+        else None
+    )
+    tail: Deque[str] = deque()
+    captured: List[bytes] = []
+    try:
+        process = await asyncio.create_subprocess_exec(
+            "/bin/sh",
+            "-c",
+            *command.cmd,
+            env=command.env_vars,
+            cwd=command.cwd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=logfile if command.capture_output else asyncio.subprocess.STDOUT,
+            limit=STREAM_LIMIT_BYTES,
+            # own process group, so timeouts kill terraform and its plugins as well
+            start_new_session=True,
+        )
+    finally:
+        if logfile:
+            logfile.close()
+
+    reader = (
+        _capture_output(process, captured)
+        if command.capture_output
+        else _stream_output(process, command, tail)
+    )
+    try:
+        await asyncio.wait_for(reader, timeout=command.timeout)
+        await process.wait()
+    except asyncio.TimeoutError:
+        logger.error(
+            "Command timed out after %s seconds: %s", command.timeout, command.cmd
+        )
+        _kill(process)
+        await process.wait()
+    except asyncio.CancelledError:
+        # caller stopped waiting, i.e. celery time limit of the task
+        _kill(process)
+        raise
+
+    if command.capture_output:
+        return process.returncode, b"".join(captured).decode()  # type: ignore
+    if process.returncode != 0:
+        logger.error(
+            "Command exited with %s. Output tail:\n%s",
+            process.returncode,
+            "".join(tail),
+        )
+    return process.returncode, "".join(tail)  # type: ignore
+
+
+async def run_shell_commands(
+    commands: Sequence[ShellCommand], max_concurrency: Optional[int] = None
+) -> List[Tuple[int, str]]:
+    """Execute shell commands concurrently.
+
+    Parameters
+    ----------
+    commands : list of ShellCommand
+    max_concurrency : int
+        max number of processes running at the same time, unbound if not set
+
+    Returns
+    -------
+    list of (return code, output) in the order of provided commands
+    """
+    semaphore = asyncio.Semaphore(max_concurrency or len(commands) or 1)
+
+    async def run_bounded(command: ShellCommand) -> Tuple[int, str]:
+        async with semaphore:
+            return await run_shell_command(command)
+
+    return list(await asyncio.gather(*[run_bounded(c) for c in commands]))
+
+
+def _wait_for(coro):
+    """Run coroutine on the engine loop and block the calling thread on it."""
+    future = asyncio.run_coroutine_threadsafe(coro, get_event_loop())
+    try:
+        return future.result()
+    except BaseException:
+        # stops the command if the caller is interrupted
+        future.cancel()
+        raise
+
+
+def execute_shell_commands(
+    commands: Sequence[ShellCommand], max_concurrency: Optional[int] = None
+) -> List[Tuple[int, str]]:
+    """Blocking entrypoint to execute shell commands concurrently."""
+    return _wait_for(run_shell_commands(commands, max_concurrency))
+
+
+def execute_shell_command_async(
+    cmd: List[str],
+    env_vars: Optional[Mapping[str, str]],
+    cwd: Optional[str],
+    log_to: Optional[str],
+    capture_output: bool = False,
+    consumers: Sequence[OutputConsumer] = (),
+    timeout: Optional[float] = None,
+) -> Tuple[int, str]:
+    """Drop-in replacement of `execute_shell_command` backed by the engine.
+
+    Calls from several threads run their processes concurrently on the loop
+    of the engine.
+
+    Parameters
+    ----------
+    cmd : list
+        a list of command and it's arguments and options.
+    env_vars : dict
+        subprocess environment variables
+    cwd : str
+        current working directory
+    log_to : str
+        file to which all logs will be written to
+    capture_output : bool
+        capture complete stdout, for commands which output is parsed
+    consumers : list of callables
+        called with every line of the process output
+    timeout : float
+        seconds after which the process is killed
+
+    Returns
+    -------
+    process return code and output, same as `execute_shell_command`
+    """
+    return _wait_for(
+        run_shell_command(
+            ShellCommand(
+                cmd=cmd,
+                env_vars=env_vars,
+                cwd=cwd,
+                log_to=log_to,
+                timeout=timeout,
+                consumers=consumers,
+                capture_output=capture_output,
+            )
+        )
+    )
@@ -24,7 +24,10 @@ class BuildWorkerConfigs(NamedTuple):
 
 
 def launch_build_worker_server(
-    creds: AwsCredentials, params: GeneralConfiguration, run_config: BuildWorkerConfigs
+    creds: AwsCredentials,
+    params: GeneralConfiguration,
+    run_config: BuildWorkerConfigs,
+    force: bool = False,
 ):
     logger.info("Executing run_id=%s", params.run_id)
     executor = TerraformExecutor(
@@ -39,7 +42,7 @@ def launch_build_worker_server(
             variables_file_name="",
         ),
     )
-    return executor.execute_apply()
+    return executor.execute_apply(force=force)
 
 
 def remove_build_worker_server(
@@ -7,6 +7,8 @@ from infra_executors.terraform_executor import TerraformExecutor, ExecutorConfig
 
 logger = logging.getLogger(__name__)
 
+APPLY_TIMEOUT_SECONDS = 60 * 60
+
 
 class CacheConfigs(NamedTuple):
     """Configures cache executor."""
@@ -25,7 +27,10 @@ class CacheConfigs(NamedTuple):
 
 
 def create_cache(
-    creds: AwsCredentials, params: GeneralConfiguration, cache_conf: CacheConfigs
+    creds: AwsCredentials,
+    params: GeneralConfiguration,
+    cache_conf: CacheConfigs,
+    force: bool = False,
 ) -> Any:
     """Create a database."""
     logger.info("Executing run id=%s", params.run_id)
@@ -38,9 +43,11 @@ def create_cache(
             action="create",
             config_dir="elasticache",
             state_key=build_project_state_key(params, "elasticache"),
+            use_async_engine=True,
+            command_timeout=APPLY_TIMEOUT_SECONDS,
         ),
     )
-    return executor.execute_apply()
+    return executor.execute_apply(force=force)
 
 
 def destroy_cache(
@@ -57,6 +64,8 @@ def destroy_cache(
             action="destroy",
             config_dir="elasticache",
             state_key=build_project_state_key(params, "elasticache"),
+            use_async_engine=True,
+            command_timeout=APPLY_TIMEOUT_SECONDS,
         ),
     )
     executor.execute_destroy()
@@ -77,6 +86,8 @@ def get_cache_details(
             action="outputs",
             config_dir="elasticache",
             state_key=build_project_state_key(params, "elasticache"),
+            use_async_engine=True,
+            command_timeout=APPLY_TIMEOUT_SECONDS,
         ),
     )
-    return executor.get_outputs()
+    return executor.get_outputs(read_state=True)
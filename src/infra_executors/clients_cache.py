@@ -0,0 +1,118 @@
+"""Per process cache of boto3 clients.
+
+Creating a client loads botocore service models and opens a new connection
+pool, which takes longer than most api calls. Clients are thread-safe, so one
+client is shared by all threads of the process calling the same service in
+the same region with the same credentials, and its connections are reused
+between calls.
+
+Clients expire after `CLIENT_TTL_SECONDS`, so connections don't go stale and
+clients of rotated credentials don't stay around, and the least recently used
+client is dropped once the cache holds `MAX_CACHED_CLIENTS`.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, Callable, Dict, NamedTuple, Tuple
+
+from common.metrics import Counter
+from infra_executors.constants import AwsCredentials
+
+CLIENT_TTL_SECONDS = 30 * 60
+MAX_CACHED_CLIENTS = 64
+
+CLIENT_LOOKUPS = Counter(
+    "chiliseed_boto3_client_lookups_total",
+    "Lookups of cached boto3 clients, by result: hit or miss.",
+    ["service", "result"],
+)
+
+# service name, region, credentials fingerprint
+ClientKey = Tuple[str, str, str]
+
+
+def get_credentials_fingerprint(creds: AwsCredentials) -> str:
+    """Identify credentials without exposing the secret in cache keys."""
+    return hashlib.blake2b(
+        f"{creds.access_key}:{creds.secret_key}:{creds.session_key}".encode(),
+        digest_size=16,
+    ).hexdigest()
+
+
+def get_client_key(service_name: str, creds: AwsCredentials) -> ClientKey:
+    return service_name, creds.region, get_credentials_fingerprint(creds)
+
+
+class CachedClient(NamedTuple):
+    client: Any
+    expires_at: float
+
+
+class ClientsCache:
+    """Thread-safe LRU cache of clients with expiration."""
+
+    def __init__(
+        self, ttl: float = CLIENT_TTL_SECONDS, max_size: int = MAX_CACHED_CLIENTS
+    ):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.clients: "OrderedDict[ClientKey, CachedClient]" = OrderedDict()
+        # creation locks of missing clients
+        self.creating: Dict[ClientKey, threading.Lock] = {}
+
+    def after_fork(self) -> None:
+        """Connections of the parent process can't be shared, start empty."""
+        self.lock = threading.Lock()
+        self.clients = OrderedDict()
+        self.creating = {}
+
+    def _lookup(self, key: ClientKey) -> Any:
+        """Return live client of the key or None, caller holds the lock."""
+        cached = self.clients.get(key)
+        if cached is None:
+            return None
+        if cached.expires_at <= monotonic():
+            del self.clients[key]
+            return None
+        self.clients.move_to_end(key)
+        return cached.client
+
+    def get(self, key: ClientKey, create: Callable[[], Any]) -> Any:
+        """Return cached client of the key, create and cache it if it is missing.
+
+        A client is created once, threads asking for it meanwhile wait for it.
+        Lookups of other clients are not blocked by the creation.
+        """
+        with self.lock:
+            client = self._lookup(key)
+            if client is None:
+                creating = self.creating.setdefault(key, threading.Lock())
+        if client is not None:
+            CLIENT_LOOKUPS.inc(service=key[0], result="hit")
+            return client
+
+        with creating:
+            with self.lock:
+                client = self._lookup(key)
+            if client is not None:
+                CLIENT_LOOKUPS.inc(service=key[0], result="hit")
+                return client
+
+            CLIENT_LOOKUPS.inc(service=key[0], result="miss")
+            try:
+                client = create()
+            finally:
+                with self.lock:
+                    self.creating.pop(key, None)
+                    if client is not None:
+                        self.clients[key] = CachedClient(client, monotonic() + self.ttl)
+                    while len(self.clients) > self.max_size:
+                        self.clients.popitem(last=False)
+        return client
+
+
+CLIENTS_CACHE = ClientsCache()
+os.register_at_fork(after_in_child=CLIENTS_CACHE.after_fork)
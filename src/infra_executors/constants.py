@@ -8,8 +8,16 @@ TERRAFORM_DIR = os.path.join(INFRA_DIR, "terraform")
 EXEC_LOGS_DIR = os.path.join(INFRA_DIR, "exec_logs")
 TERRAFORM_PLUGIN_DIR = os.path.join("/root", ".terraform.d", "plugins", "linux_amd64")
 PLANS_DIR = os.path.join(INFRA_DIR, "terraform_plans")
+WORKSPACES_DIR = os.path.join(INFRA_DIR, "terraform_workspaces")
+OUTPUTS_CACHE_DIR = os.path.join(INFRA_DIR, "outputs_cache")
+FINGERPRINTS_DIR = os.path.join(INFRA_DIR, "apply_fingerprints")
+LOCKS_DIR = os.path.join(INFRA_DIR, "locks")
 KEYS_DIR = os.path.join(INFRA_DIR, "key_pairs")
 
+# s3 backend configured in every terraform config dir
+TERRAFORM_STATE_BUCKET = "chiliseed-dev-terraform-states"
+TERRAFORM_STATE_REGION = "us-east-2"
+
 
 class AwsCredentials(NamedTuple):
     """AWS credentials configs."""
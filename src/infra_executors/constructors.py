@@ -1,7 +1,8 @@
 """Methods that construct objects from input."""
 import json
 import logging
-from typing import Mapping, NamedTuple, Optional, TYPE_CHECKING, Type
+import os
+from typing import Any, Dict, Mapping, NamedTuple, Optional, TYPE_CHECKING, Type
 
 
 logger = logging.getLogger(__name__)
@@ -32,12 +33,7 @@ def build_env_vars(
     env_vars : dict
         dict of env vars required for terraform execution
     """
-    env_vars = dict(
-        AWS_ACCESS_KEY_ID=aws_credentials.access_key,
-        AWS_SECRET_ACCESS_KEY=aws_credentials.secret_key,
-        AWS_SESSION_TOKEN=aws_credentials.session_key,
-        AWS_DEFAULT_REGION=aws_credentials.region,
-    )
+    env_vars = build_aws_env_vars(aws_credentials)
 
     for key, value in generic_configs._asdict().items():
         env_vars[f"TF_VAR_{key}"] = str(value)
@@ -57,10 +53,65 @@ def build_env_vars(
 
             env_vars[f"TF_VAR_{key}"] = formatted_val
 
-    logger.debug("env vars: %s", env_vars)
     return env_vars
 
 
+def build_aws_env_vars(aws_credentials: "AwsCredentials") -> Dict[str, str]:
+    """Construct environment variables with aws credentials for terraform."""
+    return dict(
+        AWS_ACCESS_KEY_ID=aws_credentials.access_key,
+        AWS_SECRET_ACCESS_KEY=aws_credentials.secret_key,
+        AWS_SESSION_TOKEN=aws_credentials.session_key,
+        AWS_DEFAULT_REGION=aws_credentials.region,
+    )
+
+
+def _to_tfvar(value: Any) -> Any:
+    if isinstance(value, list):
+        return [v._asdict() if hasattr(v, "_asdict") else v for v in value]
+    if isinstance(value, bool):
+        return value
+    return str(value)
+
+
+def build_tfvars(
+    generic_configs: "GeneralConfiguration",
+    cmd_params: Optional[Type["NamedTupleProtocol"]],
+) -> Dict[str, Any]:
+    """Construct terraform input variables.
+
+    Values are the same as `build_env_vars` produces, but lists and bools are
+    kept as they are, to be written to a tfvars json file.
+
+    Parameters
+    ----------
+    generic_configs : infra_executors.constants.GeneralConfiguration
+        common configs for every terraform execution.
+    cmd_params : NamedTuple
+        named tuple with command specific params
+
+    Returns
+    -------
+    tfvars : dict
+        terraform variables by name
+    """
+    tfvars = {key: str(value) for key, value in generic_configs._asdict().items()}
+    if cmd_params:
+        for key, value in cmd_params._asdict().items():
+            tfvars[key] = _to_tfvar(value)
+    return tfvars
+
+
+def write_tfvars(path: str, tfvars: Mapping[str, Any]) -> None:
+    """Write terraform input variables to `*.auto.tfvars.json` file.
+
+    File is readable by the owner only, variables can hold secrets.
+    """
+    tfvars_fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with open(tfvars_fd, "w") as tfvars_file:
+        json.dump(tfvars, tfvars_file)
+
+
 def build_project_state_key(
     generic_configs: "GeneralConfiguration", component_name: str
 ) -> str:
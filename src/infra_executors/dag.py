@@ -0,0 +1,115 @@
+"""Runs dependent provisioning steps.
+
+Steps declare which other steps they depend on. Every step starts as soon as
+all of its dependencies are done, so independent terraform runs go in
+parallel and wall time is bound by the longest chain of dependent steps.
+Steps run in a copy of the caller's context, so they are timed as part of
+the caller's run.
+"""
+from contextvars import copy_context
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Sequence, Set
+
+from infra_executors.logger import get_logger
+
+logger = get_logger("dag")
+
+# bound on terraform runs executed at the same time by a single job
+MAX_PARALLEL_STEPS = 3
+
+
+class DagError(Exception):
+    """Indicates invalid steps graph."""
+
+
+class Step(NamedTuple):
+    """Single provisioning step."""
+
+    name: str
+    # called with results of the dependencies, keyed by step name
+    run: Callable[[Mapping[str, Any]], Any]
+    depends_on: Sequence[str] = ()
+
+
+def validate_steps(steps: Sequence[Step]) -> None:
+    """Check that step names are unique, dependencies exist and there are no cycles.
+
+    Raises
+    ------
+    DagError
+    """
+    names = [step.name for step in steps]
+    if len(names) != len(set(names)):
+        raise DagError(f"Duplicate step names: {names}")
+
+    dependencies = {step.name: set(step.depends_on) for step in steps}
+    for name, depends_on in dependencies.items():
+        unknown = depends_on - dependencies.keys()
+        if unknown:
+            raise DagError(f"Step {name} depends on unknown steps {unknown}")
+
+    resolved: Set[str] = set()
+    while len(resolved) < len(dependencies):
+        ready = {
+            name
+            for name, depends_on in dependencies.items()
+            if name not in resolved and depends_on <= resolved
+        }
+        if not ready:
+            unresolved = dependencies.keys() - resolved
+            raise DagError(f"Cyclic dependency between steps {unresolved}")
+        resolved |= ready
+
+
+def run_steps(
+    steps: Sequence[Step], max_parallel: int = MAX_PARALLEL_STEPS
+) -> Dict[str, Any]:
+    """Run steps in dependency order, independent steps in parallel.
+
+    If a step fails, no new steps are started, running steps are waited for and
+    the exception of the failed step is raised.
+
+    Parameters
+    ----------
+    steps : list of Step
+    max_parallel : int
+        max number of steps running at the same time
+
+    Returns
+    -------
+    dict
+        results of all steps, keyed by step name
+    """
+    validate_steps(steps)
+
+    results: Dict[str, Any] = {}
+    pending: List[Step] = list(steps)
+    running: Dict[Future, Step] = {}
+    failure = None
+
+    with ThreadPoolExecutor(max_workers=max_parallel) as pool:
+        while pending or running:
+            if not failure:
+                for step in [s for s in pending if set(s.depends_on) <= results.keys()]:
+                    logger.info("Starting step %s", step.name)
+                    dependencies = {name: results[name] for name in step.depends_on}
+                    running[
+                        pool.submit(copy_context().run, step.run, dependencies)
+                    ] = step
+                    pending.remove(step)
+            elif not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                step = running.pop(future)
+                try:
+                    results[step.name] = future.result()
+                    logger.info("Finished step %s", step.name)
+                except Exception as err:  # pylint: disable=broad-except
+                    logger.error("Step %s failed: %s", step.name, err)
+                    failure = failure or err
+
+    if failure:
+        raise failure
+    return results
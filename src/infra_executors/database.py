@@ -11,6 +11,9 @@ from infra_executors.terraform_executor import (
 
 logger = get_logger("db")
 
+# rds create/destroy can take up to 30 minutes
+APPLY_TIMEOUT_SECONDS = 60 * 60
+
 
 class DBConfigs(NamedTuple):
     """Configures db executor."""
@@ -26,7 +29,10 @@ class DBConfigs(NamedTuple):
 
 
 def create_postgresql(
-    creds: AwsCredentials, params: GeneralConfiguration, db_conf: DBConfigs
+    creds: AwsCredentials,
+    params: GeneralConfiguration,
+    db_conf: DBConfigs,
+    force: bool = False,
 ) -> Any:
     """Create a database."""
     logger.info("Executing run id=%s", params.run_id)
@@ -39,9 +45,11 @@ def create_postgresql(
             action="create",
             config_dir="postgres",
             state_key=build_resource_state_key(params, "postgres"),
+            use_async_engine=True,
+            command_timeout=APPLY_TIMEOUT_SECONDS,
         ),
     )
-    return executor.execute_apply()
+    return executor.execute_apply(force=force)
 
 
 def destroy_postgresql(
@@ -58,6 +66,8 @@ def destroy_postgresql(
             action="destroy",
             config_dir="postgres",
             state_key=build_resource_state_key(params, "postgres"),
+            use_async_engine=True,
+            command_timeout=APPLY_TIMEOUT_SECONDS,
         ),
     )
     executor.execute_destroy()
@@ -6,7 +6,10 @@ from typing import Any, Optional, List
 
 import botocore.exceptions  # type: ignore
 
+from common.metrics import Histogram
+
 from infra_executors.constants import AwsCredentials, GeneralConfiguration
+from infra_executors.timing import span
 from infra_executors.utils import get_boto3_client
 
 
@@ -19,6 +22,13 @@ ALB_PORT = 80
 CONTAINER_HEALTH_CHECK_URI = "/health/check"
 SERVICE_NAME = FAMILY_NAME = f"chiliseed-{DEMO_APP}"
 
+SCALE_CHECKS = Histogram(
+    "chiliseed_service_scale_checks",
+    "Checks of ecs service scale until it reached the desired count.",
+    ["status"],
+    buckets=(1, 5, 10, 30, 60, 120, 300, 600, 1800),
+)
+
 
 class DeployError(Exception):
     """Exceptions thrown by put task definition."""
@@ -93,6 +103,7 @@ def put_task_definition(
     return task_definition
 
 
+@span("deployment", "wait_for_service_scale")
 def wait_for_service_scale(
     creds: AwsCredentials,
     cluster: str,
@@ -122,6 +133,7 @@ def wait_for_service_scale(
         resp = client.describe_services(cluster=cluster, services=[service_name])
         if not resp["services"]:
             logger.error("Service not found")
+            SCALE_CHECKS.observe(waited_seconds + 1, status="not_found")
             return
 
         service = resp["services"][0]
@@ -143,11 +155,13 @@ def wait_for_service_scale(
                 service_name,
                 desired_count,
             )
+            SCALE_CHECKS.observe(waited_seconds + 1, status="scaled")
             return
 
         sleep(1)
         waited_seconds += 1
 
+    SCALE_CHECKS.observe(waited_seconds, status="timeout")
     raise Exception(
         f"Service {service_name} scale to "
         f"desired count of {desired_count} TIMED OUT"
@@ -19,7 +19,10 @@ class ECRConfigs(NamedTuple):
 
 
 def create_ecr(
-    creds: AwsCredentials, params: GeneralConfiguration, ecr_conf: ECRConfigs
+    creds: AwsCredentials,
+    params: GeneralConfiguration,
+    ecr_conf: ECRConfigs,
+    force: bool = False,
 ) -> Any:
     """Create and manage alb."""
     logger.info("Executing run_id=%s", params.run_id)
@@ -35,7 +38,7 @@ def create_ecr(
             variables_file_name="",
         ),
     )
-    return executor.execute_apply()
+    return executor.execute_apply(force=force)
 
 
 def destroy_ecr(
@@ -92,7 +92,10 @@ def create_ssh_key(name: str, aws_creds: AwsCredentials) -> str:
 
 
 def create_ecs_cluster(
-    creds: AwsCredentials, params: GeneralConfiguration, ecs_conf: ECSConfigs
+    creds: AwsCredentials,
+    params: GeneralConfiguration,
+    ecs_conf: ECSConfigs,
+    force: bool = False,
 ) -> Any:
     """Create ecs cluster with asg."""
     logger.info("Executing run_id=%s", params.run_id)
@@ -119,7 +122,7 @@ def create_ecs_cluster(
             variables_file_name="",
         ),
     )
-    return executor.execute_apply()
+    return executor.execute_apply(force=force)
 
 
 def destroy_ecs_cluster(
@@ -159,4 +162,4 @@ def get_ecs_cluster_details(
             variables_file_name="",
         ),
     )
-    return executor.get_outputs()
+    return executor.get_outputs(read_state=True)
@@ -3,6 +3,7 @@ from typing import NamedTuple, Any, Dict
 
 from infra_executors.alb import create_alb, ALBConfigs, destroy_alb, get_alb_details
 from infra_executors.constants import AwsCredentials, GeneralConfiguration
+from infra_executors.dag import Step, run_steps
 from infra_executors.ecs import (
     ECSConfigs,
     create_ecs_cluster,
@@ -45,46 +46,70 @@ def create_global_parts(
         same vpc can host multiple projects, so vpc with name 'development` can host
         demo api, demo micro service 2 and etc.
     """
-    logger.info(
-        "Creating environment network. run_id=%s project_name=%s environment=%s",
-        common_conf.run_id,
-        common_conf.project_name,
-        common_conf.env_name,
-    )
-    network = create_network(creds, common_conf)
-    logger.info("Created new vpc %s", network["vpc_id"])
 
-    logger.info("Setting up route 53 for the project")
-    route53 = create_route53(creds, common_conf, route53_conf)
-    logger.info("Created new route53 zone: %s", route53["primary_zone_id"]["value"])
-    return network, route53
+    def setup_network(_):
+        logger.info(
+            "Creating environment network. run_id=%s project_name=%s environment=%s",
+            common_conf.run_id,
+            common_conf.project_name,
+            common_conf.env_name,
+        )
+        network = create_network(creds, common_conf)
+        logger.info("Created new vpc %s", network["vpc_id"])
+        return network
+
+    def setup_route53(_):
+        logger.info("Setting up route 53 for the project")
+        route53 = create_route53(creds, common_conf, route53_conf)
+        logger.info("Created new route53 zone: %s", route53["primary_zone_id"]["value"])
+        return route53
+
+    infra = run_steps([Step("network", setup_network), Step("route53", setup_route53)])
+    return infra["network"], infra["route53"]
 
 
 def launch_project_infra(
-    creds: AwsCredentials, common_conf: GeneralConfiguration
+    creds: AwsCredentials, common_conf: GeneralConfiguration, force: bool = False
 ) -> Any:
     """Launch infrastructure for new service.
 
-    common_conf.project_name here relates to service being launched.
+    common_conf.project_name here relates to service being launched. Applies
+    with unchanged inputs are skipped, unless forced.
     """
     if not common_conf.vpc_id:
         raise ESCEnvironmentError("Must provide VPC ID.")
 
-    logger.info("Creating alb.")
-    alb_conf = ALBConfigs(
-        alb_name=f"{common_conf.project_name}-{common_conf.env_slug}",
-        open_ports=[],
-    )
-    alb = create_alb(creds, common_conf, alb_conf)
-    logger.info(
-        "Created alb %s with dns %s", alb["alb_name"]["value"], alb["alb_arn"]["value"],
+    def setup_alb(_):
+        logger.info("Creating alb.")
+        alb_conf = ALBConfigs(
+            alb_name=f"{common_conf.project_name}-{common_conf.env_slug}",
+            open_ports=[],
+        )
+        alb = create_alb(creds, common_conf, alb_conf, force)
+        logger.info(
+            "Created alb %s with dns %s",
+            alb["alb_name"]["value"],
+            alb["alb_arn"]["value"],
+        )
+        return alb
+
+    def setup_ecs(dependencies):
+        logger.info("Launching ECS cluster")
+        ecs_conf = build_ecs_conf(
+            dependencies["alb"]["alb_security_group_id"]["value"], common_conf
+        )
+        ecs = create_ecs_cluster(creds, common_conf, ecs_conf, force)
+        logger.info("Created ECS cluster %s", ecs["cluster"])
+        return ecs
+
+    infra = run_steps(
+        [
+            Step("alb", setup_alb),
+            # cluster instances accept traffic only from the alb security group
+            Step("ecs", setup_ecs, depends_on=["alb"]),
+        ]
     )
-
-    logger.info("Launching ECS cluster")
-    ecs_conf = build_ecs_conf(alb["alb_security_group_id"]["value"], common_conf)
-    ecs = create_ecs_cluster(creds, common_conf, ecs_conf)
-    logger.info("Created ECS cluster %s", ecs["cluster"])
-    return alb, ecs
+    return infra["alb"], infra["ecs"]
 
 
 def build_ecs_conf(alb_security_group_id, common_conf):
@@ -1,14 +1,37 @@
-"""Manages service infra."""
+"""Manages service infra.
+
+Service alb listener, cname record and ecr repo are kept in terraform states of
+the service, so changes to a service refresh only resources of that service.
+
+Services created before that (`ServiceConf.own_states` unset) keep these parts
+in the shared project alb, environment route53 and project ecr states, and
+both modes are supported for good. They are not migrated: shared stacks index
+listeners, target groups, records and repos by position in the list of
+services, so moving one service with `terraform state mv` renumbers the
+resources of all others, and the target group name carries the random suffix
+of its stack, so the service stack would replace it, dropping traffic. Legacy
+services move to their own states only by being recreated.
+"""
 from typing import NamedTuple
 
 from infra_executors.acm import create_acm, SSLConfigs, destroy_acm
-from infra_executors.alb import ALBConfigs, create_alb
+from infra_executors.alb import (
+    ALBConfigs,
+    ALBListenerConfigs,
+    create_alb,
+    create_alb_listener,
+    destroy_alb_listener,
+)
 from infra_executors.constants import AwsCredentials, GeneralConfiguration
+from infra_executors.dag import Step, run_steps
 from infra_executors.ecr import ECRConfigs, create_ecr, destroy_ecr
 from infra_executors.logger import get_logger
 from infra_executors.route53 import (
+    CnameRecordConfigs,
     Route53Configuration,
+    create_cname_record,
     create_route53,
+    destroy_cname_record,
     CnameSubDomain,
     get_r53_details,
 )
@@ -27,6 +50,7 @@ def create_acm_for_service(
     route53_conf: Route53Configuration,
     subdomain: str,
     r53_zone_id: str,
+    force: bool = False,
 ):
     """Creates acm certificate for service subdomain."""
     logger.info("Setting up acm certificate")
@@ -36,6 +60,7 @@ def create_acm_for_service(
         SSLConfigs(
             domain_name=f"{subdomain}.{route53_conf.domain}", zone_id=r53_zone_id,
         ),
+        force,
     )
     logger.info("Created acm certificate: %s", acm["this_acm_certificate_arn"]["value"])
     return acm["this_acm_certificate_arn"]["value"]
@@ -44,26 +69,85 @@ def create_acm_for_service(
 def launch_infa_for_service(
     creds: AwsCredentials,
     common_conf: GeneralConfiguration,
-    route53_conf: Route53Configuration,
-    alb_conf: ALBConfigs,
+    listener_conf: ALBListenerConfigs,
+    cname_conf: CnameRecordConfigs,
     ecr_conf: ECRConfigs,
+    force: bool = False,
 ):
-    logger.info("Updating alb - opening ports.")
-    alb = create_alb(creds, common_conf, alb_conf)
-    logger.info("ALB updated")
-
-    logger.info("Update route 53 with subdomains")
-    route53 = create_route53(creds, common_conf, route53_conf)
-    logger.info("Created new route53 zone: %s", route53["primary_zone_id"]["value"])
+    def setup_listener(_):
+        logger.info("Creating alb listeners for service.")
+        listener = create_alb_listener(creds, common_conf, listener_conf, force)
+        logger.info("Created target group %s", listener["target_group_arn"]["value"])
+        return listener
+
+    def setup_cname(_):
+        logger.info("Creating cname record for service")
+        cname = create_cname_record(creds, common_conf, cname_conf, force)
+        logger.info("Created cname record %s", cname["subdomain"]["value"])
+        return cname
+
+    def setup_ecr(_):
+        logger.info("Creating ECR repo for service")
+        ecr = create_ecr(creds, common_conf, ecr_conf, force)
+        logger.info("Created ECR repo %s", ecr["repositories_names"]["value"])
+        return ecr
+
+    infra = run_steps(
+        [
+            Step("alb_listener", setup_listener),
+            Step("route53_record", setup_cname),
+            Step("ecr", setup_ecr),
+        ]
+    )
+    return dict(alb_listener=infra["alb_listener"], ecr=infra["ecr"])
 
-    logger.info("Creating ECR repo for service")
-    ecr = create_ecr(creds, common_conf, ecr_conf)
-    logger.info("Created ECR repo %s", ecr["repositories_names"]["value"])
 
-    return dict(alb=alb, ecr=ecr)
+def destroy_service_infra(
+    creds: AwsCredentials,
+    common_conf: GeneralConfiguration,
+    listener_conf: ALBListenerConfigs,
+    cname_conf: CnameRecordConfigs,
+    ecr_conf: ECRConfigs,
+):
+    def remove_ecr(_):
+        logger.info("Removing ECR repo for service")
+        destroy_ecr(creds, common_conf, ecr_conf)
+        logger.info("Removed ECR repo")
+
+    def remove_listener(_):
+        logger.info("Removing alb listeners of service.")
+        destroy_alb_listener(creds, common_conf, listener_conf)
+        logger.info("Removed alb listeners")
+
+    def remove_cname(_):
+        logger.info("Removing cname record of service")
+        destroy_cname_record(creds, common_conf, cname_conf)
+        logger.info("Removed cname record")
+
+    def remove_acm(_):
+        logger.info("Removing ACM and its validation cname in route53")
+        destroy_acm(
+            creds,
+            common_conf,
+            SSLConfigs(
+                domain_name=f"{cname_conf.subdomain}.{cname_conf.domain}",
+                zone_id=cname_conf.zone_id,
+            ),
+        )
+        logger.info("Removed ACM")
+
+    run_steps(
+        [
+            Step("ecr", remove_ecr),
+            Step("alb_listener", remove_listener),
+            Step("route53_record", remove_cname),
+            # certificate can't be removed while https listener is using it
+            Step("acm", remove_acm, depends_on=["alb_listener"]),
+        ]
+    )
 
 
-def destroy_service_infra(
+def destroy_shared_service_infra(
     creds: AwsCredentials,
     common_conf: GeneralConfiguration,
     route53_conf: Route53Configuration,
@@ -72,25 +156,43 @@ def destroy_service_infra(
     r53_zone_id: str,
     subdomain: str,
 ):
-    logger.info("Removing ECR repo for service")
-    destroy_ecr(creds, common_conf, ecr_conf)
-    logger.info("Removed ECR repo")
-
-    logger.info("Updating alb - removing open ports.")
-    alb = create_alb(creds, common_conf, alb_conf)
-    logger.info("ALB updated")
-
-    logger.info("Update route 53 - removing subdomains")
-    route53 = create_route53(creds, common_conf, route53_conf)
-    logger.info("Updated route 53")
-
-    logger.info("Removing ACM and its validation cname in route53")
-    destroy_acm(
-        creds,
-        common_conf,
-        SSLConfigs(
-            domain_name=f"{subdomain}.{route53_conf.domain}", zone_id=r53_zone_id,
-        ),
+    """Remove service that keeps its parts in project and environment states."""
+
+    def remove_ecr(_):
+        logger.info("Removing ECR repo for service")
+        destroy_ecr(creds, common_conf, ecr_conf)
+        logger.info("Removed ECR repo")
+
+    def close_alb_ports(_):
+        logger.info("Updating alb - removing open ports.")
+        alb = create_alb(creds, common_conf, alb_conf)
+        logger.info("ALB updated")
+        return alb
+
+    def remove_subdomain(_):
+        logger.info("Update route 53 - removing subdomains")
+        route53 = create_route53(creds, common_conf, route53_conf)
+        logger.info("Updated route 53")
+        return route53
+
+    def remove_acm(_):
+        logger.info("Removing ACM and its validation cname in route53")
+        destroy_acm(
+            creds,
+            common_conf,
+            SSLConfigs(
+                domain_name=f"{subdomain}.{route53_conf.domain}", zone_id=r53_zone_id,
+            ),
+        )
+        logger.info("Removed ACM")
+
+    infra = run_steps(
+        [
+            Step("ecr", remove_ecr),
+            Step("alb", close_alb_ports),
+            Step("route53", remove_subdomain),
+            # certificate can't be removed while https listener is using it
+            Step("acm", remove_acm, depends_on=["alb"]),
+        ]
     )
-    logger.info("Removed ACM")
-    return dict(alb=alb, route53=route53)
+    return dict(alb=infra["alb"], route53=infra["route53"])
@@ -0,0 +1,110 @@
+"""Fingerprints of successful terraform applies.
+
+A fingerprint covers everything that shapes a plan on our side: content of the
+configuration (including shared modules and installed provider versions), the
+input variables and the target account and region. If an apply with the same
+fingerprint already succeeded and nobody wrote to the state since, a new apply
+would produce an empty plan, so it can be skipped.
+
+Changes made outside of terraform are not detected, runs that must reconcile
+such drift have to be forced.
+"""
+import hashlib
+import json
+import os
+from typing import Any, Mapping, NamedTuple, Optional
+
+from common.crypto import get_uuid_hex
+
+from infra_executors.constants import FINGERPRINTS_DIR
+from infra_executors.logger import get_logger
+from infra_executors.outputs_cache import StateVersion
+from infra_executors.workspace import config_dir_hash
+
+logger = get_logger("fingerprint")
+
+# inputs that change on every run without affecting the plan
+VOLATILE_INPUTS = ("TF_VAR_run_id", "run_id")
+# inputs that identify the target account and region
+ACCOUNT_INPUTS = ("AWS_ACCESS_KEY_ID", "AWS_DEFAULT_REGION")
+
+
+class ApplyRecord(NamedTuple):
+    """Fingerprint of a successful apply and the state it produced."""
+
+    fingerprint: str
+    version: StateVersion
+
+
+def build_fingerprint(config_dir: str, inputs: Mapping[str, Any]) -> str:
+    """Calculate fingerprint of terraform execution inputs.
+
+    Parameters
+    ----------
+    config_dir : str
+        name of the configuration directory inside TERRAFORM_DIR. i.e.: alb
+    inputs : dict
+        terraform environment variables or input variables
+
+    Returns
+    -------
+    str
+        hex digest
+    """
+    relevant_inputs = {
+        key: value
+        for key, value in inputs.items()
+        if key not in VOLATILE_INPUTS
+        and (key in ACCOUNT_INPUTS or not key.startswith("AWS_"))
+    }
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(config_dir_hash(config_dir).encode())
+    digest.update(json.dumps(relevant_inputs, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def _record_file(state_key: str) -> str:
+    file_name = hashlib.blake2b(state_key.encode(), digest_size=16).hexdigest()
+    return os.path.join(FINGERPRINTS_DIR, f"{file_name}.json")
+
+
+def get_apply_record(state_key: str) -> Optional[ApplyRecord]:
+    """Return fingerprint of the last successful apply for the state key."""
+    try:
+        with open(_record_file(state_key)) as record_file:
+            record = json.load(record_file)
+    except (OSError, ValueError):
+        return None
+
+    if record.get("state_key") != state_key:
+        return None
+    return ApplyRecord(
+        fingerprint=record["fingerprint"],
+        version=StateVersion(record["lineage"], record["serial"]),
+    )
+
+
+def record_apply(state_key: str, fingerprint: str, version: StateVersion) -> None:
+    """Save fingerprint of a successful apply."""
+    os.makedirs(FINGERPRINTS_DIR, exist_ok=True)
+    record_file_path = _record_file(state_key)
+    tmp_file_path = f"{record_file_path}.{get_uuid_hex(4)}"
+    with open(tmp_file_path, "w") as record_file:
+        json.dump(
+            dict(
+                state_key=state_key,
+                fingerprint=fingerprint,
+                lineage=version.lineage,
+                serial=version.serial,
+            ),
+            record_file,
+        )
+    os.replace(tmp_file_path, record_file_path)
+
+
+def forget_apply(state_key: str) -> None:
+    """Drop apply record for the state key."""
+    try:
+        os.remove(_record_file(state_key))
+    except FileNotFoundError:
+        pass
@@ -16,7 +16,9 @@ from infra_executors.terraform_executor import (
 logger = get_logger("network")
 
 
-def create_network(creds: AwsCredentials, params: GeneralConfiguration,) -> Any:
+def create_network(
+    creds: AwsCredentials, params: GeneralConfiguration, force: bool = False
+) -> Any:
     """Create vpc with private and subnet network, with internet access."""
     executor = TerraformExecutor(
         creds,
@@ -38,7 +40,7 @@ def create_network(creds: AwsCredentials, params: GeneralConfiguration,) -> Any:
             params.env_name,
         )
         return network_details
-    return executor.execute_apply()
+    return executor.execute_apply(force=force)
 
 
 def get_network_details(creds: AwsCredentials, params: GeneralConfiguration,) -> Any:
@@ -55,7 +57,7 @@ def get_network_details(creds: AwsCredentials, params: GeneralConfiguration,) ->
             variables_file_name="network.tfvars",
         ),
     )
-    return executor.get_outputs()
+    return executor.get_outputs(read_state=True)
 
 
 def destroy_network(creds: AwsCredentials, params: GeneralConfiguration,) -> None:
@@ -0,0 +1,166 @@
+"""Cache of terraform outputs.
+
+Outputs are cached per state key together with the lineage and serial of the
+remote state they were read from. Terraform bumps the serial on every state
+write, so a cached entry is valid as long as the remote state still has the
+same lineage and serial.
+"""
+import hashlib
+import json
+import os
+import re
+from typing import Any, NamedTuple, Optional
+
+import botocore.exceptions  # type: ignore
+
+from common.crypto import get_uuid_hex
+
+from infra_executors.constants import (
+    AwsCredentials,
+    OUTPUTS_CACHE_DIR,
+    TERRAFORM_STATE_BUCKET,
+    TERRAFORM_STATE_REGION,
+)
+from infra_executors.logger import get_logger
+from infra_executors.utils import get_boto3_client
+
+logger = get_logger("outputs-cache")
+
+# serial and lineage are written at the top of the state file
+STATE_HEADER_RANGE = "bytes=0-1023"
+SERIAL_RE = re.compile(r'"serial"\s*:\s*(\d+)')
+LINEAGE_RE = re.compile(r'"lineage"\s*:\s*"([^"]+)"')
+
+
+class StateVersion(NamedTuple):
+    """Identifies a specific write of terraform state."""
+
+    lineage: str
+    serial: int
+
+
+class CachedOutputs(NamedTuple):
+    """Outputs read from a specific state version."""
+
+    version: StateVersion
+    outputs: Any
+    # etag of the state object outputs were parsed from, if known
+    etag: str = ""
+
+
+def get_state_client(creds: AwsCredentials) -> Any:
+    """Return s3 client for the terraform state bucket."""
+    return get_boto3_client("s3", creds._replace(region=TERRAFORM_STATE_REGION))
+
+
+def parse_state_version(state_header: str) -> Optional[StateVersion]:
+    """Extract lineage and serial from the (beginning of) state document."""
+    serial = SERIAL_RE.search(state_header)
+    lineage = LINEAGE_RE.search(state_header)
+    if not serial or not lineage:
+        return None
+    return StateVersion(lineage=lineage.group(1), serial=int(serial.group(1)))
+
+
+def get_state_version(creds: AwsCredentials, state_key: str) -> Optional[StateVersion]:
+    """Read lineage and serial of the remote state.
+
+    Only the header of the state object is downloaded.
+
+    Parameters
+    ----------
+    creds : AwsCredentials
+        aws credentials
+    state_key : str
+        s3 key of the terraform state
+
+    Returns
+    -------
+    StateVersion or None if state does not exist or can't be read
+    """
+    try:
+        response = get_state_client(creds).get_object(
+            Bucket=TERRAFORM_STATE_BUCKET, Key=state_key, Range=STATE_HEADER_RANGE,
+        )
+        state_header = response["Body"].read().decode()
+    except botocore.exceptions.ClientError as err:
+        logger.debug(
+            "Failed to read state version. state_key=%s error=%s",
+            state_key,
+            err.response.get("Error", {}).get("Code"),
+        )
+        return None
+    except botocore.exceptions.BotoCoreError as err:
+        # i.e. connection failed, callers fall back to terraform
+        logger.warning(
+            "Failed to read state version. state_key=%s error=%r", state_key, err
+        )
+        return None
+    return parse_state_version(state_header)
+
+
+def _cache_file(state_key: str) -> str:
+    file_name = hashlib.blake2b(state_key.encode(), digest_size=16).hexdigest()
+    return os.path.join(OUTPUTS_CACHE_DIR, f"{file_name}.json")
+
+
+def load_cached_outputs(state_key: str) -> Optional[CachedOutputs]:
+    """Return cached outputs entry regardless of its state version."""
+    try:
+        with open(_cache_file(state_key)) as cache_file:
+            entry = json.load(cache_file)
+    except (OSError, ValueError):
+        return None
+
+    if entry.get("state_key") != state_key:
+        return None
+    return CachedOutputs(
+        version=StateVersion(entry["lineage"], entry["serial"]),
+        outputs=entry["outputs"],
+        etag=entry.get("etag", ""),
+    )
+
+
+def get_cached_outputs(state_key: str, version: StateVersion) -> Optional[Any]:
+    """Return cached outputs if they were read from the same state version."""
+    entry = load_cached_outputs(state_key)
+    if not entry:
+        return None
+    if entry.version != version:
+        logger.debug("Outputs cache is stale. state_key=%s", state_key)
+        return None
+    logger.info("Using cached outputs. state_key=%s", state_key)
+    return entry.outputs
+
+
+def store_outputs(
+    state_key: str, version: StateVersion, outputs: Any, etag: str = ""
+) -> None:
+    """Save outputs read from the state version."""
+    os.makedirs(OUTPUTS_CACHE_DIR, exist_ok=True)
+    cache_file_path = _cache_file(state_key)
+    tmp_file_path = f"{cache_file_path}.{get_uuid_hex(4)}"
+    # outputs might hold credentials, keep them readable by owner only
+    with open(
+        os.open(tmp_file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w"
+    ) as cache_file:
+        json.dump(
+            dict(
+                state_key=state_key,
+                lineage=version.lineage,
+                serial=version.serial,
+                outputs=outputs,
+                etag=etag,
+            ),
+            cache_file,
+        )
+    os.replace(tmp_file_path, cache_file_path)
+
+
+def invalidate_outputs(state_key: str) -> None:
+    """Drop cached outputs for the state key."""
+    try:
+        os.remove(_cache_file(state_key))
+        logger.debug("Invalidated outputs cache. state_key=%s", state_key)
+    except FileNotFoundError:
+        pass
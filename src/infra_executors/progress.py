@@ -0,0 +1,172 @@
+"""Per-resource progress of terraform runs.
+
+Terraform 0.13 has no machine readable UI for plan and apply, so progress is
+parsed from its human readable output:
+
+    aws_db_instance.this: Creating...
+    aws_db_instance.this: Creation complete after 5m3s [id=db]
+
+Every resource operation is recorded as an event with its start, end and
+duration. Events of all terraform runs of a job are appended to a json lines
+file next to the run logs, so progress can be followed while the job runs.
+"""
+import json
+import os
+import re
+from time import time
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from infra_executors.constants import EXEC_LOGS_DIR
+from infra_executors.logger import get_logger
+
+logger = get_logger("progress")
+
+CREATE = "create"
+UPDATE = "update"
+DESTROY = "destroy"
+READ = "read"
+
+STARTED = {
+    "Creating...": CREATE,
+    "Modifying...": UPDATE,
+    "Destroying...": DESTROY,
+    "Reading...": READ,
+}
+COMPLETED = {
+    "Creation complete": CREATE,
+    "Modifications complete": UPDATE,
+    "Destruction complete": DESTROY,
+    "Read complete": READ,
+}
+
+PROGRESS_LINE = re.compile(
+    r"^(?P<address>\S+): (?P<event>"
+    + "|".join(re.escape(event) for event in [*STARTED, *COMPLETED])
+    + r")(?: after (?P<elapsed>[0-9hms.]+))?"
+)
+ELAPSED_PART = re.compile(r"(?P<value>[0-9.]+)(?P<unit>[hms])")
+SECONDS_IN_UNIT = {"h": 3600, "m": 60, "s": 1}
+
+
+class ResourceEvent(NamedTuple):
+    """Operation on a single resource."""
+
+    # name of the terraform configuration. i.e.: alb
+    executor: str
+    address: str
+    action: str
+    started_at: float
+    finished_at: Optional[float] = None
+    # seconds, as reported by terraform
+    duration: Optional[float] = None
+    is_complete: bool = False
+
+
+def get_events_file(run_id: Any) -> str:
+    """Return path of the file with resource events of the run."""
+    return os.path.join(EXEC_LOGS_DIR, f"resources_{run_id}.jsonl")
+
+
+def parse_elapsed(elapsed: str) -> Optional[float]:
+    """Convert terraform duration, i.e. 5m3s, to seconds."""
+    parts = ELAPSED_PART.findall(elapsed)
+    if not parts:
+        return None
+    return sum(float(value) * SECONDS_IN_UNIT[unit] for value, unit in parts)
+
+
+# operations of a single terraform run which started but didn't complete yet
+InProgress = Dict[Tuple[str, str], ResourceEvent]
+
+
+def record_event(run_id: Any, event: ResourceEvent) -> None:
+    """Append event to the events file of the run."""
+    try:
+        os.makedirs(EXEC_LOGS_DIR, exist_ok=True)
+        with open(get_events_file(run_id), "a") as events_file:
+            events_file.write(json.dumps(event._asdict()) + "\n")
+    except OSError:
+        logger.exception("Failed to record resource event")
+
+
+def track_progress(
+    line: str, executor: str, run_id: Any, in_progress: InProgress
+) -> None:
+    """Record resource event of a line of terraform output, if it has one.
+
+    Bind all arguments but the line, i.e. with `functools.partial`, to get an
+    output consumer of a terraform run.
+
+    Parameters
+    ----------
+    line : str
+        line of terraform output
+    executor : str
+        name of the terraform configuration. i.e.: alb
+    run_id : any
+        id of the execution
+    in_progress : dict
+        operations of the run in progress, updated in place
+    """
+    match = PROGRESS_LINE.match(line.strip())
+    if not match:
+        return
+
+    address, event = match.group("address"), match.group("event")
+    if event in STARTED:
+        resource_event = ResourceEvent(
+            executor=executor,
+            address=address,
+            action=STARTED[event],
+            started_at=time(),
+        )
+        in_progress[(address, resource_event.action)] = resource_event
+        record_event(run_id, resource_event)
+        return
+
+    action = COMPLETED[event]
+    finished_at = time()
+    duration = parse_elapsed(match.group("elapsed") or "")
+    started = in_progress.pop((address, action), None)
+    record_event(
+        run_id,
+        ResourceEvent(
+            executor=executor,
+            address=address,
+            action=action,
+            started_at=(
+                started.started_at if started else finished_at - (duration or 0)
+            ),
+            finished_at=finished_at,
+            duration=duration,
+            is_complete=True,
+        ),
+    )
+
+
+def finish_progress(run_id: Any, in_progress: InProgress) -> None:
+    """Finish operations that never completed, i.e. on failure."""
+    finished_at = time()
+    for event in in_progress.values():
+        record_event(run_id, event._replace(finished_at=finished_at))
+    in_progress.clear()
+
+
+def read_resource_events(run_id: Any) -> List[ResourceEvent]:
+    """Read resource events of the run.
+
+    Later records of the same operation replace earlier ones, so operations
+    in progress are returned with their start only.
+    """
+    events: Dict[Tuple[str, str, str], ResourceEvent] = {}
+    try:
+        with open(get_events_file(run_id)) as events_file:
+            for line in events_file:
+                try:
+                    event = ResourceEvent(**json.loads(line))
+                except (TypeError, ValueError):
+                    continue
+                events[(event.executor, event.address, event.action)] = event
+    except FileNotFoundError:
+        pass
+    return list(events.values())
@@ -0,0 +1,214 @@
+"""Retention of terraform run artifacts on the node.
+
+* plans are removed after a successful apply by the executor, plans of failed
+  runs are kept for PLAN_TTL_SECONDS for investigation.
+* run logs are gzipped once their run ended and nobody writes to them,
+  readers open compressed logs transparently (see `infra_executors.run_logs`).
+* resource events and spans files are removed after EVENTS_TTL_SECONDS, they
+  are stored in the db when the execution ends.
+* run workspaces left behind by killed workers and templates of outdated
+  configurations are removed.
+* oldest logs are removed when logs and plans exceed DISK_BUDGET_BYTES.
+
+Rules apply to artifacts of the node they run on, celery beat sends them to
+workers of every node, see `aws_environments.jobs.maintenance`.
+"""
+import fcntl
+import gzip
+import os
+import shutil
+from time import time
+from typing import Collection, Dict, Iterator, List, Tuple
+
+from common.crypto import get_uuid_hex
+
+from infra_executors.constants import EXEC_LOGS_DIR, LOCKS_DIR, PLANS_DIR
+from infra_executors.logger import get_logger
+from infra_executors.run_logs import COMPRESSED_SUFFIX, open_log
+from infra_executors.workspace import RUNS_DIR, TEMPLATES_DIR, config_dir_hash
+
+logger = get_logger("retention")
+
+PLAN_TTL_SECONDS = 24 * 60 * 60
+# terraform writes progress every 10 seconds, so idle log belongs to a finished run
+LOG_IDLE_SECONDS = 60 * 60
+EVENTS_TTL_SECONDS = 7 * 24 * 60 * 60
+WORKSPACE_TTL_SECONDS = 12 * 60 * 60
+DISK_BUDGET_BYTES = 5 * 1024 * 1024 * 1024
+
+
+def _files(directory: str) -> Iterator[Tuple[str, os.stat_result]]:
+    """Files of the directory with their stats."""
+    try:
+        entries = list(os.scandir(directory))
+    except FileNotFoundError:
+        return
+    for entry in entries:
+        try:
+            if entry.is_file(follow_symlinks=False):
+                yield entry.path, entry.stat()
+        except FileNotFoundError:
+            continue
+
+
+def _remove(path: str) -> int:
+    """Remove file, return number of freed bytes."""
+    try:
+        size = os.path.getsize(path)
+        os.remove(path)
+    except FileNotFoundError:
+        return 0
+    return size
+
+
+def remove_expired_plans(now: float) -> int:
+    """Remove plans older than PLAN_TTL_SECONDS."""
+    return sum(
+        _remove(path)
+        for path, stat in _files(PLANS_DIR)
+        if now - stat.st_mtime > PLAN_TTL_SECONDS
+    )
+
+
+def compress_log(path: str) -> bool:
+    """Replace log with its gzipped version.
+
+    The log is compressed into a single gzip member, so readers get size of
+    the uncompressed log from its trailer. The log is kept if it was written
+    to while being compressed, returns whether it was replaced.
+    """
+    compressed_path = f"{path}{COMPRESSED_SUFFIX}"
+    tmp_path = f"{compressed_path}.{get_uuid_hex(4)}"
+    before = os.stat(path)
+    with gzip.open(tmp_path, "wb") as compressed:
+        if os.path.exists(compressed_path):
+            # run was resumed with the same run id
+            with open_log(compressed_path) as previous:
+                shutil.copyfileobj(previous, compressed)
+        with open(path, "rb") as log_file:
+            shutil.copyfileobj(log_file, compressed)
+
+    after = os.stat(path)
+    if (after.st_size, after.st_mtime_ns) != (before.st_size, before.st_mtime_ns):
+        logger.warning("Log was written to while compressing it %s", path)
+        os.remove(tmp_path)
+        return False
+    shutil.copystat(path, tmp_path)
+    os.replace(tmp_path, compressed_path)
+    os.remove(path)
+    return True
+
+
+def get_log_run_id(path: str) -> str:
+    """Return id of the run the log belongs to, logs are named `*_{run_id}.log`."""
+    return os.path.basename(path)[: -len(".log")].rpartition("_")[2]
+
+
+def compress_idle_logs(now: float, running_run_ids: Collection[str]) -> int:
+    """Compress logs of ended runs which were not written to for LOG_IDLE_SECONDS."""
+    compressed = 0
+    for path, stat in _files(EXEC_LOGS_DIR):
+        if not path.endswith(".log") or now - stat.st_mtime < LOG_IDLE_SECONDS:
+            continue
+        if get_log_run_id(path) in running_run_ids:
+            continue
+        try:
+            compressed += compress_log(path)
+        except OSError:
+            logger.exception("Failed to compress %s", path)
+    return compressed
+
+
+def remove_expired_events(now: float) -> int:
+    """Remove resource events and spans files, they are stored in the db by then."""
+    return sum(
+        _remove(path)
+        for path, stat in _files(EXEC_LOGS_DIR)
+        if path.endswith(".jsonl") and now - stat.st_mtime > EVENTS_TTL_SECONDS
+    )
+
+
+def remove_stale_workspaces(now: float) -> int:
+    """Remove leftovers of killed runs and templates of outdated configs."""
+    removed = 0
+    current_hashes: Dict[str, str] = {}
+    for directory in (RUNS_DIR, TEMPLATES_DIR):
+        try:
+            entries = list(os.scandir(directory))
+        except FileNotFoundError:
+            continue
+        for entry in entries:
+            try:
+                mtime = entry.stat(follow_symlinks=False).st_mtime
+                if now - mtime < WORKSPACE_TTL_SECONDS:
+                    continue
+            except FileNotFoundError:
+                continue
+
+            if directory == TEMPLATES_DIR and ".tmp-" not in entry.name:
+                config_dir, _, template_hash = entry.name.rpartition("-")
+                if config_dir not in current_hashes:
+                    try:
+                        current_hashes[config_dir] = config_dir_hash(config_dir)
+                    except OSError:
+                        current_hashes[config_dir] = ""
+                if current_hashes[config_dir] == template_hash:
+                    continue
+
+            logger.info("Removing stale workspace %s", entry.path)
+            shutil.rmtree(entry.path, ignore_errors=True)
+            removed += 1
+    return removed
+
+
+def enforce_disk_budget(now: float, budget: int = DISK_BUDGET_BYTES) -> int:
+    """Remove oldest idle logs and plans until they fit into the budget."""
+    files: List[Tuple[float, int, str]] = [
+        (stat.st_mtime, stat.st_size, path)
+        for directory in (EXEC_LOGS_DIR, PLANS_DIR)
+        for path, stat in _files(directory)
+    ]
+    total = sum(size for _, size, _ in files)
+    freed = 0
+    for mtime, size, path in sorted(files):
+        if total - freed <= budget:
+            break
+        if now - mtime < LOG_IDLE_SECONDS:
+            # run in progress
+            continue
+        freed += _remove(path)
+    if total - freed > budget:
+        logger.warning(
+            "Run artifacts take %s bytes, over the budget of %s", total - freed, budget
+        )
+    return freed
+
+
+def apply_retention(running_run_ids: Collection[str]) -> Dict[str, int]:
+    """Apply all retention rules to the run artifacts of this node.
+
+    Skipped if another worker of the node is already applying them.
+
+    Parameters
+    ----------
+    running_run_ids : collection of str
+        ids of runs which didn't end yet, their logs are not compressed
+    """
+    os.makedirs(LOCKS_DIR, exist_ok=True)
+    with open(os.path.join(LOCKS_DIR, "retention.lock"), "a") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            logger.info("Retention is already running")
+            return {}
+
+        now = time()
+        summary = dict(
+            plans_freed_bytes=remove_expired_plans(now),
+            logs_compressed=compress_idle_logs(now, running_run_ids),
+            events_freed_bytes=remove_expired_events(now),
+            workspaces_removed=remove_stale_workspaces(now),
+            budget_freed_bytes=enforce_disk_budget(now),
+        )
+    logger.info("Applied retention: %s", summary)
+    return summary
@@ -0,0 +1,44 @@
+"""Classification of transient terraform failures.
+
+Throttled aws calls and a state locked by another run fail terraform, but
+succeed if the same command runs again a bit later.
+"""
+import random
+from typing import Optional
+
+THROTTLING = "throttling"
+STATE_LOCKED = "state locked"
+
+FAILURE_PATTERNS = (
+    ("Error acquiring the state lock", STATE_LOCKED),
+    ("Throttling", THROTTLING),
+    ("Rate exceeded", THROTTLING),
+    ("RequestLimitExceeded", THROTTLING),
+    ("TooManyRequestsException", THROTTLING),
+    ("SlowDown", THROTTLING),
+)
+
+MAX_PHASE_ATTEMPTS = 4
+RETRY_BASE_DELAY_SECONDS = 5
+RETRY_MAX_DELAY_SECONDS = 60
+
+
+def classify_failure(output: str) -> Optional[str]:
+    """Return reason of a transient failure or None if retry won't help.
+
+    Parameters
+    ----------
+    output : str
+        output of the failed terraform command
+    """
+    for pattern, reason in FAILURE_PATTERNS:
+        if pattern in output:
+            return reason
+    return None
+
+
+def get_retry_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter, in seconds."""
+    return random.uniform(  # nosec
+        0, min(RETRY_MAX_DELAY_SECONDS, RETRY_BASE_DELAY_SECONDS * 2 ** attempt)
+    )
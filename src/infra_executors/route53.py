@@ -3,7 +3,10 @@ import logging
 from typing import Any, List, NamedTuple
 
 from infra_executors.constants import AwsCredentials, GeneralConfiguration
-from infra_executors.constructors import build_environment_state_key
+from infra_executors.constructors import (
+    build_environment_state_key,
+    build_service_state_key,
+)
 from infra_executors.terraform_executor import (
     ExecutorConfiguration,
     TerraformExecutor,
@@ -26,10 +29,20 @@ class Route53Configuration(NamedTuple):
     cname_subdomains: List[CnameSubDomain]
 
 
+class CnameRecordConfigs(NamedTuple):
+    """Cname record of a single service."""
+
+    zone_id: str
+    domain: str
+    subdomain: str
+    route_to: str
+
+
 def create_route53(
     creds: AwsCredentials,
     params: GeneralConfiguration,
     run_config: Route53Configuration,
+    force: bool = False,
 ) -> Any:
     """Create and apply changes in route 53."""
     logger.info("Executing run_id=%s", params.run_id)
@@ -45,7 +58,7 @@ def create_route53(
             variables_file_name="",
         ),
     )
-    return executor.execute_apply()
+    return executor.execute_apply(force=force)
 
 
 def destroy_route53(
@@ -88,4 +101,47 @@ def get_r53_details(
             variables_file_name="",
         ),
     )
-    return executor.get_outputs()
+    return executor.get_outputs(read_state=True)
+
+
+def create_cname_record(
+    creds: AwsCredentials,
+    params: GeneralConfiguration,
+    run_config: CnameRecordConfigs,
+    force: bool = False,
+) -> Any:
+    """Create and apply changes to the service cname record."""
+    logger.info("Executing run_id=%s", params.run_id)
+    executor = TerraformExecutor(
+        creds=creds,
+        general_configs=params,
+        cmd_configs=run_config,
+        executor_configs=ExecutorConfiguration(
+            name="route53_record",
+            action="create",
+            config_dir="route53_record",
+            state_key=build_service_state_key(params, "route53_record"),
+            variables_file_name="",
+        ),
+    )
+    return executor.execute_apply(force=force)
+
+
+def destroy_cname_record(
+    creds: AwsCredentials, params: GeneralConfiguration, run_config: CnameRecordConfigs,
+) -> Any:
+    """Remove the service cname record."""
+    logger.info("Executing run_id=%s", params.run_id)
+    executor = TerraformExecutor(
+        creds=creds,
+        general_configs=params,
+        cmd_configs=run_config,
+        executor_configs=ExecutorConfiguration(
+            name="route53_record",
+            action="destroy",
+            config_dir="route53_record",
+            state_key=build_service_state_key(params, "route53_record"),
+            variables_file_name="",
+        ),
+    )
+    return executor.execute_destroy()
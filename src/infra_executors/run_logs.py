@@ -0,0 +1,111 @@
+"""Access to terraform run logs.
+
+Every terraform run of a job writes its own log,
+`EXEC_LOGS_DIR/<name>_<action>_<run_id>.log`, logs are read in chunks from
+a byte offset, so a client can follow them while the run is in progress.
+
+Logs of finished runs are gzipped by retention, they keep their name and
+offsets refer to the uncompressed content.
+"""
+import glob
+import gzip
+import os
+import struct
+from typing import Dict, IO, List, NamedTuple, Optional, Tuple
+
+from infra_executors.constants import EXEC_LOGS_DIR
+
+MAX_CHUNK_BYTES = 64 * 1024
+COMPRESSED_SUFFIX = ".gz"
+
+
+class RunLog(NamedTuple):
+    """Log of a single terraform run."""
+
+    name: str
+    size: int
+
+
+class LogChunk(NamedTuple):
+    """Part of a run log."""
+
+    data: str
+    # offset to continue reading from
+    offset: int
+
+
+def open_log(path: str) -> IO[bytes]:
+    """Open plain or gzipped log for binary reading."""
+    if path.endswith(COMPRESSED_SUFFIX):
+        return gzip.open(path, "rb")  # type: ignore
+    return open(path, "rb")
+
+
+def _log_size(path: str) -> int:
+    """Return size of the uncompressed log.
+
+    Logs are gzipped into a single gzip member, see `retention.compress_log`,
+    so size of a compressed log is read from the trailer of the member.
+    """
+    if not path.endswith(COMPRESSED_SUFFIX):
+        return os.path.getsize(path)
+    with open(path, "rb") as log_file:
+        log_file.seek(-4, os.SEEK_END)
+        # ISIZE, size of uncompressed data modulo 2^32
+        return struct.unpack("<I", log_file.read(4))[0]
+
+
+def _find_logs(run_id: int) -> Dict[str, Tuple[float, str]]:
+    """Map log names of the run to their creation time and path."""
+    logs: Dict[str, Tuple[float, str]] = {}
+    pattern = os.path.join(EXEC_LOGS_DIR, f"*_{run_id}.log")
+    # plain log wins if retention is compressing it right now
+    for path in glob.glob(f"{pattern}{COMPRESSED_SUFFIX}") + glob.glob(pattern):
+        try:
+            ctime = os.stat(path).st_ctime
+        except FileNotFoundError:
+            continue
+        name = os.path.basename(path)
+        if name.endswith(COMPRESSED_SUFFIX):
+            name = name[: -len(COMPRESSED_SUFFIX)]
+        logs[name] = (ctime, path)
+    return logs
+
+
+def get_run_logs(run_id: int) -> List[RunLog]:
+    """List logs of the run, in the order they were started."""
+    logs = []
+    for name, (ctime, path) in _find_logs(run_id).items():
+        try:
+            logs.append((ctime, RunLog(name, _log_size(path))))
+        except FileNotFoundError:
+            continue
+    return [log for _, log in sorted(logs)]
+
+
+def get_run_log_path(run_id: int, name: str) -> Optional[str]:
+    """Return path of the log if it belongs to the run."""
+    log = _find_logs(run_id).get(name)
+    return log[1] if log else None
+
+
+def read_log_chunk(
+    path: str, offset: int, max_bytes: int = MAX_CHUNK_BYTES
+) -> LogChunk:
+    """Read log from the offset.
+
+    Chunks end on a line break when there is one, so lines and multibyte
+    characters are not split between chunks.
+    """
+    try:
+        log_file = open_log(path)
+    except FileNotFoundError:
+        # compressed in the meantime
+        log_file = open_log(f"{path}{COMPRESSED_SUFFIX}")
+    with log_file:
+        log_file.seek(offset)
+        data = log_file.read(max_bytes)
+
+    if len(data) == max_bytes and b"\n" in data:
+        data = data[: data.rindex(b"\n") + 1]
+    return LogChunk(data=data.decode(errors="replace"), offset=offset + len(data))
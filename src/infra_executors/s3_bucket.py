@@ -20,7 +20,10 @@ class S3Configs(NamedTuple):
 
 
 def create_bucket(
-    creds: AwsCredentials, params: GeneralConfiguration, s3_conf: S3Configs
+    creds: AwsCredentials,
+    params: GeneralConfiguration,
+    s3_conf: S3Configs,
+    force: bool = False,
 ) -> Any:
     """Create a bucket."""
     logger.info("Executing run id=%s", params.run_id)
@@ -35,7 +38,7 @@ def create_bucket(
             state_key=build_resource_state_key(params, "s3_bucket"),
         ),
     )
-    return executor.execute_apply()
+    return executor.execute_apply(force=force)
 
 
 def destroy_bucket(
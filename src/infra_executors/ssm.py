@@ -0,0 +1,324 @@
+"""Batched access to ssm parameter store.
+
+Parameter store serves values of up to 10 parameters per call, so values are
+fetched in batches, several batches at a time, while the next page of
+parameters is still being listed. Listing a prefix with up to 50 parameters
+takes about two round trips, independent of the number of parameters.
+
+Parameters of a whole path, i.e. of all services of a project, are read page
+by page with values, in a single chain of calls.
+
+Bulk writes and deletes run concurrently too, under a rate limit of writes per
+account, and report the result of every parameter. Syncing a whole set of
+parameters writes only the ones which differ from their current values.
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import copy_context
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import botocore.exceptions  # type: ignore
+
+from infra_executors.account_limits import (
+    SSM_WRITES_PER_SECOND,
+    RateLimiter,
+    get_rate_limiter,
+)
+from infra_executors.constants import AwsCredentials
+from infra_executors.logger import get_logger
+
+logger = get_logger("ssm")
+
+# max parameters of a single get_parameters or delete_parameters call
+BATCH_SIZE = 10
+# max parameters of a single get_parameters_by_path page
+PATH_PAGE_SIZE = 10
+# calls running at the same time, well within the per account rate limit
+MAX_CONCURRENT_CALLS = 5
+
+Parameter = Dict[str, Any]
+
+
+class ParameterWrite(NamedTuple):
+    """Value to put to the parameter."""
+
+    name: str
+    value: str
+    is_secure: bool = True
+
+
+class WriteResult(NamedTuple):
+    """Result of a write or delete of a single parameter."""
+
+    name: str
+    is_success: bool
+    # aws error code of a failed write. i.e.: ParameterNotFound
+    error: Optional[str] = None
+
+
+class ParametersDiff(NamedTuple):
+    """Writes and deletes needed to get from current to desired parameters."""
+
+    added: List[ParameterWrite]
+    changed: List[ParameterWrite]
+    # names of parameters to delete
+    deleted: List[str]
+    # names of parameters which are already up to date
+    unchanged: List[str]
+
+
+def get_writes_limiter(creds: AwsCredentials) -> RateLimiter:
+    """Return limiter of parameter writes to the account."""
+    return get_rate_limiter(creds, "ssm-writes", SSM_WRITES_PER_SECOND)
+
+
+def _error_code(err: botocore.exceptions.ClientError) -> str:
+    return err.response.get("Error", {}).get("Code", "Unknown")
+
+
+def get_parameters_batch(
+    client: Any, names: Sequence[str], with_decryption: bool = True
+) -> Dict[str, Parameter]:
+    """Return parameters by name, parameters which don't exist are left out."""
+    response = client.get_parameters(Names=list(names), WithDecryption=with_decryption)
+    if response.get("InvalidParameters"):
+        logger.info(
+            "Parameters removed while being fetched: %s", response["InvalidParameters"]
+        )
+    return {parameter["Name"]: parameter for parameter in response["Parameters"]}
+
+
+def fetch_parameter_values(
+    client: Any,
+    pages: Iterable[List[Parameter]],
+    with_decryption: bool = True,
+    max_workers: int = MAX_CONCURRENT_CALLS,
+) -> Iterator[Tuple[Parameter, Parameter]]:
+    """Fetch values of listed parameters.
+
+    Batches of every page are fetched concurrently while the next page is
+    listed. Calls run in a copy of the caller's context, so they are accounted
+    to the caller's run or request.
+
+    Parameters
+    ----------
+    client : boto3.client
+        ssm client
+    pages : iterable of list of dict
+        pages of parameter metadata, as returned by describe_parameters
+    with_decryption : bool
+        decrypt values of secure strings
+    max_workers : int
+        max number of get_parameters calls running at the same time
+
+    Returns
+    -------
+    iterator of (metadata, parameter)
+        in the order parameters were listed, parameters removed in between are
+        skipped
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        fetching: List[Tuple[List[Parameter], List[Future]]] = []
+        for page in pages:
+            names = [metadata["Name"] for metadata in page]
+            batches = [
+                pool.submit(
+                    copy_context().run,
+                    get_parameters_batch,
+                    client,
+                    names[start : start + BATCH_SIZE],
+                    with_decryption,
+                )
+                for start in range(0, len(names), BATCH_SIZE)
+            ]
+            fetching.append((page, batches))
+
+        for page, batches in fetching:
+            values: Dict[str, Parameter] = {}
+            for batch in batches:
+                values.update(batch.result())
+            for metadata in page:
+                if metadata["Name"] in values:
+                    yield metadata, values[metadata["Name"]]
+
+
+def iter_parameters_by_path(
+    client: Any, path: str, with_decryption: bool = True
+) -> Iterator[List[Parameter]]:
+    """Yield pages of parameters under the path, with values, at any depth.
+
+    Parameters
+    ----------
+    client : boto3.client
+        ssm client
+    path : str
+        i.e.: /development/backend-api/
+    with_decryption : bool
+        decrypt values of secure strings
+
+    Returns
+    -------
+    iterator of list of dict
+    """
+    request_params = dict(
+        Path=path,
+        Recursive=True,
+        WithDecryption=with_decryption,
+        MaxResults=PATH_PAGE_SIZE,
+    )
+    while True:
+        response = client.get_parameters_by_path(**request_params)
+        yield response["Parameters"]
+        if not response.get("NextToken"):
+            return
+        request_params["NextToken"] = response["NextToken"]
+
+
+def diff_parameters(
+    current: Dict[str, Parameter],
+    writes: Sequence[ParameterWrite],
+    prune: bool = False,
+) -> ParametersDiff:
+    """Compare desired parameters with current ones.
+
+    A parameter is changed when its value or its type differs.
+
+    Parameters
+    ----------
+    current : dict
+        current parameters with values, by name
+    writes : list of ParameterWrite
+        desired parameters
+    prune : bool
+        delete current parameters which are not desired
+
+    Returns
+    -------
+    ParametersDiff
+    """
+    diff = ParametersDiff([], [], [], [])
+    for write in writes:
+        parameter = current.get(write.name)
+        if parameter is None:
+            diff.added.append(write)
+        elif parameter["Value"] != write.value or parameter["Type"] != (
+            "SecureString" if write.is_secure else "String"
+        ):
+            diff.changed.append(write)
+        else:
+            diff.unchanged.append(write.name)
+
+    if prune:
+        desired = {write.name for write in writes}
+        diff.deleted.extend(name for name in current if name not in desired)
+    return diff
+
+
+def _put_parameter(
+    client: Any, write: ParameterWrite, limiter: RateLimiter
+) -> WriteResult:
+    limiter.acquire()
+    try:
+        client.put_parameter(
+            Name=write.name,
+            Value=write.value,
+            Type="SecureString" if write.is_secure else "String",
+            Overwrite=True,
+        )
+    except botocore.exceptions.ClientError as err:
+        logger.warning("Failed to put parameter %s: %s", write.name, _error_code(err))
+        return WriteResult(write.name, False, _error_code(err))
+    return WriteResult(write.name, True)
+
+
+def _delete_batch(
+    client: Any, names: Sequence[str], limiter: RateLimiter
+) -> List[WriteResult]:
+    limiter.acquire()
+    try:
+        response = client.delete_parameters(Names=list(names))
+    except botocore.exceptions.ClientError as err:
+        logger.warning("Failed to delete parameters %s: %s", names, _error_code(err))
+        return [WriteResult(name, False, _error_code(err)) for name in names]
+    return [WriteResult(name, True) for name in response["DeletedParameters"]] + [
+        WriteResult(name, False, "ParameterNotFound")
+        for name in response["InvalidParameters"]
+    ]
+
+
+def put_parameters(
+    client: Any,
+    writes: Sequence[ParameterWrite],
+    limiter: RateLimiter,
+    max_workers: int = MAX_CONCURRENT_CALLS,
+) -> List[WriteResult]:
+    """Put values of parameters, overwriting existing ones.
+
+    Parameters
+    ----------
+    client : boto3.client
+        ssm client
+    writes : list of ParameterWrite
+    limiter : RateLimiter
+        limiter of writes to the account, see `get_writes_limiter`
+    max_workers : int
+        max number of calls running at the same time
+
+    Returns
+    -------
+    list of WriteResult
+        result of every write, in the order of writes
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [
+            pool.submit(copy_context().run, _put_parameter, client, write, limiter)
+            for write in writes
+        ]
+        return [future.result() for future in futures]
+
+
+def delete_parameters(
+    client: Any,
+    names: Sequence[str],
+    limiter: RateLimiter,
+    max_workers: int = MAX_CONCURRENT_CALLS,
+) -> List[WriteResult]:
+    """Delete parameters in concurrent batches.
+
+    Parameters
+    ----------
+    client : boto3.client
+        ssm client
+    names : list of str
+    limiter : RateLimiter
+        limiter of writes to the account, see `get_writes_limiter`
+    max_workers : int
+        max number of calls running at the same time
+
+    Returns
+    -------
+    list of WriteResult
+        result of every parameter, parameters which don't exist fail with
+        ParameterNotFound
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [
+            pool.submit(
+                copy_context().run,
+                _delete_batch,
+                client,
+                names[start : start + BATCH_SIZE],
+                limiter,
+            )
+            for start in range(0, len(names), BATCH_SIZE)
+        ]
+        return [result for future in futures for result in future.result()]
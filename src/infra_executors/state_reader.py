@@ -0,0 +1,114 @@
+"""Reads terraform outputs straight from the remote state.
+
+Read-only lookups don't need the terraform binary: outputs are stored in the
+state document in the s3 backend. The state object is fetched with a
+conditional GET against the etag of the last fetch, so unchanged states are
+served from the outputs cache without downloading them again.
+"""
+import json
+from typing import Any, Dict, Optional
+
+import botocore.exceptions  # type: ignore
+
+from infra_executors.constants import AwsCredentials, TERRAFORM_STATE_BUCKET
+from infra_executors.logger import get_logger
+from infra_executors.outputs_cache import (
+    StateVersion,
+    get_state_client,
+    load_cached_outputs,
+    store_outputs,
+)
+
+logger = get_logger("state-reader")
+
+# state format written by terraform >= 0.12
+SUPPORTED_STATE_VERSION = 4
+NOT_MODIFIED = 304
+
+
+def extract_outputs(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Build `terraform output -json` shaped outputs from state document.
+
+    Parameters
+    ----------
+    state : dict
+        parsed terraform state
+
+    Returns
+    -------
+    dict
+        {name: {"value": ..., "type": ..., "sensitive": bool}}
+    """
+    return {
+        name: dict(
+            value=output["value"],
+            type=output.get("type"),
+            sensitive=output.get("sensitive", False),
+        )
+        for name, output in state.get("outputs", {}).items()
+    }
+
+
+def read_state_outputs(creds: AwsCredentials, state_key: str) -> Optional[Any]:
+    """Read outputs of the remote state without running terraform.
+
+    Parameters
+    ----------
+    creds : AwsCredentials
+        aws credentials
+    state_key : str
+        s3 key of the terraform state
+
+    Returns
+    -------
+    dict or None
+        outputs in the same shape as `terraform output -json` or None if state
+        can't be read natively and terraform should be used instead
+    """
+    cached = load_cached_outputs(state_key)
+    request_params = dict(Bucket=TERRAFORM_STATE_BUCKET, Key=state_key)
+    if cached and cached.etag:
+        request_params["IfNoneMatch"] = cached.etag
+
+    try:
+        response = get_state_client(creds).get_object(**request_params)
+    except botocore.exceptions.ClientError as err:
+        status_code = err.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+        if cached and status_code == NOT_MODIFIED:
+            logger.info("State not modified, using cached outputs. key=%s", state_key)
+            return cached.outputs
+        logger.info(
+            "Failed to read state. state_key=%s error=%s",
+            state_key,
+            err.response.get("Error", {}).get("Code"),
+        )
+        return None
+    except botocore.exceptions.BotoCoreError as err:
+        logger.warning("Failed to read state. state_key=%s error=%r", state_key, err)
+        return None
+
+    try:
+        state = json.load(response["Body"])
+    except ValueError:
+        logger.warning("State is not a valid json. state_key=%s", state_key)
+        return None
+    except botocore.exceptions.BotoCoreError as err:
+        logger.warning("Failed to read state. state_key=%s error=%r", state_key, err)
+        return None
+
+    if state.get("version") != SUPPORTED_STATE_VERSION:
+        logger.info(
+            "Unsupported state version %s. state_key=%s",
+            state.get("version"),
+            state_key,
+        )
+        return None
+
+    outputs = extract_outputs(state)
+    store_outputs(
+        state_key,
+        StateVersion(lineage=state["lineage"], serial=state["serial"]),
+        outputs,
+        etag=response["ETag"],
+    )
+    return outputs
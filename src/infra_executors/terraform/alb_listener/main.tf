@@ -0,0 +1,79 @@
+terraform {
+  required_version = ">=0.12.29"
+  backend "s3" {
+    bucket = "chiliseed-dev-terraform-states"
+    region = "us-east-2"
+    //    key    = "path/to.tfstate"  this will be provided on runtime
+  }
+  required_providers {
+    aws      = "~> 2.70.0"
+    null     = "~> 2.1.2"
+    random   = "~> 2.3.0"
+    template = "~> 2.1.2"
+  }
+}
+
+// listener and target group of a single service on the shared project alb
+
+# Generate a random string to add it to the name of the Target Group
+resource "random_string" "alb_prefix" {
+  length  = 4
+  upper   = false
+  special = false
+}
+
+resource "aws_alb_target_group" "this" {
+  name                 = "${var.name}-${random_string.alb_prefix.result}"
+  port                 = var.container_port
+  protocol             = "HTTP"
+  vpc_id               = var.vpc_id
+  deregistration_delay = var.deregistration_delay
+
+  lifecycle {
+    // we must create before destroy because of listeners that are connected to
+    // target groups
+    create_before_destroy = true
+  }
+
+  health_check {
+    path     = var.health_check_endpoint
+    protocol = var.health_check_protocol
+    port     = "traffic-port" // setting up dynamic ports
+  }
+
+  tags = {
+    Environment = var.env_name
+    Name        = var.name
+    Project     = var.project_name
+  }
+}
+
+resource "aws_alb_listener" "https" {
+  load_balancer_arn = var.alb_arn
+  port              = var.alb_port_https
+  protocol          = "HTTPS"
+  ssl_policy        = "ELBSecurityPolicy-2016-08"
+  certificate_arn   = var.ssl_certificate_arn
+
+  default_action {
+    type             = "forward"
+    target_group_arn = aws_alb_target_group.this.arn
+  }
+}
+
+// http redirects to https
+resource "aws_alb_listener" "http-to-https" {
+  load_balancer_arn = var.alb_arn
+  port              = var.alb_port_http
+  protocol          = "HTTP"
+
+  default_action {
+    type = "redirect"
+
+    redirect {
+      port        = "443"
+      protocol    = "HTTPS"
+      status_code = "HTTP_301"
+    }
+  }
+}
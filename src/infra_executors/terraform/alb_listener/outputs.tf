@@ -0,0 +1,4 @@
+// target group arn for ecs service registration with the alb
+output "target_group_arn" {
+  value = aws_alb_target_group.this.arn
+}
@@ -0,0 +1,24 @@
+locals {
+  ingress       = "ingress"
+  tcp           = "TCP"
+  anywhere_cidr = "0.0.0.0/0"
+}
+
+// rules are added to the security group of the project alb
+resource "aws_security_group_rule" "listener-https" {
+  from_port         = var.alb_port_https
+  to_port           = var.alb_port_https
+  protocol          = local.tcp
+  security_group_id = var.alb_security_group_id
+  type              = local.ingress
+  cidr_blocks       = [local.anywhere_cidr]
+}
+
+resource "aws_security_group_rule" "listener-http" {
+  from_port         = var.alb_port_http
+  to_port           = var.alb_port_http
+  protocol          = local.tcp
+  security_group_id = var.alb_security_group_id
+  type              = local.ingress
+  cidr_blocks       = [local.anywhere_cidr]
+}
@@ -0,0 +1,59 @@
+variable "env_name" {
+  type        = string
+  description = "The name of the environment"
+}
+
+variable "project_name" {
+  description = "Project name of the alb"
+}
+
+variable "vpc_id" {
+  type = string
+}
+
+variable "alb_arn" {
+  type        = string
+  description = "ARN of the project alb"
+}
+
+variable "alb_security_group_id" {
+  type        = string
+  description = "Security group of the project alb"
+}
+
+variable "deregistration_delay" {
+  default     = "300"
+  description = "The default deregistration delay"
+}
+
+// container_port -> used in target group and tells on what port alb is contacting the servers
+// alb_port -> used in alb listener, tells on what port alb is listening to incoming web traffic
+variable "name" {
+  type        = string
+  description = "Name of the service"
+}
+
+variable "container_port" {
+  type = number
+}
+
+variable "alb_port_https" {
+  type = number
+}
+
+variable "alb_port_http" {
+  type = number
+}
+
+variable "health_check_endpoint" {
+  type = string
+}
+
+variable "health_check_protocol" {
+  type = string
+}
+
+variable "ssl_certificate_arn" {
+  type        = string
+  description = "ARN of the service ACM certificate used by https listener."
+}
@@ -0,0 +1,24 @@
+terraform {
+  required_version = ">=0.12.29"
+  backend "s3" {
+    bucket = "chiliseed-dev-terraform-states"
+    region = "us-east-2"
+    //    key    = "path/to.tfstate"  this will be provided on runtime
+  }
+  required_providers {
+    aws      = "~> 2.70.0"
+    null     = "~> 2.1.2"
+    random   = "~> 2.3.0"
+    template = "~> 2.1.2"
+  }
+}
+
+// cname of a single service in the environment zone
+resource "aws_route53_record" "subdomain" {
+  allow_overwrite = true
+  name            = "${var.subdomain}.${var.domain}"
+  type            = "CNAME"
+  ttl             = "300"
+  zone_id         = var.zone_id
+  records         = [var.route_to]
+}
@@ -0,0 +1,3 @@
+output "subdomain" {
+  value = aws_route53_record.subdomain.name
+}
@@ -0,0 +1,19 @@
+variable "zone_id" {
+  type        = string
+  description = "Id of the environment hosted zone"
+}
+
+variable "domain" {
+  type        = string
+  description = "Domain name. Example: example.com"
+}
+
+variable "subdomain" {
+  type        = string
+  description = "Subdomain of the service. Example: api"
+}
+
+variable "route_to" {
+  type        = string
+  description = "Where to route traffic to. Can be load balancer dns name or cloudfront dns."
+}
@@ -1,7 +1,11 @@
 """Executor for terraform configurations."""
 import json
 import os
+from contextlib import ExitStack
+from functools import partial
+from time import sleep
 from typing import (
+    ContextManager,
     List,
     Mapping,
     NamedTuple,
@@ -13,15 +17,49 @@ from typing import (
 
 from common.crypto import get_uuid_hex
 
+from infra_executors.account_limits import terraform_slot
+from infra_executors.async_shell import execute_shell_command_async
 from infra_executors.constants import (
     EXEC_LOGS_DIR,
     PLANS_DIR,
     TERRAFORM_DIR,
     TERRAFORM_PLUGIN_DIR,
 )
-from infra_executors.constructors import build_env_vars
+from infra_executors.constructors import (
+    build_aws_env_vars,
+    build_env_vars,
+    build_tfvars,
+    write_tfvars,
+)
+from infra_executors.fingerprint import (
+    build_fingerprint,
+    forget_apply,
+    get_apply_record,
+    record_apply,
+)
 from infra_executors.logger import get_logger
-from infra_executors.utils import execute_shell_command
+from infra_executors.outputs_cache import (
+    StateVersion,
+    get_cached_outputs,
+    get_state_version,
+    invalidate_outputs,
+    store_outputs,
+)
+from infra_executors.progress import InProgress, finish_progress, track_progress
+from infra_executors.retries import (
+    MAX_PHASE_ATTEMPTS,
+    classify_failure,
+    get_retry_delay,
+)
+from infra_executors.state_reader import read_state_outputs
+from infra_executors.timing import span
+from infra_executors.utils import OutputConsumer, execute_shell_command
+from infra_executors.workspace import (
+    Workspace,
+    WorkspaceError,
+    create_workspace,
+    remove_workspace,
+)
 
 if TYPE_CHECKING:
     from infra_executors.constants import (
@@ -32,6 +70,9 @@ if TYPE_CHECKING:
 
 logger = get_logger(__name__)
 
+# loaded by terraform automatically from the working directory
+TFVARS_FILE_NAME = "run.auto.tfvars.json"
+
 
 class ExecutorConfiguration(NamedTuple):
     """Terraform executor configurations."""
@@ -41,6 +82,12 @@ class ExecutorConfiguration(NamedTuple):
     config_dir: str
     state_key: str
     variables_file_name: str = ""
+    # run terraform commands with the asyncio engine
+    use_async_engine: bool = False
+    # seconds, applies only to the asyncio engine
+    command_timeout: Optional[int] = None
+    # pass input variables as TF_VAR_* env vars instead of a tfvars file
+    use_env_inputs: bool = False
 
 
 class TerraformExecutorError(Exception):
@@ -50,13 +97,18 @@ class TerraformExecutorError(Exception):
 class TerraformExecutor:
     """Generic executor for terraform configurations."""
 
+    creds: "AwsCredentials"
     config_location: str
     run_log: str
     env_vars: Mapping[str, str]
+    tfvars: Mapping[str, Any]
     plan_file: str
     general_configs: "GeneralConfiguration"
     cmd_configs: Optional[Any]
     executor_configs: ExecutorConfiguration
+    workspace: Optional[Workspace]
+    output_consumers: List[OutputConsumer]
+    in_progress: InProgress
 
     def __init__(
         self,
@@ -66,12 +118,30 @@ class TerraformExecutor:
         executor_configs: ExecutorConfiguration,
     ):
 
+        self.creds = creds
         self.general_configs = general_configs
         self.cmd_configs = cmd_configs
         self.executor_configs = executor_configs
 
-        self.env_vars = build_env_vars(creds, general_configs, cmd_configs)
+        if executor_configs.use_env_inputs:
+            self.env_vars = build_env_vars(creds, general_configs, cmd_configs)
+            self.tfvars = {}
+        else:
+            # written to the run workspace, keeps env small for large configs
+            self.env_vars = build_aws_env_vars(creds)
+            self.tfvars = build_tfvars(general_configs, cmd_configs)
+        # points to the isolated run workspace once terraform is initialized
         self.config_location = os.path.join(TERRAFORM_DIR, executor_configs.config_dir)
+        self.workspace = None
+        self.in_progress = {}
+        self.output_consumers = [
+            partial(
+                track_progress,
+                executor=executor_configs.name,
+                run_id=general_configs.run_id,
+                in_progress=self.in_progress,
+            )
+        ]
         self.run_log = os.path.join(
             EXEC_LOGS_DIR,
             f"{executor_configs.name}_{executor_configs.action}_{general_configs.run_id}.log",  # noqa
@@ -81,14 +151,114 @@ class TerraformExecutor:
             f"{executor_configs.name}_{general_configs.run_id}_{get_uuid_hex(4)}.tfplan",
         )
 
-    def execute_command(self, cmd: List[str]) -> Tuple[int, str]:
-        """Execute terraform shell commands."""
+    def execute_command(
+        self, cmd: List[str], capture_output: bool = False
+    ) -> Tuple[int, str]:
+        """Execute terraform shell commands.
+
+        Returned output is the complete stdout if capture_output is set,
+        otherwise only the tail of the output is returned.
+        Waits for a free terraform slot of the aws account.
+        """
         logger.info(
             "Executing terraform with vars_file=%s",
             self.executor_configs.variables_file_name,
         )
-        return execute_shell_command(
-            cmd, self.env_vars, self.config_location, self.run_log
+        with ExitStack() as slot:
+            with self.timed("wait_slot"):
+                slot.enter_context(terraform_slot(self.creds))
+            if self.executor_configs.use_async_engine:
+                return execute_shell_command_async(
+                    cmd,
+                    self.env_vars,
+                    self.config_location,
+                    self.run_log,
+                    capture_output=capture_output,
+                    consumers=self.output_consumers,
+                    timeout=self.executor_configs.command_timeout,
+                )
+            return execute_shell_command(
+                cmd,
+                self.env_vars,
+                self.config_location,
+                self.run_log,
+                capture_output=capture_output,
+                consumers=self.output_consumers,
+            )
+
+    def timed(self, action: str) -> ContextManager[None]:
+        """Time part of the run as a span of the execution."""
+        return span(
+            f"terraform:{self.executor_configs.name}",
+            action,
+            self.general_configs.run_id,
+        )
+
+    def execute_phase(
+        self, phase: str, cmd: List[str], ok_codes: Tuple[int, ...] = (0,)
+    ) -> int:
+        """Execute terraform command, retrying transient failures.
+
+        Returns return code of the last attempt.
+        """
+        attempt = 1
+        while True:
+            (return_code, output) = self.execute_command(cmd)
+            if return_code in ok_codes or not self.wait_before_retry(
+                phase, attempt, output
+            ):
+                return return_code
+            attempt += 1
+
+    def wait_before_retry(self, phase: str, attempt: int, output: str) -> bool:
+        """Wait before next attempt if the failure is transient.
+
+        Returns False if the phase should not be retried.
+        """
+        reason = classify_failure(output)
+        if not reason or attempt >= MAX_PHASE_ATTEMPTS:
+            return False
+        delay = get_retry_delay(attempt)
+        logger.warning(
+            "Terraform %s failed: %s. Retrying in %.1f seconds, attempt %s/%s. "
+            "run_id=%s",
+            phase,
+            reason,
+            delay,
+            attempt + 1,
+            MAX_PHASE_ATTEMPTS,
+            self.general_configs.run_id,
+        )
+        sleep(delay)
+        return True
+
+    def prepare_workspace(self) -> None:
+        """Clone pre-initialized configuration into isolated run workspace."""
+        if self.workspace:
+            return
+        try:
+            self.workspace = create_workspace(
+                self.executor_configs.config_dir, self.env_vars, self.run_log
+            )
+        except WorkspaceError as err:
+            logger.error(
+                "Failed to prepare workspace for %s", self.executor_configs.name,
+            )
+            raise TerraformExecutorError("Failed to initialize") from err
+        self.config_location = self.workspace.path
+        if self.tfvars:
+            write_tfvars(
+                os.path.join(self.config_location, TFVARS_FILE_NAME), self.tfvars
+            )
+
+    def release_workspace(self) -> None:
+        """Remove run workspace."""
+        if not self.workspace:
+            return
+        remove_workspace(self.workspace)
+        self.workspace = None
+        self.config_location = os.path.join(
+            TERRAFORM_DIR, self.executor_configs.config_dir
         )
 
     def init_terraform(self) -> None:
@@ -97,21 +267,24 @@ class TerraformExecutor:
             "Initializing terraform state. state_key=%s",
             self.executor_configs.state_key,
         )
-        (init_return_code, _) = self.execute_command(
-            [
-                f"terraform init "
-                f'-backend-config="key={self.executor_configs.state_key}" '
-                f"-no-color "
-                f"-reconfigure "
-                f"-plugin-dir={TERRAFORM_PLUGIN_DIR}"
-            ]
-        )
-        if init_return_code != 0:
-            logger.error(
-                "Failed to init terraform for backend %s",
-                self.general_configs.project_name,
+        with self.timed("init"):
+            self.prepare_workspace()
+            init_return_code = self.execute_phase(
+                "init",
+                [
+                    f"terraform init "
+                    f'-backend-config="key={self.executor_configs.state_key}" '
+                    f"-no-color "
+                    f"-reconfigure "
+                    f"-plugin-dir={TERRAFORM_PLUGIN_DIR}"
+                ],
             )
-            raise TerraformExecutorError("Failed to initialize")
+            if init_return_code != 0:
+                logger.error(
+                    "Failed to init terraform for backend %s",
+                    self.general_configs.project_name,
+                )
+                raise TerraformExecutorError("Failed to initialize")
 
     def prepare_plan(self) -> bool:
         """Run terraform plan."""
@@ -134,26 +307,39 @@ class TerraformExecutor:
                 f"-out={self.plan_file}",
             ]
 
-        (plan_return_code, _) = self.execute_command(cmd)
+        with self.timed("plan"):
+            plan_return_code = self.execute_phase("plan", cmd, ok_codes=(0, 2))
+            if plan_return_code == 1 or plan_return_code < 0:
+                logger.error("Error executing %s plan", self.executor_configs.name)
+                raise TerraformExecutorError("Error preparing a plan")
 
         if plan_return_code == 0:
             logger.info("No changes to apply")
             return False
-
-        if plan_return_code == 1 or plan_return_code < 0:
-            logger.error("Error executing %s plan", self.executor_configs.name)
-            raise TerraformExecutorError("Error preparing a plan")
         return True
 
     def apply_plan(self) -> Any:
-        """Apply the plan."""
+        """Apply the plan.
+
+        Transient failures are retried with a fresh plan, as the failed apply
+        could have changed the state.
+        """
         logger.info("Got changes to apply")
-        (apply_return_code, _) = self.execute_command(
-            [f"terraform apply -auto-approve -no-color {self.plan_file}"]
-        )
-        if apply_return_code != 0:
-            logger.error("Failed to apply a plan %s", self.plan_file)
-            raise TerraformExecutorError("Failed to apply a plan")
+        invalidate_outputs(self.executor_configs.state_key)
+        attempt = 1
+        while True:
+            with self.timed("apply"):
+                (apply_return_code, output) = self.execute_command(
+                    [f"terraform apply -auto-approve -no-color {self.plan_file}"]
+                )
+            if apply_return_code == 0:
+                break
+            if not self.wait_before_retry("apply", attempt, output):
+                logger.error("Failed to apply a plan %s", self.plan_file)
+                raise TerraformExecutorError("Failed to apply a plan")
+            attempt += 1
+            if not self.prepare_plan():
+                break
 
         logger.info(
             "Successfully applied a plan. run_id=%s", self.general_configs.run_id,
@@ -161,43 +347,143 @@ class TerraformExecutor:
 
         return self._get_outputs()
 
-    def execute_apply(self) -> Any:
-        """Run terraform execution."""
-        self.init_terraform()
-        has_changes = self.prepare_plan()
-        if has_changes:
-            return self.apply_plan()
-        return self._get_outputs()
+    def remove_plan(self) -> None:
+        """Remove plan file of the run."""
+        try:
+            os.remove(self.plan_file)
+        except FileNotFoundError:
+            pass
+
+    def execute_apply(self, force: bool = False) -> Any:
+        """Run terraform execution.
+
+        Parameters
+        ----------
+        force : bool
+            plan and apply even if the same inputs were already applied
+        """
+        fingerprint = build_fingerprint(
+            self.executor_configs.config_dir, {**self.env_vars, **self.tfvars}
+        )
+        if not force:
+            outputs = self._get_unchanged_outputs(fingerprint)
+            if outputs is not None:
+                return outputs
 
-    def get_outputs(self) -> Any:
-        """Run init and then get outputs."""
         try:
             self.init_terraform()
-            return self._get_outputs()
+            has_changes = self.prepare_plan()
+            if has_changes:
+                outputs = self.apply_plan()
+            else:
+                outputs = self._get_outputs()
+        finally:
+            finish_progress(self.general_configs.run_id, self.in_progress)
+            self.release_workspace()
+        # plans of failed runs are kept for investigation, see retention
+        self.remove_plan()
+
+        state_version = get_state_version(self.creds, self.executor_configs.state_key)
+        if state_version:
+            record_apply(self.executor_configs.state_key, fingerprint, state_version)
+        return outputs
+
+    def _get_unchanged_outputs(self, fingerprint: str) -> Optional[Any]:
+        """Return outputs if the same inputs were applied to the current state.
+
+        Returns None when terraform has to plan and apply.
+        """
+        record = get_apply_record(self.executor_configs.state_key)
+        if not record or record.fingerprint != fingerprint:
+            return None
+
+        state_version = get_state_version(self.creds, self.executor_configs.state_key)
+        if state_version != record.version:
+            logger.info(
+                "State changed since last apply. state_key=%s",
+                self.executor_configs.state_key,
+            )
+            return None
+
+        logger.info(
+            "Inputs are unchanged since last apply, skipping. state_key=%s run_id=%s",
+            self.executor_configs.state_key,
+            self.general_configs.run_id,
+        )
+        return read_state_outputs(self.creds, self.executor_configs.state_key)
+
+    def get_outputs(self, read_state: bool = False) -> Any:
+        """Run init and then get outputs.
+
+        Init is skipped if outputs of the current remote state are cached.
+
+        Parameters
+        ----------
+        read_state : bool
+            read outputs straight from the remote state, without running
+            terraform. Falls back to terraform if state can't be read.
+        """
+        if read_state:
+            outputs = read_state_outputs(self.creds, self.executor_configs.state_key)
+            if outputs is not None:
+                return outputs
+
+        state_version = get_state_version(self.creds, self.executor_configs.state_key)
+        if state_version:
+            outputs = get_cached_outputs(self.executor_configs.state_key, state_version)
+            if outputs is not None:
+                return outputs
+
+        try:
+            self.init_terraform()
+            return self._get_outputs(state_version)
         except TerraformExecutorError:
             logger.exception("Failed to get outputs")
             return {}
+        finally:
+            self.release_workspace()
 
-    def _get_outputs(self) -> Any:
-        """Get output for provided terraform configuration."""
+    def _get_outputs(self, state_version: Optional[StateVersion] = None) -> Any:
+        """Get output for provided terraform configuration.
+
+        Outputs are cached against the version of the state they were read from.
+        """
+        if not state_version:
+            # read version before outputs, so a concurrent write makes entry stale
+            state_version = get_state_version(
+                self.creds, self.executor_configs.state_key
+            )
         try:
-            (get_output, stdout) = self.execute_command([f"terraform output -json"])
+            with self.timed("output"):
+                (get_output, stdout) = self.execute_command(
+                    [f"terraform output -json"], capture_output=True
+                )
             if get_output != 0:
                 logger.error("Failed to get terraform output: %s", self.config_location)
                 return {}
-            return json.loads(stdout)
+            outputs = json.loads(stdout)
+            if outputs and state_version:
+                store_outputs(self.executor_configs.state_key, state_version, outputs)
+            return outputs
         except TerraformExecutorError:
             logger.exception("failed to execute terraform configs")
         return {}
 
     def execute_destroy(self, module=None) -> None:
         """Run terraform destroy."""
-        self.init_terraform()
-        cmd = "terraform destroy -auto-approve -no-color"
-        if self.executor_configs.variables_file_name:
-            cmd += f" -var-file={self.executor_configs.variables_file_name}"
-        if module:
-            cmd += f" {module}"
-        (destroy_response_code, stdout) = self.execute_command([cmd])
-        if destroy_response_code != 0:
-            raise TerraformExecutorError("Error destroying infrastructure")
+        invalidate_outputs(self.executor_configs.state_key)
+        forget_apply(self.executor_configs.state_key)
+        try:
+            self.init_terraform()
+            cmd = "terraform destroy -auto-approve -no-color"
+            if self.executor_configs.variables_file_name:
+                cmd += f" -var-file={self.executor_configs.variables_file_name}"
+            if module:
+                cmd += f" {module}"
+            with self.timed("destroy"):
+                destroy_response_code = self.execute_phase("destroy", [cmd])
+                if destroy_response_code != 0:
+                    raise TerraformExecutorError("Error destroying infrastructure")
+        finally:
+            finish_progress(self.general_configs.run_id, self.in_progress)
+            self.release_workspace()
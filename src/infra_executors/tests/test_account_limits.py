@@ -0,0 +1,121 @@
+import tempfile
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from infra_executors import account_limits
+from infra_executors.account_limits import (
+    RateLimiter,
+    get_rate_limiter,
+    terraform_slot,
+)
+from infra_executors.tests.test_outputs_cache import CREDS
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class RateLimiterTestCase(SimpleTestCase):
+    def setUp(self) -> None:
+        self.clock = FakeClock()
+        for name in ("monotonic", "sleep"):
+            patcher = mock.patch.object(account_limits, name, getattr(self.clock, name))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_allows_burst_of_rate(self):
+        limiter = RateLimiter(5)
+
+        for _ in range(5):
+            limiter.acquire()
+
+        self.assertEqual(self.clock.sleeps, [])
+
+    def test_waits_for_next_token(self):
+        limiter = RateLimiter(5)
+        for _ in range(5):
+            limiter.acquire()
+
+        limiter.acquire()
+
+        self.assertEqual(self.clock.sleeps, [0.2])
+
+    def test_refills_over_time(self):
+        limiter = RateLimiter(5)
+        for _ in range(5):
+            limiter.acquire()
+
+        self.clock.now += 0.4
+        limiter.acquire()
+        limiter.acquire()
+
+        self.assertEqual(self.clock.sleeps, [])
+
+    def test_never_holds_more_than_rate(self):
+        limiter = RateLimiter(2)
+
+        self.clock.now += 60
+        for _ in range(3):
+            limiter.acquire()
+
+        self.assertEqual(self.clock.sleeps, [0.5])
+
+
+class GetRateLimiterTestCase(SimpleTestCase):
+    def test_shared_within_account_and_kind(self):
+        self.assertIs(get_rate_limiter(CREDS), get_rate_limiter(CREDS))
+        self.assertIs(
+            get_rate_limiter(CREDS, "ssm-writes", 5),
+            get_rate_limiter(CREDS._replace(secret_key="rotated"), "ssm-writes", 5),
+        )
+
+    def test_separate_per_region_and_kind(self):
+        limiter = get_rate_limiter(CREDS)
+
+        self.assertIsNot(get_rate_limiter(CREDS._replace(region="eu-west-1")), limiter)
+        self.assertIsNot(get_rate_limiter(CREDS, "ssm-writes", 5), limiter)
+
+
+class TerraformSlotTestCase(SimpleTestCase):
+    def setUp(self) -> None:
+        locks_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(locks_dir.cleanup)
+        patcher = mock.patch.object(account_limits, "LOCKS_DIR", locks_dir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_waits_when_all_slots_are_taken(self):
+        with terraform_slot(CREDS, slots=2), terraform_slot(CREDS, slots=2):
+            with mock.patch.object(
+                account_limits, "sleep", side_effect=TimeoutError
+            ) as sleep:
+                with self.assertRaises(TimeoutError):
+                    with terraform_slot(CREDS, slots=2):
+                        pass
+        sleep.assert_called_once()
+
+    def test_slots_are_per_account(self):
+        with terraform_slot(CREDS, slots=1):
+            with mock.patch.object(account_limits, "sleep") as sleep:
+                with terraform_slot(CREDS._replace(access_key="other"), slots=1):
+                    pass
+        sleep.assert_not_called()
+
+    def test_released_slot_is_reused(self):
+        with terraform_slot(CREDS, slots=1):
+            pass
+
+        with mock.patch.object(account_limits, "sleep") as sleep:
+            with terraform_slot(CREDS, slots=1):
+                pass
+        sleep.assert_not_called()
@@ -0,0 +1,104 @@
+import os
+import tempfile
+import threading
+from time import monotonic
+
+from django.test import SimpleTestCase
+
+from infra_executors import async_shell
+from infra_executors.async_shell import ShellCommand
+
+
+class AsyncShellTestCase(SimpleTestCase):
+    def setUp(self) -> None:
+        work_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(work_dir.cleanup)
+        self.work_dir = work_dir.name
+        self.log_to = os.path.join(self.work_dir, "run.log")
+
+    def read_log(self):
+        with open(self.log_to) as log_file:
+            return log_file.read()
+
+    def test_writes_output_to_log_and_consumers(self):
+        lines = []
+
+        return_code, output = async_shell.execute_shell_command_async(
+            ["echo one; echo; echo two >&2; exit 3"],
+            None,
+            None,
+            self.log_to,
+            consumers=[lines.append],
+        )
+
+        self.assertEqual(return_code, 3)
+        self.assertEqual(output, "one\n\ntwo\n")
+        self.assertEqual(lines, ["one\n", "\n", "two\n"])
+        self.assertEqual(self.read_log(), "one\ntwo\n")
+
+    def test_captures_clean_stdout(self):
+        return_code, output = async_shell.execute_shell_command_async(
+            ["echo '{}'; echo noise >&2"], None, None, self.log_to, capture_output=True,
+        )
+
+        self.assertEqual((return_code, output), (0, "{}\n"))
+        self.assertEqual(self.read_log(), "noise\n")
+
+    def test_timeout_kills_process_group(self):
+        late_file = os.path.join(self.work_dir, "late")
+
+        started = monotonic()
+        return_code, _ = async_shell.execute_shell_command_async(
+            [f"(sleep 1; touch {late_file}) & wait"],
+            None,
+            None,
+            self.log_to,
+            timeout=0.2,
+        )
+        threading.Event().wait(1.5)
+
+        self.assertLess(monotonic() - started, 5)
+        self.assertEqual(return_code, -9)
+        # child of the shell was killed as well
+        self.assertFalse(os.path.exists(late_file))
+
+    def test_commands_of_threads_run_concurrently(self):
+        results = []
+
+        def run():
+            results.append(
+                async_shell.execute_shell_command_async(
+                    ["sleep 1; echo done"], None, None, None
+                )
+            )
+
+        threads = [threading.Thread(target=run) for _ in range(3)]
+        started = monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+
+        self.assertLess(monotonic() - started, 2.5)
+        self.assertEqual(results, [(0, "done\n")] * 3)
+
+    def test_bounded_concurrency_keeps_order(self):
+        commands = [
+            ShellCommand([f"sleep 0.{3 - index}; echo {index}"], None, None, None)
+            for index in range(3)
+        ]
+
+        results = async_shell.execute_shell_commands(commands, max_concurrency=2)
+
+        self.assertEqual(results, [(0, "0\n"), (0, "1\n"), (0, "2\n")])
+
+    def test_loop_is_not_shared_with_forked_process(self):
+        loop = async_shell.get_event_loop()
+        self.addCleanup(setattr, async_shell, "_LOOP", loop)
+
+        async_shell._reset_after_fork()
+
+        new_loop = async_shell.get_event_loop()
+        new_loop.call_soon_threadsafe(new_loop.stop)
+
+        self.assertIsNot(new_loop, loop)
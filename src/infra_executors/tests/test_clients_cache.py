@@ -0,0 +1,107 @@
+import threading
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from infra_executors import clients_cache
+from infra_executors.clients_cache import ClientsCache
+from infra_executors.constants import AwsCredentials
+
+CREDS = AwsCredentials("key", "secret", "", "us-east-1")
+
+
+class ClientsCacheTestCase(SimpleTestCase):
+    def setUp(self) -> None:
+        self.now = 1000.0
+        patcher = mock.patch.object(
+            clients_cache, "monotonic", side_effect=lambda: self.now
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = ClientsCache(ttl=60, max_size=2)
+
+    def key(self, service_name, creds=CREDS):
+        return clients_cache.get_client_key(service_name, creds)
+
+    def test_creates_client_once(self):
+        create = mock.Mock(side_effect=object)
+
+        first = self.cache.get(self.key("ssm"), create)
+        second = self.cache.get(self.key("ssm"), create)
+
+        self.assertIs(first, second)
+        create.assert_called_once_with()
+
+    def test_clients_per_region_and_credentials(self):
+        keys = {
+            self.key("ssm"),
+            self.key("ssm", CREDS._replace(region="eu-west-1")),
+            self.key("ssm", CREDS._replace(secret_key="rotated")),
+            self.key("ecs"),
+        }
+
+        self.assertEqual(len(keys), 4)
+        self.assertNotIn("secret", "".join(self.key("ssm")))
+
+    def test_expired_client_is_recreated(self):
+        first = self.cache.get(self.key("ssm"), object)
+        self.now += 60
+
+        second = self.cache.get(self.key("ssm"), object)
+
+        self.assertIsNot(first, second)
+
+    def test_least_recently_used_client_is_dropped(self):
+        ssm = self.cache.get(self.key("ssm"), object)
+        self.cache.get(self.key("ecs"), object)
+        self.cache.get(self.key("ssm"), object)
+
+        self.cache.get(self.key("ec2"), object)
+
+        self.assertEqual(list(self.cache.clients), [self.key("ssm"), self.key("ec2")])
+        self.assertIs(self.cache.get(self.key("ssm"), object), ssm)
+
+    def test_failed_creation_is_not_cached(self):
+        with self.assertRaises(RuntimeError):
+            self.cache.get(self.key("ssm"), mock.Mock(side_effect=RuntimeError))
+
+        client = self.cache.get(self.key("ssm"), object)
+
+        self.assertIsNotNone(client)
+        self.assertEqual(self.cache.creating, {})
+
+    def test_concurrent_lookups_wait_for_single_creation(self):
+        created = threading.Event()
+        release = threading.Event()
+
+        def create():
+            created.set()
+            release.wait(5)
+            return object()
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(self.cache.get(self.key("ssm"), create))
+            )
+            for _ in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        created.wait(5)
+        # other clients are not blocked by the creation
+        ecs = self.cache.get(self.key("ecs"), object)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertIsNotNone(ecs)
+        self.assertEqual(len(results), 3)
+        self.assertEqual(len({id(client) for client in results}), 1)
+
+    def test_starts_empty_after_fork(self):
+        self.cache.get(self.key("ssm"), object)
+
+        self.cache.after_fork()
+
+        self.assertEqual(len(self.cache.clients), 0)
@@ -0,0 +1,143 @@
+import io
+import json
+import os
+import stat
+import tempfile
+from unittest import mock
+
+import boto3
+from botocore.exceptions import EndpointConnectionError
+from botocore.response import StreamingBody
+from botocore.stub import Stubber
+from django.test import SimpleTestCase
+
+from infra_executors import outputs_cache
+from infra_executors.constants import AwsCredentials, TERRAFORM_STATE_BUCKET
+
+CREDS = AwsCredentials("key", "secret", "", "us-east-1")
+STATE_KEY = "org/env/alb.tfstate"
+VERSION = outputs_cache.StateVersion("7f8e-lineage", 3)
+OUTPUTS = {"alb_dns": {"value": "alb.example.com", "type": "string"}}
+
+
+def state_body(state_version, **state):
+    content = json.dumps(
+        dict(
+            dict(version=4, serial=state_version.serial, lineage=state_version.lineage),
+            **state
+        ),
+        indent=2,
+    ).encode()
+    return StreamingBody(io.BytesIO(content), len(content))
+
+
+class OutputsCacheTestCase(SimpleTestCase):
+    """State bucket stubbed with botocore and cache files in a temp dir."""
+
+    def setUp(self) -> None:
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        self.s3 = boto3.client(
+            "s3",
+            region_name="us-east-2",
+            aws_access_key_id="test",
+            aws_secret_access_key="test",
+        )
+        self.stubber = Stubber(self.s3)
+        self.stubber.activate()
+        self.addCleanup(self.stubber.deactivate)
+        for patcher in (
+            mock.patch.object(outputs_cache, "OUTPUTS_CACHE_DIR", cache_dir.name),
+            mock.patch.object(outputs_cache, "get_boto3_client", return_value=self.s3),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+
+class StateVersionTestCase(OutputsCacheTestCase):
+    def test_reads_header_of_state(self):
+        self.stubber.add_response(
+            "get_object",
+            dict(Body=state_body(VERSION)),
+            dict(
+                Bucket=TERRAFORM_STATE_BUCKET,
+                Key=STATE_KEY,
+                Range=outputs_cache.STATE_HEADER_RANGE,
+            ),
+        )
+
+        self.assertEqual(outputs_cache.get_state_version(CREDS, STATE_KEY), VERSION)
+        self.stubber.assert_no_pending_responses()
+
+    def test_missing_state(self):
+        self.stubber.add_client_error("get_object", "NoSuchKey", http_status_code=404)
+
+        self.assertIsNone(outputs_cache.get_state_version(CREDS, STATE_KEY))
+
+    def test_connection_error(self):
+        with mock.patch.object(
+            self.s3,
+            "get_object",
+            side_effect=EndpointConnectionError(endpoint_url="https://s3"),
+        ):
+            self.assertIsNone(outputs_cache.get_state_version(CREDS, STATE_KEY))
+
+    def test_parse_state_version(self):
+        self.assertEqual(
+            outputs_cache.parse_state_version(
+                '{"version": 4, "serial": 12, "lineage": "abc"'
+            ),
+            outputs_cache.StateVersion("abc", 12),
+        )
+        self.assertIsNone(outputs_cache.parse_state_version('{"version": 4'))
+
+
+class CachedOutputsTestCase(OutputsCacheTestCase):
+    def test_same_state_version(self):
+        outputs_cache.store_outputs(STATE_KEY, VERSION, OUTPUTS)
+
+        self.assertEqual(outputs_cache.get_cached_outputs(STATE_KEY, VERSION), OUTPUTS)
+
+    def test_serial_changed(self):
+        outputs_cache.store_outputs(STATE_KEY, VERSION, OUTPUTS)
+
+        self.assertIsNone(
+            outputs_cache.get_cached_outputs(STATE_KEY, VERSION._replace(serial=4))
+        )
+
+    def test_lineage_changed(self):
+        outputs_cache.store_outputs(STATE_KEY, VERSION, OUTPUTS)
+
+        self.assertIsNone(
+            outputs_cache.get_cached_outputs(
+                STATE_KEY, VERSION._replace(lineage="new-lineage")
+            )
+        )
+
+    def test_per_state_key(self):
+        outputs_cache.store_outputs(STATE_KEY, VERSION, OUTPUTS)
+
+        self.assertIsNone(outputs_cache.get_cached_outputs("other.tfstate", VERSION))
+
+    def test_invalidate(self):
+        outputs_cache.store_outputs(STATE_KEY, VERSION, OUTPUTS)
+
+        outputs_cache.invalidate_outputs(STATE_KEY)
+        outputs_cache.invalidate_outputs(STATE_KEY)
+
+        self.assertIsNone(outputs_cache.get_cached_outputs(STATE_KEY, VERSION))
+
+    def test_readable_by_owner_only(self):
+        outputs_cache.store_outputs(STATE_KEY, VERSION, OUTPUTS)
+
+        (file_name,) = os.listdir(outputs_cache.OUTPUTS_CACHE_DIR)
+        mode = os.stat(os.path.join(outputs_cache.OUTPUTS_CACHE_DIR, file_name)).st_mode
+        self.assertEqual(stat.S_IMODE(mode), 0o600)
+
+    def test_corrupted_cache_file(self):
+        outputs_cache.store_outputs(STATE_KEY, VERSION, OUTPUTS)
+        (file_name,) = os.listdir(outputs_cache.OUTPUTS_CACHE_DIR)
+        with open(os.path.join(outputs_cache.OUTPUTS_CACHE_DIR, file_name), "w") as f:
+            f.write("{")
+
+        self.assertIsNone(outputs_cache.get_cached_outputs(STATE_KEY, VERSION))
@@ -0,0 +1,67 @@
+import tempfile
+from functools import partial
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from infra_executors import progress
+
+
+class TrackProgressTestCase(SimpleTestCase):
+    def setUp(self) -> None:
+        logs_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(logs_dir.cleanup)
+        patcher = mock.patch.object(progress, "EXEC_LOGS_DIR", logs_dir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.in_progress = {}
+        self.consume = partial(
+            progress.track_progress,
+            executor="database",
+            run_id=1,
+            in_progress=self.in_progress,
+        )
+
+    def events(self):
+        return {
+            (event.address, event.action): event
+            for event in progress.read_resource_events(1)
+        }
+
+    def test_records_completed_operations(self):
+        self.consume("aws_db_instance.this: Creating...")
+        self.consume("aws_db_instance.this: Still creating... [10s elapsed]")
+        self.consume("aws_db_instance.this: Creation complete after 5m3s [id=db]")
+        self.consume("Apply complete! Resources: 1 added, 0 changed, 0 destroyed.")
+
+        (event,) = self.events().values()
+        self.assertEqual(event.executor, "database")
+        self.assertEqual(event.action, progress.CREATE)
+        self.assertTrue(event.is_complete)
+        self.assertEqual(event.duration, 303)
+        self.assertEqual(self.in_progress, {})
+
+    def test_operations_in_progress(self):
+        self.consume("aws_db_instance.this: Modifying... [id=db]")
+
+        (event,) = self.events().values()
+        self.assertEqual(event.action, progress.UPDATE)
+        self.assertIsNone(event.finished_at)
+        self.assertFalse(event.is_complete)
+
+    def test_finish_progress(self):
+        self.consume("aws_db_instance.this: Destroying... [id=db]")
+        self.consume("aws_security_group.db: Destroying... [id=sg]")
+        self.consume("aws_security_group.db: Destruction complete after 2s")
+
+        progress.finish_progress(1, self.in_progress)
+
+        events = self.events()
+        self.assertIsNotNone(events[("aws_db_instance.this", "destroy")].finished_at)
+        self.assertFalse(events[("aws_db_instance.this", "destroy")].is_complete)
+        self.assertTrue(events[("aws_security_group.db", "destroy")].is_complete)
+        self.assertEqual(self.in_progress, {})
+
+    def test_parse_elapsed(self):
+        self.assertEqual(progress.parse_elapsed("1h2m3.5s"), 3723.5)
+        self.assertIsNone(progress.parse_elapsed(""))
@@ -0,0 +1,165 @@
+import gzip
+import os
+import tempfile
+from time import time
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from infra_executors import retention, run_logs
+
+DAY = 24 * 60 * 60
+
+
+class RetentionTestCase(SimpleTestCase):
+    """Logs, plans and locks dirs of the node in a temp dir."""
+
+    def setUp(self) -> None:
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.logs_dir = os.path.join(tmp_dir.name, "exec_logs")
+        self.plans_dir = os.path.join(tmp_dir.name, "plans")
+        os.makedirs(self.logs_dir)
+        os.makedirs(self.plans_dir)
+        for module, name, value in (
+            (retention, "EXEC_LOGS_DIR", self.logs_dir),
+            (run_logs, "EXEC_LOGS_DIR", self.logs_dir),
+            (retention, "PLANS_DIR", self.plans_dir),
+            (retention, "LOCKS_DIR", os.path.join(tmp_dir.name, "locks")),
+            (retention, "RUNS_DIR", os.path.join(tmp_dir.name, "runs")),
+            (retention, "TEMPLATES_DIR", os.path.join(tmp_dir.name, "templates")),
+        ):
+            patcher = mock.patch.object(module, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.now = time()
+
+    def write(self, directory, name, content, age=0):
+        path = os.path.join(directory, name)
+        with open(path, "w") as artifact:
+            artifact.write(content)
+        os.utime(path, (self.now - age, self.now - age))
+        return path
+
+    def files(self, directory):
+        return sorted(os.listdir(directory))
+
+
+class CompressLogsTestCase(RetentionTestCase):
+    def test_compresses_idle_logs(self):
+        self.write(self.logs_dir, "alb_create_1.log", "done\n", age=2 * 60 * 60)
+        self.write(self.logs_dir, "alb_create_2.log", "running\n")
+        # run didn't end, terraform can still write to the log
+        self.write(self.logs_dir, "alb_create_3.log", "waiting\n", age=2 * 60 * 60)
+
+        self.assertEqual(retention.compress_idle_logs(self.now, {"2", "3"}), 1)
+
+        self.assertEqual(
+            self.files(self.logs_dir),
+            ["alb_create_1.log.gz", "alb_create_2.log", "alb_create_3.log"],
+        )
+        with gzip.open(os.path.join(self.logs_dir, "alb_create_1.log.gz")) as log:
+            self.assertEqual(log.read(), b"done\n")
+
+    def test_log_written_while_compressing_is_kept(self):
+        path = self.write(self.logs_dir, "alb_create_1.log", "first\n")
+        copy = retention.shutil.copyfileobj
+
+        def copy_and_append(source, destination):
+            copy(source, destination)
+            with open(path, "a") as log_file:
+                log_file.write("late\n")
+
+        with mock.patch.object(
+            retention.shutil, "copyfileobj", side_effect=copy_and_append
+        ):
+            self.assertFalse(retention.compress_log(path))
+
+        self.assertEqual(self.files(self.logs_dir), ["alb_create_1.log"])
+        with open(path) as log_file:
+            self.assertEqual(log_file.read(), "first\nlate\n")
+
+    def test_log_run_id(self):
+        self.assertEqual(retention.get_log_run_id("/logs/alb_create_12.log"), "12")
+
+    def test_resumed_run(self):
+        path = self.write(self.logs_dir, "alb_create_1.log", "first\n")
+        retention.compress_log(path)
+        self.write(self.logs_dir, "alb_create_1.log", "second\n")
+
+        retention.compress_log(path)
+
+        self.assertEqual(self.files(self.logs_dir), ["alb_create_1.log.gz"])
+        self.assertEqual(
+            run_logs.get_run_logs(1), [run_logs.RunLog("alb_create_1.log", 13)]
+        )
+        chunk = run_logs.read_log_chunk(path, 6)
+        self.assertEqual(chunk, run_logs.LogChunk("second\n", 13))
+
+    def test_size_of_compressed_log(self):
+        content = "".join(
+            f"aws_instance.{index}: Creating...\n" for index in range(1000)
+        )
+        path = self.write(self.logs_dir, "ecs_create_1.log", content)
+        retention.compress_log(path)
+
+        self.assertEqual(
+            run_logs.get_run_logs(1),
+            [run_logs.RunLog("ecs_create_1.log", len(content))],
+        )
+
+
+class RemoveExpiredTestCase(RetentionTestCase):
+    def test_plans(self):
+        self.write(self.plans_dir, "alb_1.tfplan", "plan", age=2 * DAY)
+        self.write(self.plans_dir, "alb_2.tfplan", "plan", age=60)
+
+        self.assertEqual(retention.remove_expired_plans(self.now), 4)
+
+        self.assertEqual(self.files(self.plans_dir), ["alb_2.tfplan"])
+
+    def test_events(self):
+        self.write(self.logs_dir, "resources_1.jsonl", "{}\n", age=8 * DAY)
+        self.write(self.logs_dir, "resources_2.jsonl", "{}\n", age=DAY)
+        self.write(self.logs_dir, "alb_create_1.log.gz", "", age=8 * DAY)
+
+        retention.remove_expired_events(self.now)
+
+        self.assertEqual(
+            self.files(self.logs_dir), ["alb_create_1.log.gz", "resources_2.jsonl"]
+        )
+
+
+class DiskBudgetTestCase(RetentionTestCase):
+    def test_removes_oldest_idle_artifacts(self):
+        self.write(self.logs_dir, "alb_create_1.log.gz", "x" * 10, age=3 * DAY)
+        self.write(self.plans_dir, "alb_2.tfplan", "x" * 10, age=2 * DAY)
+        self.write(self.logs_dir, "alb_create_3.log.gz", "x" * 10, age=DAY)
+        self.write(self.logs_dir, "alb_create_4.log", "x" * 10)
+
+        self.assertEqual(retention.enforce_disk_budget(self.now, budget=25), 20)
+
+        self.assertEqual(self.files(self.plans_dir), [])
+        self.assertEqual(
+            self.files(self.logs_dir), ["alb_create_3.log.gz", "alb_create_4.log"]
+        )
+
+    def test_keeps_logs_of_runs_in_progress(self):
+        self.write(self.logs_dir, "alb_create_1.log", "x" * 10)
+
+        self.assertEqual(retention.enforce_disk_budget(self.now, budget=5), 0)
+        self.assertEqual(self.files(self.logs_dir), ["alb_create_1.log"])
+
+
+class ApplyRetentionTestCase(RetentionTestCase):
+    def test_applies_all_rules(self):
+        self.write(self.logs_dir, "alb_create_1.log", "done\n", age=2 * 60 * 60)
+
+        summary = retention.apply_retention(running_run_ids=set())
+
+        self.assertEqual(summary["logs_compressed"], 1)
+        self.assertEqual(self.files(self.logs_dir), ["alb_create_1.log.gz"])
+
+    def test_skipped_while_another_worker_applies_it(self):
+        with mock.patch.object(retention.fcntl, "flock", side_effect=BlockingIOError):
+            self.assertEqual(retention.apply_retention(set()), {})
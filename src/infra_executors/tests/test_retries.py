@@ -0,0 +1,48 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from infra_executors import retries
+
+
+class ClassifyFailureTestCase(SimpleTestCase):
+    def test_state_locked(self):
+        self.assertEqual(
+            retries.classify_failure(
+                "Error: Error acquiring the state lock\n\nLock Info: ..."
+            ),
+            retries.STATE_LOCKED,
+        )
+
+    def test_throttling(self):
+        for output in (
+            "ThrottlingException: Rate exceeded",
+            "Error: error creating ECR repository: RequestLimitExceeded",
+            "TooManyRequestsException: Too Many Requests",
+            "SlowDown: Please reduce your request rate.",
+        ):
+            with self.subTest(output=output):
+                self.assertEqual(retries.classify_failure(output), retries.THROTTLING)
+
+    def test_not_transient(self):
+        self.assertIsNone(
+            retries.classify_failure(
+                "Error: InvalidParameterException: Invalid subnet id"
+            )
+        )
+        self.assertIsNone(retries.classify_failure(""))
+
+
+class GetRetryDelayTestCase(SimpleTestCase):
+    def test_exponential_backoff(self):
+        with mock.patch.object(retries.random, "uniform", lambda low, high: high):
+            self.assertEqual(
+                [retries.get_retry_delay(attempt) for attempt in range(1, 6)],
+                [10, 20, 40, 60, 60],
+            )
+
+    def test_full_jitter(self):
+        for attempt in range(1, retries.MAX_PHASE_ATTEMPTS):
+            delay = retries.get_retry_delay(attempt)
+            self.assertGreaterEqual(delay, 0)
+            self.assertLessEqual(delay, retries.RETRY_MAX_DELAY_SECONDS)
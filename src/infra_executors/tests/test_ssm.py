@@ -0,0 +1,296 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from benchmarks.fake_aws import FakeSsm, client_error
+from infra_executors import ssm
+from infra_executors.account_limits import RateLimiter
+
+
+def put_parameters(client, count, prefix="/dev/shop/api/"):
+    for index in range(count):
+        client.put_parameter(Name=f"{prefix}KEY_{index:02}", Value=str(index))
+
+
+def list_pages(client, prefix="/dev/shop/api/", page_size=50):
+    """Pages of parameter metadata, as listed by describe_parameters."""
+    names = sorted(name for name in client.parameters if name.startswith(prefix))
+    metadata = [dict(Name=name) for name in names]
+    return [
+        metadata[start : start + page_size]
+        for start in range(0, len(metadata), page_size)
+    ]
+
+
+class FetchParameterValuesTestCase(SimpleTestCase):
+    def setUp(self) -> None:
+        self.client = FakeSsm("us-east-1")
+
+    def fetch(self, pages):
+        with mock.patch.object(
+            self.client, "get_parameters", wraps=self.client.get_parameters
+        ) as get_parameters:
+            fetched = list(ssm.fetch_parameter_values(self.client, pages))
+        batches = [call.kwargs["Names"] for call in get_parameters.call_args_list]
+        return fetched, batches
+
+    def test_fetches_in_batches_of_ten(self):
+        put_parameters(self.client, 25)
+
+        fetched, batches = self.fetch(list_pages(self.client))
+
+        self.assertEqual(sorted(len(batch) for batch in batches), [5, 10, 10])
+        self.assertEqual(
+            [parameter["Value"] for _, parameter in fetched],
+            [str(index) for index in range(25)],
+        )
+
+    def test_batches_do_not_span_pages(self):
+        put_parameters(self.client, 12)
+
+        fetched, batches = self.fetch(list_pages(self.client, page_size=6))
+
+        self.assertEqual([len(batch) for batch in batches], [6, 6])
+        self.assertEqual(len(fetched), 12)
+
+    def test_exact_batch(self):
+        put_parameters(self.client, 10)
+
+        fetched, batches = self.fetch(list_pages(self.client))
+
+        self.assertEqual([len(batch) for batch in batches], [10])
+        self.assertEqual(len(fetched), 10)
+
+    def test_no_parameters(self):
+        fetched, batches = self.fetch([[]])
+
+        self.assertEqual(fetched, [])
+        self.assertEqual(batches, [])
+
+    def test_skips_parameters_removed_after_listing(self):
+        put_parameters(self.client, 3)
+        pages = list_pages(self.client)
+        self.client.delete_parameter(Name="/dev/shop/api/KEY_01")
+
+        fetched, _ = self.fetch(pages)
+
+        self.assertEqual(
+            [(metadata["Name"], parameter["Name"]) for metadata, parameter in fetched],
+            [
+                ("/dev/shop/api/KEY_00", "/dev/shop/api/KEY_00"),
+                ("/dev/shop/api/KEY_02", "/dev/shop/api/KEY_02"),
+            ],
+        )
+
+    def test_get_parameters_batch(self):
+        put_parameters(self.client, 2)
+
+        parameters = ssm.get_parameters_batch(
+            self.client, ["/dev/shop/api/KEY_00", "/dev/shop/api/MISSING"]
+        )
+
+        self.assertEqual(list(parameters), ["/dev/shop/api/KEY_00"])
+
+
+class IterParametersByPathTestCase(SimpleTestCase):
+    def setUp(self) -> None:
+        self.client = FakeSsm("us-east-1")
+
+    def test_pages_through_all_parameters(self):
+        put_parameters(self.client, 12, "/dev/shop/api/")
+        put_parameters(self.client, 9, "/dev/shop/web/")
+        put_parameters(self.client, 2, "/dev/other/api/")
+
+        with mock.patch.object(
+            self.client,
+            "get_parameters_by_path",
+            wraps=self.client.get_parameters_by_path,
+        ) as get_parameters_by_path:
+            pages = list(ssm.iter_parameters_by_path(self.client, "/dev/shop/"))
+
+        self.assertEqual([len(page) for page in pages], [10, 10, 1])
+        self.assertEqual(get_parameters_by_path.call_count, 3)
+        names = [parameter["Name"] for page in pages for parameter in page]
+        self.assertEqual(len(set(names)), 21)
+        self.assertTrue(all(name.startswith("/dev/shop/") for name in names))
+        self.assertTrue(all(parameter["Value"] for page in pages for parameter in page))
+
+    def test_empty_path(self):
+        pages = list(ssm.iter_parameters_by_path(self.client, "/dev/shop/"))
+
+        self.assertEqual(pages, [[]])
+
+
+class PutParametersTestCase(SimpleTestCase):
+    def setUp(self) -> None:
+        self.client = FakeSsm("us-east-1")
+        self.limiter = RateLimiter(1000)
+
+    def test_results_in_order_of_writes(self):
+        writes = [
+            ssm.ParameterWrite(
+                f"/dev/shop/api/KEY_{index:02}", str(index), bool(index % 2)
+            )
+            for index in range(12)
+        ]
+
+        results = ssm.put_parameters(self.client, writes, self.limiter)
+
+        self.assertEqual(
+            results, [ssm.WriteResult(write.name, True) for write in writes]
+        )
+        self.assertEqual(
+            {
+                name: parameter["Type"]
+                for name, parameter in self.client.parameters.items()
+            },
+            {
+                write.name: "SecureString" if write.is_secure else "String"
+                for write in writes
+            },
+        )
+
+    def test_overwrites_existing_parameters(self):
+        put_parameters(self.client, 1)
+
+        results = ssm.put_parameters(
+            self.client,
+            [ssm.ParameterWrite("/dev/shop/api/KEY_00", "new")],
+            self.limiter,
+        )
+
+        self.assertEqual(results, [ssm.WriteResult("/dev/shop/api/KEY_00", True)])
+        self.assertEqual(self.client.parameters["/dev/shop/api/KEY_00"]["Value"], "new")
+
+    def test_reports_failed_writes(self):
+        put_parameter = self.client.put_parameter
+
+        def throttle_second(Name, **kwargs):
+            if Name.endswith("KEY_01"):
+                raise client_error(
+                    "PutParameter", "ThrottlingException", "Rate exceeded"
+                )
+            return put_parameter(Name=Name, **kwargs)
+
+        writes = [
+            ssm.ParameterWrite(f"/dev/shop/api/KEY_{index:02}", str(index))
+            for index in range(3)
+        ]
+        with mock.patch.object(self.client, "put_parameter", throttle_second):
+            results = ssm.put_parameters(self.client, writes, self.limiter)
+
+        self.assertEqual(
+            results,
+            [
+                ssm.WriteResult("/dev/shop/api/KEY_00", True),
+                ssm.WriteResult("/dev/shop/api/KEY_01", False, "ThrottlingException"),
+                ssm.WriteResult("/dev/shop/api/KEY_02", True),
+            ],
+        )
+
+
+class DeleteParametersTestCase(SimpleTestCase):
+    def setUp(self) -> None:
+        self.client = FakeSsm("us-east-1")
+        self.limiter = RateLimiter(1000)
+
+    def test_deletes_in_batches(self):
+        put_parameters(self.client, 25)
+        names = sorted(self.client.parameters)
+
+        with mock.patch.object(
+            self.client, "delete_parameters", wraps=self.client.delete_parameters
+        ) as delete:
+            results = ssm.delete_parameters(self.client, names, self.limiter)
+
+        self.assertEqual(
+            [len(call.kwargs["Names"]) for call in delete.call_args_list], [10, 10, 5]
+        )
+        self.assertEqual(results, [ssm.WriteResult(name, True) for name in names])
+        self.assertEqual(self.client.parameters, {})
+
+    def test_missing_parameters_fail_with_parameter_not_found(self):
+        put_parameters(self.client, 1)
+
+        results = ssm.delete_parameters(
+            self.client,
+            ["/dev/shop/api/KEY_00", "/dev/shop/api/MISSING"],
+            self.limiter,
+        )
+
+        self.assertEqual(
+            results,
+            [
+                ssm.WriteResult("/dev/shop/api/KEY_00", True),
+                ssm.WriteResult("/dev/shop/api/MISSING", False, "ParameterNotFound"),
+            ],
+        )
+
+    def test_failed_call_fails_whole_batch(self):
+        put_parameters(self.client, 12)
+        names = sorted(self.client.parameters)
+        delete_parameters = self.client.delete_parameters
+
+        def deny_second_batch(Names):
+            if Names[0] == names[10]:
+                raise client_error(
+                    "DeleteParameters", "AccessDeniedException", "Denied"
+                )
+            return delete_parameters(Names=Names)
+
+        with mock.patch.object(self.client, "delete_parameters", deny_second_batch):
+            results = ssm.delete_parameters(self.client, names, self.limiter)
+
+        self.assertEqual(
+            results,
+            [ssm.WriteResult(name, True) for name in names[:10]]
+            + [
+                ssm.WriteResult(name, False, "AccessDeniedException")
+                for name in names[10:]
+            ],
+        )
+        self.assertEqual(sorted(self.client.parameters), names[10:])
+
+
+class DiffParametersTestCase(SimpleTestCase):
+    def setUp(self) -> None:
+        self.client = FakeSsm("us-east-1")
+        self.client.put_parameter(Name="/p/SAME", Value="1", Type="SecureString")
+        self.client.put_parameter(Name="/p/VALUE", Value="1", Type="SecureString")
+        self.client.put_parameter(Name="/p/TYPE", Value="1", Type="String")
+        self.client.put_parameter(Name="/p/EXTRA", Value="1", Type="String")
+        self.writes = [
+            ssm.ParameterWrite("/p/SAME", "1"),
+            ssm.ParameterWrite("/p/VALUE", "2"),
+            ssm.ParameterWrite("/p/TYPE", "1", is_secure=True),
+            ssm.ParameterWrite("/p/NEW", "1", is_secure=False),
+        ]
+
+    def test_diff(self):
+        diff = ssm.diff_parameters(self.client.parameters, self.writes)
+
+        self.assertEqual(
+            diff,
+            ssm.ParametersDiff(
+                added=[ssm.ParameterWrite("/p/NEW", "1", is_secure=False)],
+                changed=[
+                    ssm.ParameterWrite("/p/VALUE", "2"),
+                    ssm.ParameterWrite("/p/TYPE", "1", is_secure=True),
+                ],
+                deleted=[],
+                unchanged=["/p/SAME"],
+            ),
+        )
+
+    def test_prune_deletes_parameters_not_written(self):
+        diff = ssm.diff_parameters(self.client.parameters, self.writes, prune=True)
+
+        self.assertEqual(diff.deleted, ["/p/EXTRA"])
+        self.assertEqual(diff.unchanged, ["/p/SAME"])
+
+    def test_nothing_to_write(self):
+        diff = ssm.diff_parameters(
+            self.client.parameters, [ssm.ParameterWrite("/p/SAME", "1")]
+        )
+
+        self.assertEqual(diff, ssm.ParametersDiff([], [], [], ["/p/SAME"]))
@@ -0,0 +1,115 @@
+from unittest import mock
+
+from botocore.exceptions import EndpointConnectionError
+
+from infra_executors import outputs_cache
+from infra_executors.constants import TERRAFORM_STATE_BUCKET
+from infra_executors.state_reader import read_state_outputs
+from infra_executors.tests.test_outputs_cache import (
+    CREDS,
+    STATE_KEY,
+    VERSION,
+    OutputsCacheTestCase,
+    state_body,
+)
+
+STATE_OUTPUTS = {
+    "alb_dns": {"value": "alb.example.com", "type": "string"},
+    "db_password": {"value": "secret", "type": "string", "sensitive": True},
+}
+OUTPUTS = {
+    "alb_dns": {"value": "alb.example.com", "type": "string", "sensitive": False},
+    "db_password": {"value": "secret", "type": "string", "sensitive": True},
+}
+
+
+class ReadStateOutputsTestCase(OutputsCacheTestCase):
+    def stub_state(self, etag='"etag-1"', expected_etag=None, **state):
+        expected_params = dict(Bucket=TERRAFORM_STATE_BUCKET, Key=STATE_KEY)
+        if expected_etag:
+            expected_params["IfNoneMatch"] = expected_etag
+        self.stubber.add_response(
+            "get_object",
+            dict(
+                Body=state_body(VERSION, **{"outputs": STATE_OUTPUTS, **state}),
+                ETag=etag,
+            ),
+            expected_params,
+        )
+
+    def stub_not_modified(self, expected_etag):
+        self.stubber.add_client_error(
+            "get_object",
+            "304",
+            "Not Modified",
+            http_status_code=304,
+            expected_params=dict(
+                Bucket=TERRAFORM_STATE_BUCKET, Key=STATE_KEY, IfNoneMatch=expected_etag
+            ),
+        )
+
+    def test_reads_outputs_and_caches_them_with_etag(self):
+        self.stub_state()
+
+        self.assertEqual(read_state_outputs(CREDS, STATE_KEY), OUTPUTS)
+
+        self.assertEqual(
+            outputs_cache.load_cached_outputs(STATE_KEY),
+            outputs_cache.CachedOutputs(VERSION, OUTPUTS, '"etag-1"'),
+        )
+
+    def test_not_modified_state_is_served_from_cache(self):
+        self.stub_state()
+        read_state_outputs(CREDS, STATE_KEY)
+        self.stub_not_modified('"etag-1"')
+
+        self.assertEqual(read_state_outputs(CREDS, STATE_KEY), OUTPUTS)
+        self.stubber.assert_no_pending_responses()
+
+    def test_modified_state_is_read_again(self):
+        self.stub_state()
+        read_state_outputs(CREDS, STATE_KEY)
+        self.stub_state(
+            etag='"etag-2"',
+            expected_etag='"etag-1"',
+            outputs=dict(alb_dns=dict(value="new.example.com", type="string")),
+        )
+
+        self.assertEqual(
+            read_state_outputs(CREDS, STATE_KEY),
+            {
+                "alb_dns": {
+                    "value": "new.example.com",
+                    "type": "string",
+                    "sensitive": False,
+                }
+            },
+        )
+        self.assertEqual(outputs_cache.load_cached_outputs(STATE_KEY).etag, '"etag-2"')
+
+    def test_cache_without_etag_is_not_used(self):
+        # outputs cached from `terraform output`, not from the state object
+        outputs_cache.store_outputs(STATE_KEY, VERSION, OUTPUTS)
+        self.stub_state()
+
+        self.assertEqual(read_state_outputs(CREDS, STATE_KEY), OUTPUTS)
+        self.stubber.assert_no_pending_responses()
+
+    def test_missing_state(self):
+        self.stubber.add_client_error("get_object", "NoSuchKey", http_status_code=404)
+
+        self.assertIsNone(read_state_outputs(CREDS, STATE_KEY))
+
+    def test_connection_error(self):
+        with mock.patch.object(
+            self.s3,
+            "get_object",
+            side_effect=EndpointConnectionError(endpoint_url="https://s3"),
+        ):
+            self.assertIsNone(read_state_outputs(CREDS, STATE_KEY))
+
+    def test_unsupported_state_version(self):
+        self.stub_state(version=3)
+
+        self.assertIsNone(read_state_outputs(CREDS, STATE_KEY))
+        self.assertIsNone(outputs_cache.load_cached_outputs(STATE_KEY))
@@ -0,0 +1,146 @@
+import os
+import tempfile
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from infra_executors import fingerprint, terraform_executor, workspace
+from infra_executors.alb import ALBConfigs, create_alb
+from infra_executors.constants import GeneralConfiguration
+from infra_executors.outputs_cache import StateVersion
+from infra_executors.terraform_executor import (
+    ExecutorConfiguration,
+    TerraformExecutor,
+)
+from infra_executors.tests.test_outputs_cache import CREDS
+
+PARAMS = GeneralConfiguration(
+    organization_id="org",
+    env_id="env",
+    project_id="project",
+    service_id="",
+    env_name="dev",
+    env_slug="dev-slug",
+    project_name="shop",
+    run_id="1",
+)
+ALB_CONF = ALBConfigs(alb_name="shop-dev", open_ports=[])
+VERSION = StateVersion("lineage", 3)
+OUTPUTS = {"alb_name": {"value": "shop-dev", "type": "string", "sensitive": False}}
+
+
+class ExecuteApplyTestCase(SimpleTestCase):
+    """Applies of the alb config, with terraform and remote state mocked."""
+
+    def setUp(self) -> None:
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        terraform_dir = os.path.join(tmp_dir.name, "terraform")
+        os.makedirs(os.path.join(terraform_dir, "alb"))
+        with open(os.path.join(terraform_dir, "alb", "main.tf"), "w") as tf_file:
+            tf_file.write('resource "aws_lb" "alb" {}')
+
+        self.state_version = VERSION
+        self.apply_plan = mock.Mock(return_value=OUTPUTS)
+        for patcher in (
+            mock.patch.object(workspace, "TERRAFORM_DIR", terraform_dir),
+            mock.patch.object(
+                workspace, "TERRAFORM_PLUGIN_DIR", os.path.join(tmp_dir.name, "plugins")
+            ),
+            mock.patch.object(fingerprint, "FINGERPRINTS_DIR", tmp_dir.name),
+            mock.patch.object(
+                terraform_executor,
+                "get_state_version",
+                side_effect=lambda creds, state_key: self.state_version,
+            ),
+            mock.patch.object(
+                terraform_executor, "read_state_outputs", return_value=OUTPUTS
+            ),
+            mock.patch.object(TerraformExecutor, "init_terraform"),
+            mock.patch.object(TerraformExecutor, "prepare_plan", return_value=True),
+            mock.patch.object(TerraformExecutor, "apply_plan", self.apply_plan),
+            mock.patch.object(TerraformExecutor, "release_workspace"),
+            mock.patch.object(TerraformExecutor, "remove_plan"),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_first_apply(self):
+        self.assertEqual(create_alb(CREDS, PARAMS, ALB_CONF), OUTPUTS)
+        self.apply_plan.assert_called_once()
+
+    def test_unchanged_inputs_are_skipped(self):
+        create_alb(CREDS, PARAMS, ALB_CONF)
+
+        outputs = create_alb(CREDS, PARAMS._replace(run_id="2"), ALB_CONF)
+
+        self.assertEqual(outputs, OUTPUTS)
+        self.apply_plan.assert_called_once()
+
+    def test_changed_inputs_are_applied(self):
+        create_alb(CREDS, PARAMS, ALB_CONF)
+
+        create_alb(CREDS, PARAMS, ALB_CONF._replace(idle_timeout=120))
+
+        self.assertEqual(self.apply_plan.call_count, 2)
+
+    def test_state_written_since_last_apply(self):
+        create_alb(CREDS, PARAMS, ALB_CONF)
+        self.state_version = VERSION._replace(serial=4)
+
+        create_alb(CREDS, PARAMS, ALB_CONF)
+
+        self.assertEqual(self.apply_plan.call_count, 2)
+
+    def test_forced_apply(self):
+        create_alb(CREDS, PARAMS, ALB_CONF)
+
+        create_alb(CREDS, PARAMS, ALB_CONF, force=True)
+
+        self.assertEqual(self.apply_plan.call_count, 2)
+
+
+class ExecutePhaseTestCase(SimpleTestCase):
+    def setUp(self) -> None:
+        self.executor = TerraformExecutor(
+            CREDS,
+            PARAMS,
+            ALB_CONF,
+            ExecutorConfiguration(
+                name="alb", action="create", config_dir="alb", state_key="alb"
+            ),
+        )
+        for patcher in (
+            mock.patch.object(terraform_executor, "sleep"),
+            mock.patch.object(terraform_executor, "get_retry_delay", return_value=1),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def execute_phase(self, *results):
+        with mock.patch.object(
+            self.executor, "execute_command", side_effect=results
+        ) as execute_command:
+            return_code = self.executor.execute_phase("plan", ["terraform plan"])
+        return return_code, execute_command.call_count
+
+    def test_retries_transient_failures(self):
+        self.assertEqual(
+            self.execute_phase(
+                (1, "Error: Error acquiring the state lock"),
+                (1, "ThrottlingException: Rate exceeded"),
+                (0, ""),
+            ),
+            (0, 3),
+        )
+
+    def test_does_not_retry_other_failures(self):
+        self.assertEqual(
+            self.execute_phase((1, "Error: Invalid subnet id"), (0, "")), (1, 1)
+        )
+
+    def test_gives_up_after_max_attempts(self):
+        self.assertEqual(
+            self.execute_phase(*[(1, "Rate exceeded")] * 5),
+            (1, terraform_executor.MAX_PHASE_ATTEMPTS),
+        )
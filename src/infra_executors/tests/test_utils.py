@@ -0,0 +1,56 @@
+import os
+import tempfile
+
+from django.test import SimpleTestCase
+
+from infra_executors import utils
+
+
+class ExecuteShellCommandTestCase(SimpleTestCase):
+    def setUp(self) -> None:
+        log_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(log_dir.cleanup)
+        self.log_to = os.path.join(log_dir.name, "run.log")
+
+    def read_log(self):
+        with open(self.log_to) as log_file:
+            return log_file.read()
+
+    def test_writes_output_to_log_and_consumers(self):
+        lines = []
+
+        return_code, output = utils.execute_shell_command(
+            ["echo one; echo; echo two >&2; exit 3"],
+            None,
+            None,
+            self.log_to,
+            consumers=[lines.append],
+        )
+
+        self.assertEqual(return_code, 3)
+        self.assertEqual(output, "one\n\ntwo\n")
+        self.assertEqual(lines, ["one\n", "\n", "two\n"])
+        # blank lines are not logged
+        self.assertEqual(self.read_log(), "one\ntwo\n")
+
+    def test_keeps_only_tail_of_output(self):
+        lines = [f"line {index:03}\n".encode() for index in range(100)]
+
+        tail = utils._stream_output(lines, None, tail_bytes=30)
+
+        self.assertEqual(tail, "line 097\nline 098\nline 099\n")
+
+    def test_keeps_last_line_longer_than_tail(self):
+        tail = utils._stream_output(
+            [b"short\n", b"x" * 50 + b"\n"], None, tail_bytes=10
+        )
+
+        self.assertEqual(tail, "x" * 50 + "\n")
+
+    def test_captures_clean_stdout(self):
+        return_code, output = utils.execute_shell_command(
+            ["echo '{}'; echo noise >&2"], None, None, self.log_to, capture_output=True,
+        )
+
+        self.assertEqual((return_code, output), (0, "{}\n"))
+        self.assertEqual(self.read_log(), "noise\n")
@@ -0,0 +1,132 @@
+import os
+import tempfile
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from infra_executors import workspace
+
+
+class WorkspaceTestCase(SimpleTestCase):
+    """Terraform dir with an `alb` config dir and shared modules, in a temp dir."""
+
+    def setUp(self) -> None:
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.terraform_dir = os.path.join(tmp_dir.name, "terraform")
+        self.write("alb/main.tf", 'resource "aws_lb" "alb" {}')
+        self.write("alb/.terraform/terraform.tfstate", "{}")
+        self.write("modules/lb/main.tf", 'variable "name" {}')
+
+        self.init = mock.Mock(return_value=(0, ""))
+        for name, value in (
+            ("TERRAFORM_DIR", self.terraform_dir),
+            ("TERRAFORM_PLUGIN_DIR", os.path.join(tmp_dir.name, "plugins")),
+            ("TEMPLATES_DIR", os.path.join(tmp_dir.name, "templates")),
+            ("RUNS_DIR", os.path.join(tmp_dir.name, "runs")),
+            ("execute_shell_command", self.init),
+        ):
+            patcher = mock.patch.object(workspace, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def write(self, path, content):
+        path = os.path.join(self.terraform_dir, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as tf_file:
+            tf_file.write(content)
+
+
+class ConfigDirHashTestCase(WorkspaceTestCase):
+    def test_stable(self):
+        self.assertEqual(
+            workspace.config_dir_hash("alb"), workspace.config_dir_hash("alb")
+        )
+
+    def test_changes_with_config(self):
+        before = workspace.config_dir_hash("alb")
+
+        self.write("alb/variables.tf", 'variable "name" {}')
+
+        self.assertNotEqual(workspace.config_dir_hash("alb"), before)
+
+    def test_changes_with_shared_modules(self):
+        before = workspace.config_dir_hash("alb")
+
+        self.write("modules/lb/main.tf", 'variable "other_name" {}')
+
+        self.assertNotEqual(workspace.config_dir_hash("alb"), before)
+
+    def test_ignores_terraform_dir(self):
+        before = workspace.config_dir_hash("alb")
+
+        self.write("alb/.terraform/terraform.tfstate", '{"version": 4}')
+
+        self.assertEqual(workspace.config_dir_hash("alb"), before)
+
+
+class GetTemplateTestCase(WorkspaceTestCase):
+    def test_initializes_template_once(self):
+        template_path = workspace.get_template("alb", None, None)
+
+        self.assertEqual(workspace.get_template("alb", None, None), template_path)
+        self.init.assert_called_once()
+        self.assertTrue(os.path.isfile(os.path.join(template_path, "main.tf")))
+
+    def test_rebuilds_template_when_config_changes(self):
+        template_path = workspace.get_template("alb", None, None)
+
+        self.write("alb/main.tf", 'resource "aws_lb" "public" {}')
+
+        self.assertNotEqual(workspace.get_template("alb", None, None), template_path)
+        self.assertEqual(self.init.call_count, 2)
+
+    def test_failed_init(self):
+        self.init.return_value = (1, "")
+
+        with self.assertRaises(workspace.WorkspaceError):
+            workspace.get_template("alb", None, None)
+
+        self.assertEqual(os.listdir(workspace.TEMPLATES_DIR), [])
+
+
+class CreateWorkspaceTestCase(WorkspaceTestCase):
+    def test_clones_template(self):
+        template_path = workspace.get_template("alb", None, None)
+
+        run = workspace.create_workspace("alb", None, None)
+
+        self.assertEqual(os.path.dirname(run.path), run.root)
+        self.assertEqual(
+            os.readlink(os.path.join(run.root, "modules")),
+            os.path.join(self.terraform_dir, "modules"),
+        )
+        with open(os.path.join(run.path, "main.tf")) as tf_file:
+            self.assertEqual(tf_file.read(), 'resource "aws_lb" "alb" {}')
+        # small files are copied, terraform may rewrite them
+        self.assertNotEqual(
+            os.stat(os.path.join(run.path, "main.tf")).st_ino,
+            os.stat(os.path.join(template_path, "main.tf")).st_ino,
+        )
+        self.init.assert_called_once()
+
+    def test_hardlinks_large_files(self):
+        self.write("alb/.terraform/plugins/provider", "x" * 100)
+        template_path = workspace.get_template("alb", None, None)
+
+        with mock.patch.object(workspace, "LINK_THRESHOLD_BYTES", 100):
+            run = workspace.create_workspace("alb", None, None)
+
+        self.assertEqual(
+            os.stat(os.path.join(run.path, ".terraform/plugins/provider")).st_ino,
+            os.stat(os.path.join(template_path, ".terraform/plugins/provider")).st_ino,
+        )
+
+    def test_workspaces_are_isolated(self):
+        first = workspace.create_workspace("alb", None, None)
+        second = workspace.create_workspace("alb", None, None)
+
+        self.assertNotEqual(first.root, second.root)
+        workspace.remove_workspace(first)
+        self.assertFalse(os.path.exists(first.root))
+        self.assertTrue(os.path.isfile(os.path.join(second.path, "main.tf")))
@@ -0,0 +1,207 @@
+"""Timing of execution phases.
+
+Code measures its phases with `span`. Spans are attributed to the run of the
+current job, set by `run_context`, and appended to a json lines file next to
+the run logs, so spans of parallel steps and threads end up in one place.
+Spans outside of a run context are not recorded. Durations of all spans and
+api calls are exported as metrics too.
+"""
+import json
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import monotonic, time
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from common.metrics import Counter, Histogram
+
+from infra_executors.constants import EXEC_LOGS_DIR
+from infra_executors.logger import get_logger
+
+logger = get_logger("timing")
+
+PHASE_SECONDS = Histogram(
+    "chiliseed_phase_duration_seconds",
+    "Duration of execution phases, i.e. terraform plan of a configuration.",
+    ["component", "action", "status"],
+)
+AWS_CALL_SECONDS = Histogram(
+    "chiliseed_aws_call_duration_seconds",
+    "Latency of aws api calls, retries included.",
+    ["service", "operation"],
+)
+AWS_CALL_ERRORS = Counter(
+    "chiliseed_aws_call_errors_total",
+    "Failed aws api calls by error code.",
+    ["service", "operation", "code"],
+)
+
+current_run_id: ContextVar[Optional[Any]] = ContextVar("current_run_id", default=None)
+
+
+class Span(NamedTuple):
+    """Timed phase of a run."""
+
+    # what was running. i.e.: terraform:alb, aws:ssm
+    component: str
+    # phase of the component. i.e.: plan, GetParameter
+    action: str
+    started_at: float
+    # seconds
+    duration: float
+    is_success: bool = True
+
+
+class PhaseSummary(NamedTuple):
+    """Spans of the same phase aggregated."""
+
+    component: str
+    action: str
+    count: int
+    # seconds
+    total: float
+    average: float
+    maximum: float
+    failures: int
+
+
+def get_spans_file(run_id: Any) -> str:
+    """Return path of the file with spans of the run."""
+    return os.path.join(EXEC_LOGS_DIR, f"spans_{run_id}.jsonl")
+
+
+@contextmanager
+def run_context(run_id: Any) -> Iterator[None]:
+    """Attribute spans within the block to the run."""
+    token = current_run_id.set(run_id)
+    try:
+        yield
+    finally:
+        current_run_id.reset(token)
+
+
+def record_span(span_: Span, run_id: Optional[Any] = None) -> None:
+    """Append span to the spans file of the run."""
+    run_id = run_id if run_id is not None else current_run_id.get()
+    if run_id is None:
+        return
+    try:
+        os.makedirs(EXEC_LOGS_DIR, exist_ok=True)
+        with open(get_spans_file(run_id), "a") as spans_file:
+            spans_file.write(json.dumps(span_._asdict()) + "\n")
+    except OSError:
+        logger.exception("Failed to record span")
+
+
+@contextmanager
+def span(component: str, action: str, run_id: Optional[Any] = None) -> Iterator[None]:
+    """Measure the block and record it as a span of the run.
+
+    Parameters
+    ----------
+    component : str
+        what is running. i.e.: terraform:alb
+    action : str
+        phase of the component. i.e.: plan
+    run_id : int
+        run to attribute the span to, the current run if not provided
+    """
+    started_at = time()
+    start = monotonic()
+    is_success = False
+    try:
+        yield
+        is_success = True
+    finally:
+        duration = monotonic() - start
+        PHASE_SECONDS.observe(
+            duration,
+            component=component,
+            action=action,
+            status="success" if is_success else "failure",
+        )
+        record_span(
+            Span(
+                component=component,
+                action=action,
+                started_at=started_at,
+                duration=duration,
+                is_success=is_success,
+            ),
+            run_id,
+        )
+
+
+def time_api_calls(client) -> None:
+    """Record every api call of the boto3 client as a span of the current run.
+
+    Retries of a call are part of its span.
+    """
+    service = client.meta.service_model.service_name
+
+    def start_call(context, **_):
+        context["timing_started_at"] = time()
+        context["timing_start"] = monotonic()
+
+    def finish_call(http_response, parsed, model, context, **_):
+        if "timing_start" not in context:
+            return
+        duration = monotonic() - context["timing_start"]
+        is_success = http_response.status_code < 400
+        AWS_CALL_SECONDS.observe(duration, service=service, operation=model.name)
+        if not is_success:
+            AWS_CALL_ERRORS.inc(
+                service=service,
+                operation=model.name,
+                code=parsed.get("Error", {}).get("Code", http_response.status_code),
+            )
+        record_span(
+            Span(
+                component=f"aws:{service}",
+                action=model.name,
+                started_at=context["timing_started_at"],
+                duration=duration,
+                is_success=is_success,
+            )
+        )
+
+    client.meta.events.register("before-call", start_call)
+    client.meta.events.register("after-call", finish_call)
+
+
+def read_spans(run_id: Any) -> List[Span]:
+    """Read spans recorded for the run."""
+    spans = []
+    try:
+        with open(get_spans_file(run_id)) as spans_file:
+            for line in spans_file:
+                try:
+                    spans.append(Span(**json.loads(line)))
+                except (TypeError, ValueError):
+                    continue
+    except FileNotFoundError:
+        pass
+    return spans
+
+
+def summarize_spans(spans: Iterable[Span]) -> List[PhaseSummary]:
+    """Aggregate spans by phase, phases taking the most time first."""
+    phases: Dict[Tuple[str, str], List[Span]] = {}
+    for span_ in spans:
+        phases.setdefault((span_.component, span_.action), []).append(span_)
+
+    summaries = []
+    for (component, action), phase_spans in phases.items():
+        durations = [span_.duration for span_ in phase_spans]
+        summaries.append(
+            PhaseSummary(
+                component=component,
+                action=action,
+                count=len(durations),
+                total=sum(durations),
+                average=sum(durations) / len(durations),
+                maximum=max(durations),
+                failures=sum(1 for span_ in phase_spans if not span_.is_success),
+            )
+        )
+    return sorted(summaries, key=lambda summary: summary.total, reverse=True)
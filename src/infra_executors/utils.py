@@ -1,20 +1,93 @@
 """Common infra executors utilities."""
 import logging
 import subprocess  # nosec
-from typing import List, Mapping, Optional, Tuple
+from collections import deque
+from time import monotonic
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Deque,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
 import boto3  # type: ignore
 
+from infra_executors.account_limits import BOTO3_CONFIG, limit_api_calls
+from infra_executors.api_calls import count_api_calls
+from infra_executors.clients_cache import CLIENTS_CACHE, get_client_key
 from infra_executors.constants import AwsCredentials
+from infra_executors.timing import span, time_api_calls
 
 logger = logging.getLogger(__name__)
 
+# output kept in memory for error reporting
+OUTPUT_TAIL_BYTES = 64 * 1024
+LOG_FLUSH_INTERVAL_SECONDS = 1
+
+OutputConsumer = Callable[[str], None]
+
+
+def _line_handler(
+    logfile: Optional[BinaryIO],
+    consumers: Sequence[OutputConsumer],
+    tail: Deque[str],
+    tail_bytes: int = OUTPUT_TAIL_BYTES,
+) -> Callable[[bytes], None]:
+    """Return function passing single lines of process output on.
+
+    Every line is written to the run log in batches and only the last
+    `tail_bytes` of output are kept in `tail` for error reporting.
+    """
+    tail_size = 0
+    last_flush = monotonic()
+
+    def handle_line(line: bytes) -> None:
+        nonlocal tail_size, last_flush
+        if logfile and line.strip() != b"":
+            logfile.write(line)
+            if monotonic() - last_flush >= LOG_FLUSH_INTERVAL_SECONDS:
+                logfile.flush()
+                last_flush = monotonic()
+
+        decoded_line = line.decode(errors="replace")
+        tail.append(decoded_line)
+        tail_size += len(decoded_line)
+        while tail_size > tail_bytes and len(tail) > 1:
+            tail_size -= len(tail.popleft())
+
+        for consumer in consumers:
+            consumer(decoded_line)
+
+    return handle_line
+
+
+def _stream_output(
+    lines: Iterable[bytes],
+    logfile: Optional[BinaryIO],
+    consumers: Sequence[OutputConsumer] = (),
+    tail_bytes: int = OUTPUT_TAIL_BYTES,
+) -> str:
+    """Pass process output on with bounded memory, return its tail."""
+    tail: Deque[str] = deque()
+    handle_line = _line_handler(logfile, consumers, tail, tail_bytes)
+    for line in lines:
+        handle_line(line)
+    return "".join(tail)
+
 
 def execute_shell_command(
     cmd: List[str],
     env_vars: Optional[Mapping[str, str]],
     cwd: Optional[str],
     log_to: Optional[str],
+    capture_output: bool = False,
+    consumers: Sequence[OutputConsumer] = (),
 ) -> Tuple[int, str]:
     """Execute provided command within shell.
 
@@ -30,6 +103,11 @@ def execute_shell_command(
         current working directory
     log_to : str
         file to which all logs will be written to
+    capture_output : bool
+        capture complete stdout, for commands which output is parsed.
+        stderr is written to the log only.
+    consumers : list of callables
+        called with every line of the process output
 
     Returns
     -------
@@ -37,31 +115,59 @@ def execute_shell_command(
         0 - success
         1 - error
         -N - process was terminated by signal N
+    output : str
+        complete stdout if capture_output is set, otherwise the tail of
+        combined stdout and stderr
     """
-    stdout = ""
-    with subprocess.Popen(
-        cmd,
-        shell=True,  # nosec
-        env=env_vars,
-        cwd=cwd,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
-    ) as process:
-        if log_to:
-            with open(log_to, "ab") as logfile:
-                for line in process.stdout:
-                    if line.strip() != "":
-                        logfile.write(line)
-                    logger.info(line.decode())
-                    stdout += line.decode()
-        else:
-            for line in process.stdout:
-                logger.info(line.decode())
-                stdout += line.decode()
-
-        process.poll()
-
-    return process.returncode, stdout
+    if capture_output:
+        return _capture_shell_command(cmd, env_vars, cwd, log_to)
+
+    logfile = open(log_to, "ab") if log_to else None
+    try:
+        with subprocess.Popen(
+            cmd,
+            shell=True,  # nosec
+            env=env_vars,
+            cwd=cwd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+        ) as process:
+            output_tail = _stream_output(
+                process.stdout, logfile, consumers  # type: ignore
+            )
+            process.poll()
+    finally:
+        if logfile:
+            logfile.close()
+
+    if process.returncode != 0:
+        logger.error(
+            "Command exited with %s. Output tail:\n%s", process.returncode, output_tail,
+        )
+    return process.returncode, output_tail
+
+
+def _capture_shell_command(
+    cmd: List[str],
+    env_vars: Optional[Mapping[str, str]],
+    cwd: Optional[str],
+    log_to: Optional[str],
+) -> Tuple[int, str]:
+    """Execute command and return its complete, clean stdout."""
+    logfile = open(log_to, "ab") if log_to else None
+    try:
+        completed = subprocess.run(  # nosec
+            cmd,
+            shell=True,
+            env=env_vars,
+            cwd=cwd,
+            stdout=subprocess.PIPE,
+            stderr=logfile,
+        )
+    finally:
+        if logfile:
+            logfile.close()
+    return completed.returncode, completed.stdout.decode()
 
 
 def get_session(region: str) -> boto3.session.Session:
@@ -87,8 +193,28 @@ def get_session(region: str) -> boto3.session.Session:
     return boto3.session.Session(**session_config)
 
 
+def _create_boto3_client(service_name: str, aws_creds: AwsCredentials) -> Any:
+    with span(f"aws:{service_name}", "create_client"):
+        session = get_session(aws_creds.region)
+        client = session.client(
+            service_name,
+            aws_access_key_id=aws_creds.access_key,
+            aws_secret_access_key=aws_creds.secret_key,
+            config=BOTO3_CONFIG,
+        )
+    limit_api_calls(client, aws_creds)
+    time_api_calls(client)
+    count_api_calls(client)
+    return client
+
+
 def get_boto3_client(service_name: str, aws_creds: AwsCredentials) -> boto3.client:
-    """Initialize boto3 for the service.
+    """Return boto3 client of the service.
+
+    Clients are cached per process and shared between threads, see
+    `infra_executors.clients_cache`. Calls of the client are rate limited per
+    aws account, timed as spans of the current run and counted, see
+    `infra_executors.api_calls`.
 
     Parameters
     ----------
@@ -101,9 +227,7 @@ def get_boto3_client(service_name: str, aws_creds: AwsCredentials) -> boto3.clie
     -------
     boto3.client
     """
-    session = get_session(aws_creds.region)
-    return session.client(
-        service_name,
-        aws_access_key_id=aws_creds.access_key,
-        aws_secret_access_key=aws_creds.secret_key,
+    return CLIENTS_CACHE.get(
+        get_client_key(service_name, aws_creds),
+        lambda: _create_boto3_client(service_name, aws_creds),
     )
@@ -0,0 +1,206 @@
+"""Isolated terraform working directories.
+
+Every terraform execution gets its own copy of the configuration directory, so
+concurrent runs against the same config dir (with different state keys) never
+share a `.terraform` directory.
+
+Copies are cloned from a template that is initialized once per content hash of
+the configuration (config dir, shared modules and installed provider plugins).
+Large files, such as provider binaries, are hardlinked into the run workspace,
+so creating a workspace is cheap and the per-run `terraform init` only needs to
+configure the backend.
+"""
+import hashlib
+import os
+import shutil
+from typing import Mapping, NamedTuple, Optional
+
+from common.crypto import get_uuid_hex
+
+from infra_executors.constants import (
+    TERRAFORM_DIR,
+    TERRAFORM_PLUGIN_DIR,
+    WORKSPACES_DIR,
+)
+from infra_executors.logger import get_logger
+from infra_executors.utils import execute_shell_command
+
+logger = get_logger("workspace")
+
+MODULES_DIR_NAME = "modules"
+TEMPLATES_DIR = os.path.join(WORKSPACES_DIR, "templates")
+RUNS_DIR = os.path.join(WORKSPACES_DIR, "runs")
+# files smaller than this are copied, so terraform can safely rewrite them
+LINK_THRESHOLD_BYTES = 1024 * 1024
+
+
+class WorkspaceError(Exception):
+    """Indicates failure to prepare a workspace."""
+
+
+class Workspace(NamedTuple):
+    """Run workspace location."""
+
+    # directory that holds the config dir and a link to the shared modules
+    root: str
+    # terraform working directory
+    path: str
+
+
+def _hash_tree(digest: "hashlib._Hash", directory: str) -> None:
+    """Add relative paths and content of all files in the directory to digest."""
+    for dir_path, dir_names, file_names in os.walk(directory):
+        dir_names[:] = sorted(d for d in dir_names if d != ".terraform")
+        for file_name in sorted(file_names):
+            file_path = os.path.join(dir_path, file_name)
+            digest.update(os.path.relpath(file_path, directory).encode())
+            with open(file_path, "rb") as tf_file:
+                digest.update(tf_file.read())
+
+
+def _hash_plugins(digest: "hashlib._Hash") -> None:
+    """Add installed plugin names and sizes to digest."""
+    if not os.path.isdir(TERRAFORM_PLUGIN_DIR):
+        return
+    for dir_path, dir_names, file_names in os.walk(TERRAFORM_PLUGIN_DIR):
+        dir_names.sort()
+        for file_name in sorted(file_names):
+            file_path = os.path.join(dir_path, file_name)
+            digest.update(os.path.relpath(file_path, TERRAFORM_PLUGIN_DIR).encode())
+            digest.update(str(os.path.getsize(file_path)).encode())
+
+
+def config_dir_hash(config_dir: str) -> str:
+    """Calculate content hash of terraform configuration.
+
+    Parameters
+    ----------
+    config_dir : str
+        name of the configuration directory inside TERRAFORM_DIR. i.e.: alb
+
+    Returns
+    -------
+    str
+        hex digest of config dir, shared modules and installed plugins
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    _hash_tree(digest, os.path.join(TERRAFORM_DIR, config_dir))
+    _hash_tree(digest, os.path.join(TERRAFORM_DIR, MODULES_DIR_NAME))
+    _hash_plugins(digest)
+    return digest.hexdigest()
+
+
+def _link_or_copy(src: str, dst: str) -> str:
+    """Hardlink big files and copy the rest."""
+    if os.path.getsize(src) >= LINK_THRESHOLD_BYTES:
+        try:
+            os.link(src, dst)
+            return dst
+        except OSError:
+            logger.debug("Failed to hardlink %s, copying", src)
+    return shutil.copy2(src, dst)
+
+
+def _make_root(root: str, config_dir: str, copy_function=shutil.copy2) -> str:
+    """Create workspace root with a config dir and link to shared modules."""
+    os.makedirs(root)
+    os.symlink(
+        os.path.join(TERRAFORM_DIR, MODULES_DIR_NAME),
+        os.path.join(root, MODULES_DIR_NAME),
+    )
+    return shutil.copytree(
+        config_dir,
+        os.path.join(root, os.path.basename(config_dir)),
+        symlinks=True,
+        copy_function=copy_function,
+    )
+
+
+def get_template(
+    config_dir: str, env_vars: Optional[Mapping[str, str]], log_to: Optional[str]
+) -> str:
+    """Return initialized template for the configuration, build it if missing.
+
+    Template is built in a temporary directory and moved into place with an
+    atomic rename, so concurrent builders do not step on each other.
+
+    Parameters
+    ----------
+    config_dir : str
+        name of the configuration directory inside TERRAFORM_DIR. i.e.: alb
+    env_vars : dict
+        environment variables for terraform init
+    log_to : str
+        file to which init logs will be written to
+
+    Returns
+    -------
+    str
+        path to initialized template configuration directory
+    """
+    template_root = os.path.join(
+        TEMPLATES_DIR, f"{config_dir}-{config_dir_hash(config_dir)}"
+    )
+    template_path = os.path.join(template_root, config_dir)
+    if os.path.isdir(template_path):
+        return template_path
+
+    logger.info("Building terraform template for %s", config_dir)
+    os.makedirs(TEMPLATES_DIR, exist_ok=True)
+    build_root = f"{template_root}.tmp-{get_uuid_hex(4)}"
+    build_path = _make_root(build_root, os.path.join(TERRAFORM_DIR, config_dir))
+    (init_return_code, _) = execute_shell_command(
+        [
+            f"terraform init "
+            f"-backend=false "
+            f"-input=false "
+            f"-no-color "
+            f"-plugin-dir={TERRAFORM_PLUGIN_DIR}"
+        ],
+        env_vars,
+        build_path,
+        log_to,
+    )
+    if init_return_code != 0:
+        shutil.rmtree(build_root, ignore_errors=True)
+        raise WorkspaceError(f"Failed to initialize template for {config_dir}")
+
+    try:
+        os.rename(build_root, template_root)
+    except OSError:
+        # somebody else built the same template in the meantime
+        logger.debug("Template %s already exists", template_root)
+        shutil.rmtree(build_root, ignore_errors=True)
+    return template_path
+
+
+def create_workspace(
+    config_dir: str, env_vars: Optional[Mapping[str, str]], log_to: Optional[str]
+) -> Workspace:
+    """Clone initialized template into a new isolated workspace.
+
+    Parameters
+    ----------
+    config_dir : str
+        name of the configuration directory inside TERRAFORM_DIR. i.e.: alb
+    env_vars : dict
+        environment variables for terraform init
+    log_to : str
+        file to which init logs will be written to
+
+    Returns
+    -------
+    Workspace
+    """
+    template_path = get_template(config_dir, env_vars, log_to)
+    os.makedirs(RUNS_DIR, exist_ok=True)
+    root = os.path.join(RUNS_DIR, f"{config_dir}-{get_uuid_hex(8)}")
+    path = _make_root(root, template_path, copy_function=_link_or_copy)
+    logger.debug("Created workspace %s", path)
+    return Workspace(root=root, path=path)
+
+
+def remove_workspace(workspace: Workspace) -> None:
+    """Remove run workspace."""
+    logger.debug("Removing workspace %s", workspace.path)
+    shutil.rmtree(workspace.root, ignore_errors=True)